@@ -1,7 +1,11 @@
+import itertools
 import json
 import os
 
 TODO_FILE = "todo_list.json"
+TODO_LOG_FILE = "todo_list.jsonl"
+PAGE_SIZE = 20
+COMPACT_MIN_OPS = 1000
 
 
 def load_tasks():
@@ -14,36 +18,125 @@ def load_tasks():
     return []
 
 
-def save_tasks(tasks):
-    with open(TODO_FILE, "w") as file:
-        json.dump(tasks, file, indent=4)
-
-
-def add_task(tasks):
+class TaskStore:
+    """Keeps tasks in memory indexed by id and persists every mutation as one appended JSON line."""
+
+    def __init__(self, log_file=TODO_LOG_FILE):
+        self.log_file = log_file
+        self.tasks = {}
+        self.next_id = 1
+        self.op_count = 0
+        if not os.path.exists(log_file):
+            self._migrate(load_tasks())
+        self._replay()
+        self.file = open(log_file, "a", encoding="utf-8")
+
+    def _migrate(self, legacy_tasks):
+        """Writes the tasks of the old JSON file as the initial operation log."""
+        self._write_snapshot(self.log_file, enumerate(legacy_tasks, start=1), len(legacy_tasks) + 1)
+        if legacy_tasks:
+            print(f"Migrated {len(legacy_tasks)} tasks from {TODO_FILE} to {self.log_file}.")
+
+    def _write_snapshot(self, path, tasks, next_id):
+        """Writes a log of one add per task, headed by the next id so ids of deleted tasks are not reused."""
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(json.dumps({"op": "next_id", "id": next_id}) + "\n")
+            for task_id, task in tasks:
+                record = {"op": "add", "id": task_id, "description": task["description"]}
+                if task.get("completed"):
+                    record["completed"] = True
+                file.write(json.dumps(record) + "\n")
+
+    def _replay(self):
+        with open(self.log_file, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._apply(record)
+                self.op_count += 1
+
+    def _apply(self, record):
+        task_id = record["id"]
+        if record["op"] == "next_id":
+            self.next_id = max(self.next_id, task_id)
+        elif record["op"] == "add":
+            self.tasks[task_id] = {"description": record["description"], "completed": record.get("completed", False)}
+            self.next_id = max(self.next_id, task_id + 1)
+        elif record["op"] == "complete" and task_id in self.tasks:
+            self.tasks[task_id]["completed"] = True
+        elif record["op"] == "delete":
+            self.tasks.pop(task_id, None)
+
+    def _append(self, record):
+        self._apply(record)
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        self.op_count += 1
+        if self.op_count > max(COMPACT_MIN_OPS, 2 * len(self.tasks)):
+            self.compact()
+
+    def compact(self):
+        """Rewrites the log so it holds exactly one line per live task, after the next id."""
+        self.file.close()
+        temp_file = self.log_file + ".tmp"
+        self._write_snapshot(temp_file, self.tasks.items(), self.next_id)
+        os.replace(temp_file, self.log_file)
+        self.op_count = len(self.tasks) + 1
+        self.file = open(self.log_file, "a", encoding="utf-8")
+
+    def add(self, description):
+        task_id = self.next_id
+        self._append({"op": "add", "id": task_id, "description": description})
+        return task_id
+
+    def complete(self, task_id):
+        if task_id not in self.tasks:
+            return False
+        self._append({"op": "complete", "id": task_id})
+        return True
+
+    def delete(self, task_id):
+        task = self.tasks.get(task_id)
+        if task is None:
+            return None
+        self._append({"op": "delete", "id": task_id})
+        return task
+
+    def close(self):
+        self.file.close()
+
+
+def add_task(store):
     task_description = input("Enter the task description: ")
-    tasks.append({"description": task_description, "completed": False})
-    save_tasks(tasks)
+    store.add(task_description)
     print("Task added successfully.")
 
 
-def view_tasks(tasks):
-    if not tasks:
+def view_tasks(store):
+    if not store.tasks:
         print("No tasks in the list.")
         return
     print("\n--- To-Do List ---")
-    for i, task in enumerate(tasks):
-        status = "\u2713" if task["completed"] else " "
-        print(f"{i + 1}. [{status}] {task['description']}")
+    items = iter(store.tasks.items())
+    while True:
+        page = list(itertools.islice(items, PAGE_SIZE))
+        for task_id, task in page:
+            status = "✓" if task["completed"] else " "
+            print(f"{task_id}. [{status}] {task['description']}")
+        if len(page) < PAGE_SIZE:
+            break
+        if input("-- Press Enter for more, or q to stop: ").strip().lower() == "q":
+            break
     print("------------------\n")
 
 
-def mark_task_complete(tasks):
-    view_tasks(tasks)
+def mark_task_complete(store):
+    view_tasks(store)
     try:
-        task_num = int(input("Enter the task number to mark as complete: "))
-        if 1 <= task_num <= len(tasks):
-            tasks[task_num - 1]["completed"] = True
-            save_tasks(tasks)
+        task_id = int(input("Enter the task number to mark as complete: "))
+        if store.complete(task_id):
             print("Task marked as complete.")
         else:
             print("Invalid task number.")
@@ -51,13 +144,12 @@ def mark_task_complete(tasks):
         print("Invalid input. Please enter a number.")
 
 
-def delete_task(tasks):
-    view_tasks(tasks)
+def delete_task(store):
+    view_tasks(store)
     try:
-        task_num = int(input("Enter the task number to delete: "))
-        if 1 <= task_num <= len(tasks):
-            removed_task = tasks.pop(task_num - 1)
-            save_tasks(tasks)
+        task_id = int(input("Enter the task number to delete: "))
+        removed_task = store.delete(task_id)
+        if removed_task is not None:
             print(f"Task '{removed_task['description']}' deleted.")
         else:
             print("Invalid task number.")
@@ -66,7 +158,7 @@ def delete_task(tasks):
 
 
 def main():
-    tasks = load_tasks()
+    store = TaskStore()
     while True:
         print("\nToDo App Menu:")
         print("1. Add a task")
@@ -78,14 +170,15 @@ def main():
         choice = input("Enter your choice (1-5): ")
 
         if choice == "1":
-            add_task(tasks)
+            add_task(store)
         elif choice == "2":
-            view_tasks(tasks)
+            view_tasks(store)
         elif choice == "3":
-            mark_task_complete(tasks)
+            mark_task_complete(store)
         elif choice == "4":
-            delete_task(tasks)
+            delete_task(store)
         elif choice == "5":
+            store.close()
             print("Exiting ToDo App. Goodbye!")
             break
         else:
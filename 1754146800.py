@@ -1,7 +1,23 @@
+import hashlib
+import http.client
+import json
+import os
+import re
 import sys
+import threading
 import urllib.request
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin, urlsplit
+
+PYPI_BASE_URL = "https://pypi.org"
+CACHE_DIR = ".pypi_releases_cache"
+MAX_CONNECTIONS = 8
+TIMEOUT = 30
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
 
 
 def fetch_pypi_releases(package_name):
@@ -44,15 +60,186 @@ def fetch_pypi_releases(package_name):
         print(f"An unexpected error occurred: {e}")
 
 
+def read_requirements(path):
+    """Returns the package names listed in a requirements file, skipping comments and options."""
+    names = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            if line.strip().startswith("-"):
+                continue
+            match = REQUIREMENT_NAME.match(line)
+            if match:
+                names.append(match.group(1))
+    return names
+
+
+def normalize_name(package_name):
+    """Returns the PEP 503 normalized form of a project name, which is the one PyPI serves without a redirect."""
+    return re.sub(r"[-_.]+", "-", package_name).lower()
+
+
+def parse_release_items(response):
+    """Incrementally parses an RSS feed and returns (version, published) pairs."""
+    releases = []
+    for _, elem in ET.iterparse(response, events=("end",)):
+        if elem.tag == "item":
+            title = elem.findtext("title", "").strip()
+            pub_date = elem.findtext("pubDate", "").strip()
+            releases.append((title, pub_date))
+            elem.clear()
+    return releases
+
+
+class ReleaseCache:
+    """On-disk cache of parsed feeds with the validators needed for conditional requests."""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url):
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, url, etag, last_modified, releases):
+        path = self._path(url)
+        temp_path = path + f".{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"etag": etag, "last_modified": last_modified, "releases": releases}, f)
+        os.replace(temp_path, path)
+
+
+class BatchReleaseFetcher:
+    """Fetches many feeds concurrently, one keep-alive connection per worker thread."""
+
+    def __init__(self, base_url=PYPI_BASE_URL, max_connections=MAX_CONNECTIONS, cache_dir=CACHE_DIR):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.path_prefix = parts.path.rstrip("/")
+        self.max_connections = max_connections
+        self.cache = ReleaseCache(cache_dir)
+        self.local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            if self.scheme == "https":
+                conn = http.client.HTTPSConnection(self.netloc, timeout=TIMEOUT)
+            else:
+                conn = http.client.HTTPConnection(self.netloc, timeout=TIMEOUT)
+            self.local.conn = conn
+        return conn
+
+    def _reset_connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self.local.conn = None
+
+    def fetch(self, package_name):
+        """Returns (package_name, status, releases_or_error) where status is 'fetched', 'cached' or 'error'."""
+        path = f"{self.path_prefix}/rss/project/{normalize_name(package_name)}/releases.xml"
+        cache_key = f"{self.scheme}://{self.netloc}{path}"
+        cached = self.cache.get(cache_key)
+        headers = {"Accept-Encoding": "identity"}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                for _ in range(MAX_REDIRECTS + 1):
+                    conn.request("GET", path, headers=headers)
+                    response = conn.getresponse()
+                    if response.status not in REDIRECT_STATUSES:
+                        break
+                    location = response.getheader("Location")
+                    response.read()
+                    target = urlsplit(urljoin(f"{self.scheme}://{self.netloc}{path}", location or ""))
+                    if not location or (target.scheme, target.netloc) != (self.scheme, self.netloc):
+                        return package_name, "error", f"HTTP Status: {response.status} redirect to {location}"
+                    path = target.path + (f"?{target.query}" if target.query else "")
+                else:
+                    return package_name, "error", f"Too many redirects (more than {MAX_REDIRECTS})"
+                if response.status == 304 and cached:
+                    response.read()
+                    return package_name, "cached", cached["releases"]
+                if response.status != 200:
+                    response.read()
+                    return package_name, "error", f"HTTP Status: {response.status}"
+                releases = parse_release_items(response)
+                response.read()
+                self.cache.put(cache_key, response.getheader("ETag"), response.getheader("Last-Modified"), releases)
+                return package_name, "fetched", releases
+            except (http.client.HTTPException, ConnectionError) as e:
+                self._reset_connection()
+                if attempt == 1:
+                    return package_name, "error", f"Failed to fetch URL. Reason: {e}"
+            except OSError as e:
+                self._reset_connection()
+                return package_name, "error", f"Failed to fetch URL. Reason: {e}"
+            except ET.ParseError as e:
+                self._reset_connection()
+                return package_name, "error", f"Failed to parse XML. Reason: {e}"
+
+    def fetch_all(self, package_names):
+        """Fetches every package concurrently and yields results in input order."""
+        with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+            yield from executor.map(self.fetch, package_names)
+
+
+def fetch_pypi_releases_batch(package_names, base_url=PYPI_BASE_URL):
+    """Fetches and displays release history for many PyPI packages."""
+    fetcher = BatchReleaseFetcher(base_url)
+    counts = {"fetched": 0, "cached": 0, "error": 0}
+    for package_name, status, result in fetcher.fetch_all(package_names):
+        counts[status] += 1
+        print(f"\n--- Release History for {package_name} ({status}) ---")
+        if status == "error":
+            print(f"Error: {result}")
+            continue
+        if not result:
+            print("No releases found.")
+        for title, pub_date in result:
+            print(f"- version: {title}")
+            print(f"  published: {pub_date}")
+    print(f"\n{len(package_names)} packages: {counts['fetched']} fetched, {counts['cached']} not modified, ", end="")
+    print(f"{counts['error']} errors.")
+
+
 def main():
     """Main function to run the PyPI release checker."""
     if len(sys.argv) < 2:
-        print(f"Usage: python {sys.argv[0]} <package_name>")
+        print(f"Usage: python {sys.argv[0]} <package_name> [<package_name> ...]")
+        print(f"       python {sys.argv[0]} -r <requirements_file>")
         print(f"Example: python {sys.argv[0]} requests")
         sys.exit(1)
 
-    package_name = sys.argv[1]
-    fetch_pypi_releases(package_name)
+    if sys.argv[1] == "-r":
+        if len(sys.argv) < 3:
+            print("Error: -r requires a requirements file.")
+            sys.exit(1)
+        try:
+            package_names = read_requirements(sys.argv[2])
+        except OSError as e:
+            print(f"Error: Failed to read requirements file. Reason: {e}")
+            sys.exit(1)
+        fetch_pypi_releases_batch(package_names)
+    elif len(sys.argv) > 2:
+        fetch_pypi_releases_batch(sys.argv[1:])
+    else:
+        fetch_pypi_releases(sys.argv[1])
 
 
 if __name__ == "__main__":
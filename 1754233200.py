@@ -1,20 +1,169 @@
 import html
+import json
 import os
+import re
 import sys
 import urllib.parse
 
-print("<!doctype html>")
-print('<meta name="viewport" content="width=device-width">')
-print("<pre>")
+INDEX_CACHE_FILE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache")), "file_index_cache.json"
+)
+PAGE_FILENAME = "index{}.html"
+PAGE_PATTERN = re.compile(r"index\d*\.html")
 
-if len(sys.argv) > 1:
-    directory = sys.argv[1]
-else:
-    directory = "."
 
-for name in sorted(os.listdir(directory)):
-    if os.path.isfile(os.path.join(directory, name)):
-        url = urllib.parse.quote(name)
-        print(f'<a href="{url}">{html.escape(name)}</a>')
+def list_directory(path):
+    """Lists one directory with a single scandir pass and returns sorted (files, subdirectories)."""
+    files = []
+    dirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append(entry.name)
+            elif entry.is_file():
+                files.append(entry.name)
+    files.sort()
+    dirs.sort()
+    return files, dirs
 
-print("</pre>")
+
+def walk_files(root, cache, skip_pattern=None):
+    """Yields file paths relative to root, reusing cached listings of directories whose mtime has not changed.
+
+    Entries for directories that were not reached (deleted or moved) are dropped from the cache at the end.
+    Names matching skip_pattern in the root itself (the generated pages) are left out."""
+    stack = [""]
+    seen = set()
+    while stack:
+        rel_dir = stack.pop()
+        seen.add(rel_dir)
+        path = os.path.join(root, rel_dir) if rel_dir else root
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            cached = cache.get(rel_dir)
+            if cached and cached["mtime_ns"] == mtime_ns:
+                files, dirs = cached["files"], cached["dirs"]
+            else:
+                files, dirs = list_directory(path)
+                cache[rel_dir] = {"mtime_ns": mtime_ns, "files": files, "dirs": dirs}
+        except OSError as e:
+            print(f"Warning: cannot read {path}: {e}", file=sys.stderr)
+            cache.pop(rel_dir, None)
+            continue
+        for name in files:
+            if rel_dir:
+                yield f"{rel_dir}/{name}"
+            elif not (skip_pattern and skip_pattern.fullmatch(name)):
+                yield name
+        stack.extend(f"{rel_dir}/{name}" if rel_dir else name for name in reversed(dirs))
+    for rel_dir in cache.keys() - seen:
+        del cache[rel_dir]
+
+
+def load_index_cache(root):
+    try:
+        with open(INDEX_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f).get(os.path.abspath(root), {})
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_index_cache(root, cache):
+    try:
+        with open(INDEX_CACHE_FILE, "r", encoding="utf-8") as f:
+            all_caches = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        all_caches = {}
+    all_caches = {path: entries for path, entries in all_caches.items() if os.path.isdir(path)}
+    all_caches[os.path.abspath(root)] = cache
+    os.makedirs(os.path.dirname(INDEX_CACHE_FILE), exist_ok=True)
+    temp_file = INDEX_CACHE_FILE + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(all_caches, f)
+    os.replace(temp_file, INDEX_CACHE_FILE)
+
+
+def write_header(out):
+    out.write("<!doctype html>\n")
+    out.write('<meta name="viewport" content="width=device-width">\n')
+    out.write("<pre>\n")
+
+
+def write_entry(out, rel_path):
+    url = urllib.parse.quote(rel_path)
+    out.write(f'<a href="{url}">{html.escape(rel_path)}</a>\n')
+
+
+def write_footer(out, page=None, has_next=False):
+    out.write("</pre>\n")
+    if page is not None:
+        links = []
+        if page > 1:
+            links.append(f'<a href="{PAGE_FILENAME.format(page - 1 if page > 2 else "")}">prev</a>')
+        if has_next:
+            links.append(f'<a href="{PAGE_FILENAME.format(page + 1)}">next</a>')
+        out.write(" ".join(links) + "\n")
+
+
+def index_recursive(directory, page_size=None):
+    """Streams a recursive file index as HTML to stdout, or to numbered pages in the indexed directory when
+    page_size is set. The cache lives in the user's cache directory, never inside the indexed tree."""
+    cache = load_index_cache(directory)
+    entries = walk_files(directory, cache, PAGE_PATTERN if page_size else None)
+    if not page_size:
+        write_header(sys.stdout)
+        for rel_path in entries:
+            write_entry(sys.stdout, rel_path)
+        write_footer(sys.stdout)
+    else:
+        page = 1
+        count = 0
+        out = open(os.path.join(directory, PAGE_FILENAME.format("")), "w", encoding="utf-8")
+        write_header(out)
+        for rel_path in entries:
+            if count == page_size:
+                write_footer(out, page, has_next=True)
+                out.close()
+                page += 1
+                count = 0
+                out = open(os.path.join(directory, PAGE_FILENAME.format(page)), "w", encoding="utf-8")
+                write_header(out)
+            write_entry(out, rel_path)
+            count += 1
+        write_footer(out, page)
+        out.close()
+        stale = page + 1
+        while os.path.exists(os.path.join(directory, PAGE_FILENAME.format(stale))):
+            os.remove(os.path.join(directory, PAGE_FILENAME.format(stale)))
+            stale += 1
+        print(f"Wrote {page} page(s) of up to {page_size} entries to {directory}.", file=sys.stderr)
+    save_index_cache(directory, cache)
+
+
+def index_flat(directory):
+    write_header(sys.stdout)
+    files, _ = list_directory(directory)
+    for name in files:
+        write_entry(sys.stdout, name)
+    write_footer(sys.stdout)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    recursive = "-r" in args
+    page_size = None
+    if "--page-size" in args:
+        i = args.index("--page-size")
+        try:
+            page_size = int(args[i + 1])
+        except (IndexError, ValueError):
+            print(f"Usage: python {sys.argv[0]} [-r [--page-size N]] [directory]", file=sys.stderr)
+            sys.exit(1)
+        del args[i : i + 2]
+    args = [arg for arg in args if arg != "-r"]
+    directory = args[0] if args else "."
+
+    if recursive:
+        index_recursive(directory, page_size)
+    else:
+        index_flat(directory)
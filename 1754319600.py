@@ -1,4 +1,6 @@
 import random
+import sys
+import time
 import tkinter as tk
 
 WINDOW_WIDTH = 800
@@ -13,264 +15,386 @@ BULLET_WIDTH = 5
 BULLET_HEIGHT = 15
 BULLET_SPEED = 20
 UPDATE_DELAY = 30
+GRID_CELL_SIZE = 64
+PLAYER_TOP = WINDOW_HEIGHT - PLAYER_HEIGHT - 20
+STRESS_FRAMES = 300
+STRESS_BULLETS_PER_FRAME = 20
 
 
-class Game(tk.Tk):
-    """Manages the main game window and game loop."""
+class EntityPool:
+    """Struct-of-arrays storage for one kind of entity; slots of removed entities are reused."""
 
     def __init__(self):
-        super().__init__()
-
-        self.title("Simple Shooting Game")
-        self.canvas = tk.Canvas(self, width=WINDOW_WIDTH, height=WINDOW_HEIGHT, bg="black")
-        self.canvas.pack()
-
-        self.player = Player(self.canvas)
-        self.enemies = []
-        self.bullets = []
+        self.x = []
+        self.y = []
+        self.vx = []
+        self.vy = []
+        self.active = []
+        self.free = []
+
+    def spawn(self, x, y, vx, vy):
+        if self.free:
+            slot = self.free.pop()
+            self.x[slot] = x
+            self.y[slot] = y
+            self.vx[slot] = vx
+            self.vy[slot] = vy
+        else:
+            slot = len(self.x)
+            self.x.append(x)
+            self.y.append(y)
+            self.vx.append(vx)
+            self.vy.append(vy)
+        self.active.append(slot)
+        return slot
+
+    def remove(self, slots):
+        if slots:
+            self.active = [slot for slot in self.active if slot not in slots]
+            self.free.extend(slots)
+
+    def step(self):
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        for slot in self.active:
+            x[slot] += vx[slot]
+            y[slot] += vy[slot]
+
+
+class SpatialHash:
+    """Uniform grid of entity slots for broad-phase overlap queries."""
+
+    def __init__(self, cell_size=GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def rebuild(self, pool, width, height):
+        cells = {}
+        size = self.cell_size
+        for slot in pool.active:
+            x = pool.x[slot]
+            y = pool.y[slot]
+            for cx in range(int(x // size), int((x + width) // size) + 1):
+                for cy in range(int(y // size), int((y + height) // size) + 1):
+                    cell = cells.get((cx, cy))
+                    if cell is None:
+                        cells[(cx, cy)] = [slot]
+                    else:
+                        cell.append(slot)
+        self.cells = cells
+
+    def query(self, x0, y0, x1, y1):
+        """Yields slots in the cells overlapping the box; a slot can be yielded more than once."""
+        size = self.cell_size
+        for cx in range(int(x0 // size), int(x1 // size) + 1):
+            for cy in range(int(y0 // size), int(y1 // size) + 1):
+                yield from self.cells.get((cx, cy), ())
+
+
+class World:
+    """Game state and rules, independent of the canvas."""
+
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.player_x = WINDOW_WIDTH / 2 - PLAYER_WIDTH / 2
+        self.player_dx = 0
+        self.enemies = EntityPool()
+        self.bullets = EntityPool()
+        self.enemy_grid = SpatialHash()
         self.score = 0
         self.lives = 3
-        self.is_game_over = False
-
-        self.score_text = self.canvas.create_text(
-            10, 20, text=f"Score: {self.score}", fill="white", font=("Arial", 16), anchor="w"
-        )
-        self.lives_text = self.canvas.create_text(
-            WINDOW_WIDTH - 10, 20, text=f"Lives: {self.lives}", fill="white", font=("Arial", 16), anchor="e"
-        )
-
-        self.bind("<KeyPress-Left>", self.player.start_move_left)
-        self.bind("<KeyPress-Right>", self.player.start_move_right)
-        self.bind("<KeyRelease-Left>", self.player.stop_move)
-        self.bind("<KeyRelease-Right>", self.player.stop_move)
-        self.bind("<space>", self.create_bullet)
-
-        self.game_loop()
-        self.spawn_enemies()
-
-    def game_loop(self):
-        """The main game loop for updating and drawing."""
-        if self.is_game_over:
-            self.show_game_over()
-            return
+        self.removed_enemies = set()
+        self.removed_bullets = set()
+        self.bounced_enemies = []
+
+    def spawn_enemy(self):
+        start_x = self.rng.randint(0, WINDOW_WIDTH - ENEMY_WIDTH)
+        return self.enemies.spawn(start_x, -ENEMY_HEIGHT, self.rng.choice([-2, 2]), ENEMY_SPEED)
+
+    def fire(self, x=None):
+        """Fires a bullet from the player's nose, or from x at the player's height."""
+        if x is None:
+            x = self.player_x + PLAYER_WIDTH / 2
+        return self.bullets.spawn(x - BULLET_WIDTH / 2, PLAYER_TOP - BULLET_HEIGHT, 0, -BULLET_SPEED)
+
+    def step(self):
+        """Advances one frame and records removed and bounced entities for the view."""
+        self.removed_enemies = set()
+        self.removed_bullets = set()
+        self.bounced_enemies = []
+
+        self.player_x = min(max(self.player_x + self.player_dx, 0), WINDOW_WIDTH - PLAYER_WIDTH)
+        self.bullets.step()
+        self.enemies.step()
+
+        by = self.bullets.y
+        for slot in self.bullets.active:
+            if by[slot] + BULLET_HEIGHT <= 0:
+                self.removed_bullets.add(slot)
+
+        ex, ey, evx = self.enemies.x, self.enemies.y, self.enemies.vx
+        player_left = self.player_x
+        player_right = self.player_x + PLAYER_WIDTH
+        lives_lost = 0
+        for slot in self.enemies.active:
+            if ex[slot] <= 0 or ex[slot] + ENEMY_WIDTH >= WINDOW_WIDTH:
+                evx[slot] = -evx[slot]
+                self.bounced_enemies.append(slot)
+            if ey[slot] > WINDOW_HEIGHT:
+                self.removed_enemies.add(slot)
+                lives_lost += 1
+            elif (
+                player_left < ex[slot] + ENEMY_WIDTH
+                and player_right > ex[slot]
+                and PLAYER_TOP < ey[slot] + ENEMY_HEIGHT
+                and PLAYER_TOP + PLAYER_HEIGHT > ey[slot]
+            ):
+                self.removed_enemies.add(slot)
+                lives_lost += 1
+        self.lives = max(self.lives - lives_lost, 0)
 
-        self.player.update()
-        self.update_bullets()
-        self.update_enemies()
         self.check_collisions()
+        self.bullets.remove(self.removed_bullets)
+        self.enemies.remove(self.removed_enemies)
 
-        self.after(UPDATE_DELAY, self.game_loop)
+    def check_collisions(self):
+        """Matches bullets with enemies through the spatial hash; each enemy absorbs one bullet."""
+        self.enemy_grid.rebuild(self.enemies, ENEMY_WIDTH, ENEMY_HEIGHT)
+        bx, by = self.bullets.x, self.bullets.y
+        ex, ey = self.enemies.x, self.enemies.y
+        hit = self.removed_enemies
+        for bullet in self.bullets.active:
+            if bullet in self.removed_bullets:
+                continue
+            x0 = bx[bullet]
+            y0 = by[bullet]
+            x1 = x0 + BULLET_WIDTH
+            y1 = y0 + BULLET_HEIGHT
+            for enemy in self.enemy_grid.query(x0, y0, x1, y1):
+                if enemy in hit:
+                    continue
+                if x0 < ex[enemy] + ENEMY_WIDTH and x1 > ex[enemy] and y0 < ey[enemy] + ENEMY_HEIGHT and y1 > ey[enemy]:
+                    self.removed_bullets.add(bullet)
+                    hit.add(enemy)
+                    self.score += 10
+                    break
 
-    def spawn_enemies(self):
-        """Periodically creates new enemies."""
-        if not self.is_game_over:
-            self.enemies.extend([Enemy(self.canvas) for _ in range(2)])
-            self.after(1500, self.spawn_enemies)
 
-    def create_bullet(self, event):
-        """Creates a bullet when the spacebar is pressed."""
-        if not self.is_game_over:
-            player_pos = self.canvas.bbox(self.player.id)
-            if not player_pos:
-                return
-            bullet = Bullet(self.canvas, player_pos[0] + PLAYER_WIDTH / 2, player_pos[1])
-            self.bullets.append(bullet)
-
-    def update_bullets(self):
-        """Moves bullets and removes them if they go off-screen."""
-        for bullet in self.bullets:
-            bullet.update()
-
-        remaining_bullets = []
-        for bullet in self.bullets:
-            pos = self.canvas.bbox(bullet.id)
-            if pos and pos[3] > 0:
-                remaining_bullets.append(bullet)
-            elif pos:
-                self.canvas.delete(bullet.id)
-        self.bullets = remaining_bullets
-
-    def update_enemies(self):
-        """Moves enemies, handles invasion and player collision."""
-        player_pos = self.canvas.bbox(self.player.id)
-        if not player_pos:
-            return
+class CanvasItemPool:
+    """Reuses hidden canvas items instead of creating and deleting them."""
 
-        enemies_to_remove = set()
-        lives_lost = 0
+    def __init__(self, canvas, create):
+        self.canvas = canvas
+        self.create = create
+        self.free = []
 
-        for enemy in self.enemies:
-            enemy.update()
-            enemy_pos = self.canvas.bbox(enemy.id)
+    def acquire(self, coords, tag):
+        if self.free:
+            item = self.free.pop()
+            self.canvas.coords(item, *coords)
+            self.canvas.itemconfig(item, state="normal", tags=(tag,))
+        else:
+            item = self.create(*coords, fill="white", tags=(tag,))
+        return item
 
-            if not enemy_pos:
-                continue
+    def release(self, item):
+        self.canvas.itemconfig(item, state="hidden", tags=())
+        self.free.append(item)
 
-            if enemy_pos[1] > WINDOW_HEIGHT:
-                enemies_to_remove.add(enemy)
-                lives_lost += 1
-                continue
 
-            if (
-                player_pos[0] < enemy_pos[2]
-                and player_pos[2] > enemy_pos[0]
-                and player_pos[1] < enemy_pos[3]
-                and player_pos[3] > enemy_pos[1]
-            ):
-                enemies_to_remove.add(enemy)
-                lives_lost += 1
+def enemy_coords(x, y):
+    return x, y, x + ENEMY_WIDTH, y, x + ENEMY_WIDTH / 2, y + ENEMY_HEIGHT
 
-        if lives_lost > 0:
-            self.lives -= lives_lost
-            self.update_lives()
 
-        if enemies_to_remove:
-            self.enemies = [e for e in self.enemies if e not in enemies_to_remove]
-            for enemy in enemies_to_remove:
-                self.canvas.delete(enemy.id)
+def enemy_tag(vx):
+    return "enemy_left" if vx < 0 else "enemy_right"
 
-        if self.lives <= 0 and not self.is_game_over:
-            self.is_game_over = True
 
-    def check_collisions(self):
-        """Checks for collisions between bullets and enemies."""
-        bullets_hit = set()
-        enemies_hit = set()
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
 
-        for bullet in self.bullets:
-            bullet_pos = self.canvas.bbox(bullet.id)
-            if not bullet_pos:
-                continue
 
-            for enemy in self.enemies:
-                if enemy in enemies_hit:
-                    continue
+def report_frame_times(label, frame_times):
+    ordered = sorted(frame_times)
+    p50, p95, p99 = (percentile(ordered, f) * 1000 for f in (0.5, 0.95, 0.99))
+    print(f"{label}: p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms, max {ordered[-1] * 1000:.2f} ms")
 
-                enemy_pos = self.canvas.bbox(enemy.id)
-                if not enemy_pos:
-                    continue
 
-                if (
-                    bullet_pos[0] < enemy_pos[2]
-                    and bullet_pos[2] > enemy_pos[0]
-                    and bullet_pos[1] < enemy_pos[3]
-                    and bullet_pos[3] > enemy_pos[1]
-                ):
-                    bullets_hit.add(bullet)
-                    enemies_hit.add(enemy)
-                    self.score += 10
-                    break
-
-        if bullets_hit or enemies_hit:
-            self.bullets = [b for b in self.bullets if b not in bullets_hit]
-            self.enemies = [e for e in self.enemies if e not in enemies_hit]
-
-            for item in bullets_hit.union(enemies_hit):
-                self.canvas.delete(item.id)
-
-            self.update_score()
+class Game(tk.Tk):
+    """Manages the main game window and game loop, drawing the World on a canvas."""
 
-    def update_score(self):
-        """Updates the score display."""
-        self.canvas.itemconfig(self.score_text, text=f"Score: {self.score}")
+    def __init__(self, stress_enemies=0):
+        super().__init__()
 
-    def update_lives(self):
-        """Updates the lives display."""
-        if self.lives < 0:
-            self.lives = 0
-        self.canvas.itemconfig(self.lives_text, text=f"Lives: {self.lives}")
+        self.title("Simple Shooting Game")
+        self.canvas = tk.Canvas(self, width=WINDOW_WIDTH, height=WINDOW_HEIGHT, bg="black")
+        self.canvas.pack()
 
-    def show_game_over(self):
-        """Displays the Game Over message."""
-        self.canvas.create_text(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2, text="GAME OVER", fill="white", font=("Arial", 40))
-        self.canvas.create_text(
-            WINDOW_WIDTH / 2,
-            WINDOW_HEIGHT / 2 + 50,
-            text=f"Final Score: {self.score}",
-            fill="white",
-            font=("Arial", 20),
+        self.world = World()
+        self.is_game_over = False
+        self.stress_enemies = stress_enemies
+        self.frame_times = []
+
+        self.player_id = self.canvas.create_polygon(*self.player_coords(), fill="white")
+        self.shown_player_x = self.world.player_x
+        self.enemy_items = {}
+        self.bullet_items = {}
+        self.enemy_pool = CanvasItemPool(self.canvas, self.canvas.create_polygon)
+        self.bullet_pool = CanvasItemPool(self.canvas, self.canvas.create_rectangle)
+        self.shown_score = None
+        self.shown_lives = None
+
+        self.score_text = self.canvas.create_text(10, 20, text="", fill="white", font=("Arial", 16), anchor="w")
+        self.lives_text = self.canvas.create_text(
+            WINDOW_WIDTH - 10, 20, text="", fill="white", font=("Arial", 16), anchor="e"
         )
+        self.update_hud()
 
+        self.bind("<KeyPress-Left>", self.start_move_left)
+        self.bind("<KeyPress-Right>", self.start_move_right)
+        self.bind("<KeyRelease-Left>", self.stop_move)
+        self.bind("<KeyRelease-Right>", self.stop_move)
+        self.bind("<space>", self.create_bullet)
 
-class Player:
-    """Represents the player's ship."""
+        self.game_loop()
+        self.spawn_enemies()
 
-    def __init__(self, canvas):
-        self.canvas = canvas
-        self.id = self.canvas.create_polygon(
-            WINDOW_WIDTH / 2,
-            WINDOW_HEIGHT - PLAYER_HEIGHT - 20,
-            WINDOW_WIDTH / 2 - PLAYER_WIDTH / 2,
-            WINDOW_HEIGHT - 20,
-            WINDOW_WIDTH / 2 + PLAYER_WIDTH / 2,
-            WINDOW_HEIGHT - 20,
-            fill="white",
-        )
-        self.x_speed = 0
+    def player_coords(self):
+        x = self.world.player_x
+        return x + PLAYER_WIDTH / 2, PLAYER_TOP, x, WINDOW_HEIGHT - 20, x + PLAYER_WIDTH, WINDOW_HEIGHT - 20
 
     def start_move_left(self, event):
         """Starts moving left."""
-        self.x_speed = -PLAYER_SPEED
+        self.world.player_dx = -PLAYER_SPEED
 
     def start_move_right(self, event):
         """Starts moving right."""
-        self.x_speed = PLAYER_SPEED
+        self.world.player_dx = PLAYER_SPEED
 
     def stop_move(self, event):
         """Stops horizontal movement."""
-        self.x_speed = 0
+        self.world.player_dx = 0
 
-    def update(self):
-        """Moves the player horizontally and stops at the window edges."""
-        self.canvas.move(self.id, self.x_speed, 0)
-        pos = self.canvas.bbox(self.id)
-        if not pos:
+    def game_loop(self):
+        """The main game loop for updating and drawing."""
+        if self.is_game_over:
+            self.show_game_over()
             return
-        if pos[0] <= 0:
-            self.canvas.move(self.id, -pos[0], 0)
-        elif pos[2] >= WINDOW_WIDTH:
-            self.canvas.move(self.id, WINDOW_WIDTH - pos[2], 0)
 
+        start = time.perf_counter()
+        if self.stress_enemies:
+            self.stress_frame()
+        self.world.step()
+        self.sync_canvas()
+        if self.world.lives <= 0 and not self.stress_enemies:
+            self.is_game_over = True
 
-class Enemy:
-    """Represents an enemy ship."""
+        if self.stress_enemies:
+            self.update_idletasks()
+            self.frame_times.append(time.perf_counter() - start)
+            if len(self.frame_times) >= STRESS_FRAMES:
+                report_frame_times(f"{self.stress_enemies} enemies on canvas", self.frame_times)
+                self.destroy()
+                return
 
-    def __init__(self, canvas):
-        self.canvas = canvas
-        start_x = random.randint(0, WINDOW_WIDTH - ENEMY_WIDTH)
-        self.id = self.canvas.create_polygon(
-            start_x,
-            -ENEMY_HEIGHT,
-            start_x + ENEMY_WIDTH,
-            -ENEMY_HEIGHT,
-            start_x + ENEMY_WIDTH / 2,
-            0,
-            fill="white",
-        )
-        self.x_speed = random.choice([-2, 2])
+        self.after(UPDATE_DELAY, self.game_loop)
 
-    def update(self):
-        """Moves the enemy downwards and diagonally, bouncing off side walls."""
-        self.canvas.move(self.id, self.x_speed, ENEMY_SPEED)
-        pos = self.canvas.bbox(self.id)
-        if pos and (pos[0] <= 0 or pos[2] >= WINDOW_WIDTH):
-            self.x_speed *= -1
+    def stress_frame(self):
+        """Keeps the enemy count topped up and sprays bullets across the width."""
+        while len(self.world.enemies.active) < self.stress_enemies:
+            self.add_enemy()
+        for _ in range(STRESS_BULLETS_PER_FRAME):
+            self.add_bullet(random.uniform(0, WINDOW_WIDTH))
+        self.world.lives = 3
+
+    def sync_canvas(self):
+        """Moves whole groups of items with one call per tag and updates only the items that changed."""
+        world = self.world
+        self.canvas.move("bullet", 0, -BULLET_SPEED)
+        self.canvas.move("enemy_left", -2, ENEMY_SPEED)
+        self.canvas.move("enemy_right", 2, ENEMY_SPEED)
+        for slot in world.bounced_enemies:
+            if slot not in world.removed_enemies:
+                self.canvas.itemconfig(self.enemy_items[slot], tags=(enemy_tag(world.enemies.vx[slot]),))
+        for slot in world.removed_enemies:
+            self.enemy_pool.release(self.enemy_items.pop(slot))
+        for slot in world.removed_bullets:
+            self.bullet_pool.release(self.bullet_items.pop(slot))
+
+        if world.player_x != self.shown_player_x:
+            self.canvas.move(self.player_id, world.player_x - self.shown_player_x, 0)
+            self.shown_player_x = world.player_x
+        self.update_hud()
 
+    def spawn_enemies(self):
+        """Periodically creates new enemies."""
+        if not self.is_game_over:
+            for _ in range(2):
+                self.add_enemy()
+            self.after(1500, self.spawn_enemies)
 
-class Bullet:
-    """Represents a bullet fired by the player."""
+    def add_enemy(self):
+        slot = self.world.spawn_enemy()
+        coords = enemy_coords(self.world.enemies.x[slot], self.world.enemies.y[slot])
+        self.enemy_items[slot] = self.enemy_pool.acquire(coords, enemy_tag(self.world.enemies.vx[slot]))
 
-    def __init__(self, canvas, x, y):
-        self.canvas = canvas
-        self.id = self.canvas.create_rectangle(
-            x - BULLET_WIDTH / 2, y - BULLET_HEIGHT, x + BULLET_WIDTH / 2, y, fill="white"
+    def add_bullet(self, x=None):
+        slot = self.world.fire(x)
+        bx, by = self.world.bullets.x[slot], self.world.bullets.y[slot]
+        self.bullet_items[slot] = self.bullet_pool.acquire((bx, by, bx + BULLET_WIDTH, by + BULLET_HEIGHT), "bullet")
+
+    def create_bullet(self, event):
+        """Creates a bullet when the spacebar is pressed."""
+        if not self.is_game_over:
+            self.add_bullet()
+
+    def update_hud(self):
+        """Updates the score and lives display when they change."""
+        if self.world.score != self.shown_score:
+            self.shown_score = self.world.score
+            self.canvas.itemconfig(self.score_text, text=f"Score: {self.world.score}")
+        if self.world.lives != self.shown_lives:
+            self.shown_lives = self.world.lives
+            self.canvas.itemconfig(self.lives_text, text=f"Lives: {self.world.lives}")
+
+    def show_game_over(self):
+        """Displays the Game Over message."""
+        self.canvas.create_text(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2, text="GAME OVER", fill="white", font=("Arial", 40))
+        self.canvas.create_text(
+            WINDOW_WIDTH / 2,
+            WINDOW_HEIGHT / 2 + 50,
+            text=f"Final Score: {self.world.score}",
+            fill="white",
+            font=("Arial", 20),
         )
 
-    def update(self):
-        """Moves the bullet upwards."""
-        self.canvas.move(self.id, 0, -BULLET_SPEED)
+
+def stress_headless(enemies):
+    """Steps the World without a canvas and prints frame-time percentiles."""
+    world = World(random.Random(0))
+    frame_times = []
+    for _ in range(STRESS_FRAMES):
+        start = time.perf_counter()
+        while len(world.enemies.active) < enemies:
+            world.spawn_enemy()
+        for _ in range(STRESS_BULLETS_PER_FRAME):
+            world.fire(world.rng.uniform(0, WINDOW_WIDTH))
+        world.step()
+        frame_times.append(time.perf_counter() - start)
+    report_frame_times(f"{enemies} enemies, model only", frame_times)
+    print(f"Score {world.score}, {len(world.bullets.active)} bullets in flight")
 
 
 if __name__ == "__main__":
-    game = Game()
-    game.mainloop()
+    args = sys.argv[1:]
+    stress_enemies = 0
+    if "--stress" in args:
+        try:
+            stress_enemies = int(args[args.index("--stress") + 1])
+        except (IndexError, ValueError):
+            print(f"Usage: python {sys.argv[0]} [--stress N [--headless]]")
+            sys.exit(1)
+    if stress_enemies and "--headless" in args:
+        stress_headless(stress_enemies)
+    else:
+        game = Game(stress_enemies)
+        game.mainloop()
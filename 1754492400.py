@@ -1,6 +1,14 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
 WIDTH = 1024
 HEIGHT = 1024
 OUTPUT_FILENAME = "rule110.pbm"
+RULE_NUMBER = 110
 RULES = {
     (1, 1, 1): 0,
     (1, 1, 0): 1,
@@ -11,38 +19,147 @@ RULES = {
     (0, 0, 1): 1,
     (0, 0, 0): 0,
 }
+BENCHMARK_SIZES = [(256, 256), (512, 512), (1024, 1024)]
 
 
-def generate_image():
+def generate_image(width=WIDTH, height=HEIGHT, output_filename=OUTPUT_FILENAME):
     """Simulates Rule 110 and writes the output to a PBM file."""
-    current_gen = [0] * WIDTH
+    current_gen = [0] * width
     current_gen[-1] = 1
     image_data = []
 
-    print(f"Simulating {HEIGHT} generations of Rule 110...")
-    for _ in range(HEIGHT):
+    print(f"Simulating {height} generations of Rule 110...")
+    for _ in range(height):
         image_data.append(list(current_gen))
-        next_gen = [0] * WIDTH
-        for i in range(WIDTH):
+        next_gen = [0] * width
+        for i in range(width):
             left = current_gen[i - 1] if i > 0 else 0
             center = current_gen[i]
-            right = current_gen[i + 1] if i < WIDTH - 1 else 0
+            right = current_gen[i + 1] if i < width - 1 else 0
             neighborhood = (left, center, right)
             next_gen[i] = RULES.get(neighborhood, 0)
         current_gen = next_gen
 
-    print(f"Writing image data to {OUTPUT_FILENAME}...")
+    print(f"Writing image data to {output_filename}...")
     try:
-        with open(OUTPUT_FILENAME, "w") as f:
+        with open(output_filename, "w") as f:
             f.write("P1\n")
-            f.write(f"{WIDTH} {HEIGHT}\n")
+            f.write(f"{width} {height}\n")
             for row in image_data:
                 f.write(" ".join(map(str, row)) + "\n")
-        print(f"Successfully generated {OUTPUT_FILENAME}")
+        print(f"Successfully generated {output_filename}")
         print("You can view this file with a standard image viewer.")
     except IOError as e:
         print(f"Error writing to file: {e}")
 
 
+def pack_row(cells):
+    """Packs a sequence of 0/1 cells into big-endian uint64 words (MSB is the leftmost cell)."""
+    packed = np.packbits(np.asarray(cells, dtype=np.uint8))
+    padded = np.zeros(-(-len(packed) // 8) * 8, dtype=np.uint8)
+    padded[: len(packed)] = packed
+    return padded.view(">u8").astype(np.uint64)
+
+
+def row_mask(width):
+    """Returns the word mask that keeps only the bits of real cells in a packed row."""
+    mask = np.full(-(-width // 64), np.uint64(0xFFFFFFFFFFFFFFFF), dtype=np.uint64)
+    tail = width % 64
+    if tail:
+        mask[-1] = np.uint64(((1 << tail) - 1) << (64 - tail))
+    return mask
+
+
+def step_packed(words, rule, mask):
+    """Computes the next generation of a packed row for any elementary rule number."""
+    one = np.uint64(1)
+    top = np.uint64(63)
+    left = words >> one
+    left[1:] |= words[:-1] << top
+    right = words << one
+    right[:-1] |= words[1:] >> top
+
+    next_words = np.zeros_like(words)
+    for pattern in range(8):
+        if not (rule >> pattern) & 1:
+            continue
+        term = left if pattern & 4 else ~left
+        term = term & (words if pattern & 2 else ~words)
+        term &= right if pattern & 1 else ~right
+        next_words |= term
+    next_words &= mask
+    return next_words
+
+
+def generate_image_packed(width=WIDTH, height=HEIGHT, output_filename=OUTPUT_FILENAME, rule=RULE_NUMBER):
+    """Simulates an elementary cellular automaton on packed bitsets and streams rows to a binary P4 PBM."""
+    if not 0 <= rule <= 255:
+        print(f"Error: rule number must be between 0 and 255, got {rule}.")
+        return
+    cells = np.zeros(width, dtype=np.uint8)
+    cells[-1] = 1
+    words = pack_row(cells)
+    mask = row_mask(width)
+    row_bytes = -(-width // 8)
+
+    print(f"Simulating {height} generations of Rule {rule} (packed)...")
+    try:
+        with open(output_filename, "wb") as f:
+            f.write(f"P4\n{width} {height}\n".encode("ascii"))
+            for _ in range(height):
+                f.write(words.astype(">u8").tobytes()[:row_bytes])
+                words = step_packed(words, rule, mask)
+        print(f"Successfully generated {output_filename}")
+    except IOError as e:
+        print(f"Error writing to file: {e}")
+
+
+def read_pbm_pixels(filename):
+    """Reads a P1 or P4 PBM file into a 2D uint8 array of 0/1 pixels."""
+    with open(filename, "rb") as f:
+        data = f.read()
+    magic, width, height, body = data.split(maxsplit=3)
+    width, height = int(width), int(height)
+    if magic == b"P1":
+        values = np.frombuffer(body.replace(b" ", b"").replace(b"\n", b""), dtype=np.uint8) - ord("0")
+        return values.reshape(height, width)
+    rows = np.frombuffer(body, dtype=np.uint8).reshape(height, -1)
+    return np.unpackbits(rows, axis=1)[:, :width]
+
+
+def benchmark():
+    """Compares the list-based loop with the packed engine and checks both images are identical.
+
+    The benchmark images go to a temporary directory that is removed afterwards."""
+    with tempfile.TemporaryDirectory(prefix="rule110_bench_") as temp_dir:
+        print(f"{'size':>12} {'list (s)':>10} {'packed (s)':>11} {'speedup':>8}")
+        for width, height in BENCHMARK_SIZES:
+            list_file = os.path.join(temp_dir, f"list_{width}x{height}.pbm")
+            packed_file = os.path.join(temp_dir, f"packed_{width}x{height}.pbm")
+
+            start = time.perf_counter()
+            generate_image(width, height, list_file)
+            list_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            generate_image_packed(width, height, packed_file)
+            packed_time = time.perf_counter() - start
+
+            if not np.array_equal(read_pbm_pixels(list_file), read_pbm_pixels(packed_file)):
+                print(f"Error: images differ for {width}x{height}.")
+            size = f"{width}x{height}"
+            print(f"{size:>12} {list_time:>10.3f} {packed_time:>11.3f} {list_time / packed_time:>7.1f}x")
+
+
 if __name__ == "__main__":
-    generate_image()
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--packed":
+        try:
+            options = dict(zip(("width", "height", "rule"), (int(arg) for arg in sys.argv[2:5])))
+        except ValueError:
+            print(f"Usage: python {sys.argv[0]} --packed [WIDTH HEIGHT [RULE]]")
+            sys.exit(1)
+        generate_image_packed(**options)
+    else:
+        generate_image()
@@ -1,37 +1,134 @@
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+
 from flask import Flask, redirect, render_template, request, url_for
 
 app = Flask(__name__, template_folder=".")
 
-tasks = []
-task_id_counter = 1
+DATABASE = os.environ.get("TODO_DATABASE", "todo.sqlite3")
+PAGE_SIZE = 50
+WRITE_BATCH_SIZE = 256
+
+
+class TaskStore:
+    """SQLite task store in WAL mode with per-thread read connections and a group-committing writer thread."""
+
+    def __init__(self, database):
+        self.database = database
+        self.local = threading.local()
+        self.writes = queue.Queue()
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, content TEXT NOT NULL, completed INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.commit()
+        conn.close()
+        threading.Thread(target=self._writer, daemon=True).start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.database, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self.local.conn = conn
+        return conn
+
+    @staticmethod
+    def _commit(conn, batch):
+        """Runs the writes of batch in one transaction and returns the error that rolled it back, if any."""
+        try:
+            with conn:
+                for sql, params, _ in batch:
+                    conn.execute(sql, params)
+        except sqlite3.Error as e:
+            return e
+        return None
+
+    def _writer(self):
+        conn = self._connect()
+        while True:
+            batch = [self.writes.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self.writes.get_nowait())
+                except queue.Empty:
+                    break
+            error = self._commit(conn, batch)
+            if error is None or len(batch) == 1:
+                errors = [error] * len(batch)
+            else:
+                # One bad statement rolled back the whole batch: commit each write on its own so only it fails.
+                app.logger.warning(f"Failed to write batch of {len(batch)} task changes, retrying one by one: {error}")
+                errors = [self._commit(conn, [write]) for write in batch]
+            for (_, _, future), error in zip(batch, errors):
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+    def _write(self, sql, params):
+        """Queues a write and waits until the batch containing it has been committed.
+
+        Raises the sqlite3.Error that kept this write from being committed."""
+        future = Future()
+        self.writes.put((sql, params, future))
+        future.result()
+
+    def page(self, after_id=0, limit=PAGE_SIZE):
+        """Returns up to limit tasks with id greater than after_id, and whether more follow."""
+        rows = (
+            self._reader()
+            .execute("SELECT id, content, completed FROM tasks WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit + 1))
+            .fetchall()
+        )
+        return rows[:limit], len(rows) > limit
+
+    def add(self, content):
+        self._write("INSERT INTO tasks (content) VALUES (?)", (content,))
+
+    def delete(self, task_id):
+        self._write("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def toggle(self, task_id):
+        self._write("UPDATE tasks SET completed = NOT completed WHERE id = ?", (task_id,))
+
+
+store = TaskStore(DATABASE)
 
 
 @app.route("/", methods=["GET", "POST"])
 def index():
-    global task_id_counter
     if request.method == "POST":
         task_content = request.form["content"]
         if task_content:
-            tasks.append({"id": task_id_counter, "content": task_content, "completed": False})
-            task_id_counter += 1
+            store.add(task_content)
         return redirect(url_for("index"))
-    return render_template("1754578830.html", tasks=tasks)
+    after_id = request.args.get("after", 0, type=int)
+    tasks, has_more = store.page(after_id)
+    next_after = tasks[-1]["id"] if has_more else None
+    return render_template("1754578830.html", tasks=tasks, after_id=after_id, next_after=next_after)
 
 
 @app.route("/delete/<int:task_id>", methods=["POST"])
 def delete_task(task_id):
-    global tasks
-    tasks = [task for task in tasks if task["id"] != task_id]
-    return redirect(url_for("index"))
+    store.delete(task_id)
+    return redirect(url_for("index", after=request.args.get("after", type=int)))
 
 
 @app.route("/update/<int:task_id>", methods=["POST"])
 def update_task(task_id):
-    for task in tasks:
-        if task["id"] == task_id:
-            task["completed"] = not task["completed"]
-            break
-    return redirect(url_for("index"))
+    store.toggle(task_id)
+    return redirect(url_for("index", after=request.args.get("after", type=int)))
 
 
 if __name__ == "__main__":
@@ -1,13 +1,25 @@
 import datetime
+import hashlib
 import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
 
-from flask import Flask, redirect, render_template, request, url_for
+from flask import Flask, make_response, redirect, render_template, request, url_for
 from flask_httpauth import HTTPBasicAuth
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import and_, or_
 from werkzeug.security import check_password_hash, generate_password_hash
 
+LOAD_TEST = "--load-test" in sys.argv
+PAGE_SIZE = 20
+PAGE_CACHE_SIZE = 256
+LOAD_TEST_POSTS = 100_000
+LOAD_TEST_SECONDS = 5
+
 app = Flask(__name__, template_folder=".")
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///blog.db"
+app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///blog_loadtest.db" if LOAD_TEST else "sqlite:///blog.db"
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 db = SQLAlchemy(app)
 auth = HTTPBasicAuth()
@@ -16,6 +28,12 @@ auth = HTTPBasicAuth()
 admin_password = secrets.token_urlsafe(16)
 users = {"admin": generate_password_hash(admin_password)}
 
+# Rendered index pages for anonymous readers, keyed by cursor and holding (etag, html).
+page_cache = OrderedDict()
+page_cache_lock = threading.Lock()
+# Bumped by every invalidation, so a page rendered from posts read before one is not cached after it.
+page_cache_generation = 0
+
 
 @auth.verify_password
 def verify_password(username, password):
@@ -28,6 +46,7 @@ class Post(db.Model):
     """Model for a blog post."""
 
     __tablename__ = "posts"
+    __table_args__ = (db.Index("ix_posts_date_posted_id", "date_posted", "id"),)
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     content = db.Column(db.Text, nullable=False)
@@ -42,15 +61,80 @@ def create_tables():
     """Create database tables."""
     with app.app_context():
         db.create_all()
+        # create_all() skips indexes of tables that already exist, so add them to older databases here.
+        for index in Post.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
     print("Database tables created.")
 
 
+def invalidate_page_cache():
+    """Drops every cached index page after posts change."""
+    global page_cache_generation
+    with page_cache_lock:
+        page_cache.clear()
+        page_cache_generation += 1
+
+
+def parse_cursor(cursor):
+    """Parses a 'before' cursor of the form '<ISO date>_<post id>'."""
+    try:
+        date_text, post_id = cursor.rsplit("_", 1)
+        return datetime.datetime.fromisoformat(date_text), int(post_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def load_page(cursor):
+    """Loads one page of posts, newest first, starting after the cursor, using the (date_posted, id) index."""
+    query = Post.query.order_by(Post.date_posted.desc(), Post.id.desc())
+    parsed = parse_cursor(cursor)
+    if parsed:
+        date_posted, post_id = parsed
+        query = query.filter(
+            or_(Post.date_posted < date_posted, and_(Post.date_posted == date_posted, Post.id < post_id))
+        )
+    posts = query.limit(PAGE_SIZE + 1).all()
+    next_cursor = None
+    if len(posts) > PAGE_SIZE:
+        posts = posts[:PAGE_SIZE]
+        next_cursor = f"{posts[-1].date_posted.isoformat()}_{posts[-1].id}"
+    return posts, next_cursor
+
+
+def render_page(cursor, user):
+    posts, next_cursor = load_page(cursor)
+    return render_template("1754665230.html", posts=posts, user=user, cursor=cursor, next_cursor=next_cursor)
+
+
 @app.route("/")
 @auth.login_required(optional=True)
 def index():
     """Homepage. Anyone can view posts."""
-    posts = Post.query.order_by(Post.date_posted.desc()).all()
-    return render_template("1754665230.html", posts=posts, user=auth.current_user())
+    user = auth.current_user()
+    cursor = request.args.get("before", "")
+    if user:
+        return render_page(cursor, user)
+
+    with page_cache_lock:
+        cached = page_cache.get(cursor)
+        if cached:
+            page_cache.move_to_end(cursor)
+        generation = page_cache_generation
+    if cached is None:
+        html = render_page(cursor, None)
+        cached = (hashlib.sha1(html.encode("utf-8")).hexdigest(), html)
+        with page_cache_lock:
+            # Posts changed while this page was rendering, so it may already be stale: serve it, don't cache it.
+            if generation == page_cache_generation:
+                page_cache[cursor] = cached
+                if len(page_cache) > PAGE_CACHE_SIZE:
+                    page_cache.popitem(last=False)
+
+    etag, html = cached
+    response = make_response(html)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
 
 
 @app.route("/post", methods=["GET", "POST"])
@@ -65,6 +149,7 @@ def post_article():
         new_post = Post(title=title, content=content, author=author)
         db.session.add(new_post)
         db.session.commit()
+        invalidate_page_cache()
         return redirect(url_for("index"))
 
     return render_template("1754665231.html")
@@ -79,6 +164,7 @@ def edit_post(post_id):
         post.title = request.form["title"]
         post.content = request.form["content"]
         db.session.commit()
+        invalidate_page_cache()
         return redirect(url_for("index"))
 
     return render_template("1754665231.html", post=post)
@@ -91,10 +177,72 @@ def delete_post(post_id):
     post = Post.query.get_or_404(post_id)
     db.session.delete(post)
     db.session.commit()
+    invalidate_page_cache()
     return redirect(url_for("index"))
 
 
+def measure_rps(client, path, headers=None, seconds=LOAD_TEST_SECONDS):
+    """Issues GET requests for the given number of seconds and returns requests per second."""
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        client.get(path, headers=headers)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def load_test():
+    """Seeds the load-test database with posts and measures index requests per second before and after."""
+    create_tables()
+    with app.app_context():
+        existing = Post.query.count()
+        if existing < LOAD_TEST_POSTS:
+            print(f"Seeding {LOAD_TEST_POSTS - existing} posts...")
+            base = datetime.datetime(2025, 1, 1)
+            db.session.execute(
+                Post.__table__.insert(),
+                [
+                    {
+                        "title": f"Post {i}",
+                        "content": f"Body of post {i}. " * 20,
+                        "author": "admin",
+                        "date_posted": base + datetime.timedelta(minutes=i),
+                    }
+                    for i in range(existing, LOAD_TEST_POSTS)
+                ],
+            )
+            db.session.commit()
+
+    with app.test_request_context("/"):
+        start = time.perf_counter()
+        posts = Post.query.order_by(Post.date_posted.desc()).all()
+        render_template("1754665230.html", posts=posts, user=None, cursor="", next_cursor=None)
+        before = 1 / (time.perf_counter() - start)
+
+    client = app.test_client()
+    invalidate_page_cache()
+    uncached = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < LOAD_TEST_SECONDS:
+        invalidate_page_cache()
+        client.get("/")
+        uncached += 1
+    uncached /= time.perf_counter() - start
+    cached = measure_rps(client, "/")
+    etag = client.get("/").headers["ETag"]
+    not_modified = measure_rps(client, "/", headers={"If-None-Match": etag})
+
+    print(f"Before (all {LOAD_TEST_POSTS} posts per request): {before:.2f} req/s")
+    print(f"After, cache miss (one indexed page): {uncached:.1f} req/s")
+    print(f"After, cache hit: {cached:.1f} req/s")
+    print(f"After, 304 Not Modified: {not_modified:.1f} req/s")
+
+
 if __name__ == "__main__":
+    if LOAD_TEST:
+        load_test()
+        sys.exit(0)
+
     from waitress import serve
 
     create_tables()
@@ -1,13 +1,17 @@
-import base64
+import hashlib
 import io
 import os
+import threading
+from collections import OrderedDict
 
-from flask import Flask, render_template, request, send_file
+from flask import Flask, abort, render_template, request, send_file
 from PIL import Image
 from werkzeug.utils import secure_filename
 
 app = Flask(__name__, template_folder=".")
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp", "avif"}
+DITHER_PARAMS = "L/1/FLOYDSTEINBERG"
+CACHE_MAX_BYTES = 256 * 1024 * 1024
 
 
 def is_allowed_file(filename):
@@ -15,6 +19,52 @@ def is_allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+class ResultCache:
+    """Thread-safe LRU cache of PNG bytes, bounded by the total size of the stored values."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= sum(len(data) for data in old.values())
+            self.entries[key] = value
+            self.total_bytes += sum(len(data) for data in value.values())
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= sum(len(data) for data in evicted.values())
+
+
+results = ResultCache(CACHE_MAX_BYTES)
+
+
+def convert_image(original_image_bytes):
+    """Returns the original preview and the dithered image as PNG bytes."""
+    image = Image.open(io.BytesIO(original_image_bytes))
+
+    original_preview_io = io.BytesIO()
+    if hasattr(image, "n_frames") and image.n_frames > 1:
+        image.seek(0)
+    image.save(original_preview_io, "PNG")
+
+    converted_image = image.convert("L").convert("1", dither=Image.Dither.FLOYDSTEINBERG)
+    converted_io = io.BytesIO()
+    converted_image.save(converted_io, "PNG")
+    return {"original": original_preview_io.getvalue(), "converted": converted_io.getvalue()}
+
+
 @app.route("/", methods=["GET", "POST"])
 def upload_and_convert():
     """Route for handling image upload and conversion preview."""
@@ -30,26 +80,12 @@ def upload_and_convert():
                 output_filename = f"{filename_base}_dithered_1bit.png"
 
                 original_image_bytes = file.read()
-                image = Image.open(io.BytesIO(original_image_bytes))
-
-                original_preview_io = io.BytesIO()
-                if hasattr(image, "n_frames") and image.n_frames > 1:
-                    image.seek(0)
-                image.save(original_preview_io, "PNG")
-                original_preview_io.seek(0)
-                original_image_b64 = base64.b64encode(original_preview_io.getvalue()).decode("utf-8")
-
-                converted_image = image.convert("L").convert("1", dither=Image.Dither.FLOYDSTEINBERG)
-                converted_io = io.BytesIO()
-                converted_image.save(converted_io, "PNG")
-                converted_io.seek(0)
-                converted_image_b64 = base64.b64encode(converted_io.getvalue()).decode("utf-8")
-                return render_template(
-                    "1754751630.html",
-                    original_image_data=original_image_b64,
-                    converted_image_data=converted_image_b64,
-                    output_filename=output_filename,
-                )
+                digest = hashlib.sha256(original_image_bytes)
+                digest.update(DITHER_PARAMS.encode("utf-8"))
+                key = digest.hexdigest()
+                if results.get(key) is None:
+                    results.put(key, convert_image(original_image_bytes))
+                return render_template("1754751630.html", key=key, output_filename=output_filename)
             except Exception as e:
                 return render_template("1754751630.html", error=f"An error occurred during image processing: {e}")
         else:
@@ -60,19 +96,24 @@ def upload_and_convert():
     return render_template("1754751630.html")
 
 
-@app.route("/download", methods=["POST"])
-def download():
+@app.route("/image/<key>/<any(original, converted):kind>.png")
+def image(key, kind):
+    """Route for serving a cached preview image by its content hash."""
+    entry = results.get(key)
+    if entry is None:
+        abort(404)
+    response = send_file(io.BytesIO(entry[kind]), mimetype="image/png", etag=f"{key}-{kind}", max_age=86400)
+    return response.make_conditional(request)
+
+
+@app.route("/download/<key>")
+def download(key):
     """Route for downloading the converted image."""
-    try:
-        b64_data = request.form.get("image_data")
-        filename = request.form.get("filename", "converted_image.png")
-        if not b64_data:
-            return render_template("1754751630.html", error="No image data to download.")
-        image_data = base64.b64decode(b64_data)
-        img_io = io.BytesIO(image_data)
-        return send_file(img_io, mimetype="image/png", as_attachment=True, download_name=filename)
-    except Exception as e:
-        return render_template("1754751630.html", error=f"An error occurred during download: {e}")
+    entry = results.get(key)
+    if entry is None:
+        return render_template("1754751630.html", error="The converted image has expired. Please upload it again.")
+    filename = secure_filename(request.args.get("filename", "")) or "converted_image.png"
+    return send_file(io.BytesIO(entry["converted"]), mimetype="image/png", as_attachment=True, download_name=filename)
 
 
 if __name__ == "__main__":
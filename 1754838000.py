@@ -1,16 +1,26 @@
-from urllib.parse import urljoin
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
 
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
 BASE_URL = "https://omocoro.jp/"
+HEADERS = {"User-Agent": "curl/8.5.0"}
+MAX_PAGES = 5
+PER_HOST_LIMIT = 4
+CACHE_FILE = "mp3_url_cache.json"
 
 
 def get_soup(url):
     """Get a BeautifulSoup object from a URL."""
-    headers = {"User-Agent": "curl/8.5.0"}
     try:
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=HEADERS)
         response.raise_for_status()
         return BeautifulSoup(response.content, "html.parser")
     except requests.exceptions.RequestException as e:
@@ -22,7 +32,7 @@ def scrape_tag(tag_name):
     """Scrape MP3s from the page of a specified tag."""
     page_url = urljoin(BASE_URL, f"tag/{tag_name}/")
 
-    for _ in range(5):
+    for _ in range(MAX_PAGES):
         if not page_url:
             break
 
@@ -51,14 +61,119 @@ def scrape_tag(tag_name):
             page_url = None
 
 
+class Crawler:
+    """Crawls tag pages over a shared keep-alive session with concurrent article fetches and an MP3 URL cache."""
+
+    def __init__(self, base_url=BASE_URL, per_host=PER_HOST_LIMIT, cache_file=CACHE_FILE):
+        self.base_url = base_url
+        self.per_host = per_host
+        self.cache_file = cache_file
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=per_host + 1)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.host_limits = defaultdict(lambda: threading.BoundedSemaphore(per_host))
+        self.host_limits_lock = threading.Lock()
+        self.cache = self._load_cache()
+
+    def _load_cache(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def save_cache(self):
+        if not self.cache_file:
+            return
+        temp_file = self.cache_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(self.cache, f)
+        os.replace(temp_file, self.cache_file)
+
+    def get_soup(self, url):
+        """Get a BeautifulSoup object from a URL, holding the per-host limit during the request."""
+        with self.host_limits_lock:
+            limit = self.host_limits[urlsplit(url).netloc]
+        try:
+            with limit:
+                response = self.session.get(url)
+                response.raise_for_status()
+                content = response.content
+            return BeautifulSoup(content, "html.parser")
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching URL {url}: {e}", file=sys.stderr)
+            return None
+
+    def find_mp3_url(self, article_url):
+        """Returns the MP3 URL of an article, or None when it has none or cannot be fetched."""
+        if article_url in self.cache:
+            return self.cache[article_url]
+        article_soup = self.get_soup(article_url)
+        if not article_soup:
+            return None
+        mp3_url = None
+        mp3_link = article_soup.select_one('a[href$=".mp3"]')
+        if mp3_link and mp3_link.get("href"):
+            mp3_url = urljoin(self.base_url, mp3_link.get("href"))
+        self.cache[article_url] = mp3_url
+        return mp3_url
+
+    def crawl_tag(self, tag_name, max_pages=MAX_PAGES):
+        """Yields MP3 URLs of a tag in listing order, prefetching the next listing page while articles load."""
+        page_url = urljoin(self.base_url, f"tag/{tag_name}/")
+        with (
+            ThreadPoolExecutor(max_workers=1) as listing_pool,
+            ThreadPoolExecutor(max_workers=self.per_host) as article_pool,
+        ):
+            pending_page = listing_pool.submit(self.get_soup, page_url)
+            for _ in range(max_pages):
+                soup = pending_page.result() if pending_page else None
+                pending_page = None
+                if not soup:
+                    break
+
+                article_links = soup.select("div.boxs div.title > a")
+                if not article_links:
+                    break
+
+                next_page_link = soup.select_one("div.page-navi span + a")
+                if next_page_link and next_page_link.get("href"):
+                    next_page_url = urljoin(self.base_url, next_page_link.get("href"))
+                    pending_page = listing_pool.submit(self.get_soup, next_page_url)
+
+                article_urls = [urljoin(self.base_url, link.get("href")) for link in article_links]
+                for mp3_url in article_pool.map(self.find_mp3_url, article_urls):
+                    if mp3_url:
+                        yield mp3_url
+                self.save_cache()
+
+
 def main():
     """Main process."""
+    args = sys.argv[1:]
+    crawl = "--crawl" in args
+    per_host = PER_HOST_LIMIT
+    if "--per-host" in args:
+        try:
+            per_host = int(args[args.index("--per-host") + 1])
+        except (IndexError, ValueError):
+            print(f"Usage: python {sys.argv[0]} [--crawl [--per-host N]]")
+            return
+
     tag_name = input("Please enter a tag: ")
     if not tag_name:
         print("No tag entered.")
         return
 
-    scrape_tag(tag_name)
+    if crawl:
+        for mp3_url in Crawler(per_host=per_host).crawl_tag(tag_name):
+            print(mp3_url)
+    else:
+        scrape_tag(tag_name)
 
 
 if __name__ == "__main__":
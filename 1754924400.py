@@ -1,5 +1,7 @@
 import math
+import sys
 
+import numpy as np
 from PIL import Image, ImageDraw
 
 IMG_WIDTH = 1280
@@ -27,17 +29,8 @@ def create_hexagon_vertices(center_x, center_y, radius):
     return vertices
 
 
-def main():
-    img = Image.new("P", (IMG_WIDTH, IMG_HEIGHT))
-    palette = []
-    for color in COLORS:
-        for value in color:
-            palette.append(value)
-    img.putpalette(palette)
-
-    draw = ImageDraw.Draw(img)
-    draw.rectangle([0, 0, IMG_WIDTH, IMG_HEIGHT], fill=3)
-
+def draw_hexagons(draw):
+    """Draws the hexagons one by one."""
     hex_width = HEX_RADIUS * 2
     hex_height = math.sqrt(3) * HEX_RADIUS
     horiz_dist = hex_width * 3 / 4
@@ -56,6 +49,55 @@ def main():
             color_index = COLOR_MAP[c % 2][r % len(COLOR_MAP[0])]
             draw.polygon(vertices, fill=color_index)
 
+
+def draw_hexagons_vectorized(draw):
+    """Draws the same hexagons in the same order, computing all vertices at once with NumPy."""
+    hex_width = HEX_RADIUS * 2
+    hex_height = math.sqrt(3) * HEX_RADIUS
+    horiz_dist = hex_width * 3 / 4
+    vert_dist = hex_height
+    num_cols = int(IMG_WIDTH / horiz_dist) + 2
+    num_rows = int(IMG_HEIGHT / vert_dist) + 2
+
+    c, r = np.meshgrid(np.arange(num_cols), np.arange(num_rows), indexing="ij")
+    c = c.ravel()
+    r = r.ravel()
+    cx = c * horiz_dist
+    cy = np.where(c % 2 != 0, r * vert_dist + vert_dist / 2, r * vert_dist)
+    angles = [math.pi / 180 * (60 * i) for i in range(6)]
+    xs = np.stack([cx + HEX_RADIUS * math.cos(angle) for angle in angles], axis=1)
+    ys = np.stack([cy + HEX_RADIUS * math.sin(angle) for angle in angles], axis=1)
+    # ImageDraw truncates vertices to int, so truncate here as well and pass flat point lists.
+    points = np.trunc(np.stack([xs, ys], axis=2).reshape(len(c), -1))
+    colors = np.array(COLOR_MAP)[c % 2, r % len(COLOR_MAP[0])]
+    for vertices, color_index in zip(points.tolist(), colors.tolist()):
+        draw.polygon(vertices, fill=color_index)
+
+
+def render(vectorized=True):
+    img = Image.new("P", (IMG_WIDTH, IMG_HEIGHT))
+    palette = []
+    for color in COLORS:
+        for value in color:
+            palette.append(value)
+    img.putpalette(palette)
+
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, IMG_WIDTH, IMG_HEIGHT], fill=3)
+    if vectorized:
+        draw_hexagons_vectorized(draw)
+    else:
+        draw_hexagons(draw)
+    return img
+
+
+def main():
+    if "--check" in sys.argv[1:]:
+        same = render(vectorized=True).tobytes() == render(vectorized=False).tobytes()
+        print("Vectorized and per-hexagon drawing match." if same else "Vectorized drawing differs!")
+        sys.exit(0 if same else 1)
+
+    img = render()
     output_filename = "hexagonal_tiling_2bit.png"
     img.save(output_filename)
     print(f"Saved image as '{output_filename}'.")
@@ -1,6 +1,11 @@
 import math
+import struct
+import sys
+import time
+import zlib
 
 import click
+import numpy as np
 from PIL import Image, ImageDraw
 
 
@@ -73,6 +78,204 @@ def draw_triangles(draw, width, height, size, palette_map):
             draw.polygon([p1, p2, p3], fill=fill_color)
 
 
+# The NumPy renderer computes square tiles per pixel. Hexagon and triangle vertices are computed for
+# all tiles at once and truncated to int exactly like ImageDraw.polygon does, so the polygons can be
+# filled stripe by stripe with integer row offsets and still match the ImageDraw renderer pixel for pixel.
+HEX_COLOR_MAP = [
+    [0, 1, 2],
+    [2, 0, 1],
+]
+HEX_ANGLES = [math.radians(60 * i) for i in range(6)]
+# Shifting either lattice right by three tile sizes (two hexagon columns, six triangle columns) maps every tile
+# onto one with the same color and, once rounding no longer moves the truncated vertices, the same shape.
+LATTICE_PERIODS = 3
+HEX_PERIOD_COLUMNS = 2
+TRIANGLE_PERIOD_COLUMNS = 6
+CHECK_CASES = [(320, 200, 60), (333, 217, 7), (257, 129, 2), (640, 480, 13)]
+BENCHMARK_CASES = [(640, 480, 20), (1280, 720, 60), (1920, 1080, 10), (4096, 4096, 8)]
+
+
+def hexagon_columns(width, size):
+    """Returns the truncated x of the six vertices of every hexagon column, as draw_hexagons() computes them."""
+    horiz_dist = 2 * size * 3 / 4
+    cx = np.arange(int(width / horiz_dist) + 2) * horiz_dist
+    return np.trunc(np.stack([cx + size * math.cos(angle) for angle in HEX_ANGLES], axis=1)).astype(np.int64)
+
+
+def triangle_columns(width, size):
+    """Returns the truncated x of the three vertices of every triangle column, starting at column -2."""
+    s = size
+    cx = np.arange(-2, int(width / (s / 2)) + 2) * s / 2
+    return np.trunc(np.stack([cx, cx + s / 2, cx - s / 2], axis=1)).astype(np.int64)
+
+
+def hexagon_tiles(width, height, size, y_start=0, y_stop=None):
+    """Returns the truncated vertices and colors of the hexagons in draw_hexagons() order.
+
+    Only tile rows that can reach image rows [y_start, y_stop) are generated."""
+    s = size
+    h = math.sqrt(3) * s
+    vert_dist = h
+    columns = hexagon_columns(width, size)
+    num_rows = int(height / vert_dist) + 2
+    y_stop = height if y_stop is None else y_stop
+    first_row = max(int(y_start // vert_dist) - 2, 0)
+    last_row = min(int(y_stop // vert_dist) + 2, num_rows)
+
+    c, r = np.meshgrid(np.arange(len(columns)), np.arange(first_row, last_row), indexing="ij")
+    c = c.ravel()
+    r = r.ravel()
+    cy = r * vert_dist
+    cy = np.where(c % 2 != 0, cy + vert_dist / 2, cy)
+    ys = np.stack([cy + s * math.sin(angle) for angle in HEX_ANGLES], axis=1)
+    colors = np.array(HEX_COLOR_MAP, dtype=np.uint8)[c % 2, r % len(HEX_COLOR_MAP[0])]
+    return columns[c], np.trunc(ys).astype(np.int64), colors
+
+
+def triangle_tiles(width, height, size, y_start=0, y_stop=None):
+    """Returns the truncated vertices and colors of the triangles in draw_triangles() order.
+
+    Only tile rows that can reach image rows [y_start, y_stop) are generated."""
+    s = size
+    h = s * math.sqrt(3) / 2
+    columns = triangle_columns(width, size)
+    y_stop = height if y_stop is None else y_stop
+    first_row = max(int(y_start // h) - 2, -2)
+    last_row = min(int(y_stop // h) + 2, int(height / h) + 2)
+    r, c = np.meshgrid(np.arange(first_row, last_row), np.arange(-2, len(columns) - 2), indexing="ij")
+    r = r.ravel()
+    c = c.ravel()
+    cy = r * h
+    up = (c + r) % 2 == 0
+    apex_y = np.where(up, cy - h / 2, cy + h / 2)
+    base_y = np.where(up, cy + h / 2, cy - h / 2)
+    ys = np.stack([apex_y, base_y, base_y], axis=1)
+    colors = ((c - r) % 3).astype(np.uint8)
+    return columns[c + 2], np.trunc(ys).astype(np.int64), colors
+
+
+def periodic_from(columns, period_columns, period):
+    """Returns the first x from which every tile is an exact copy of the one period_columns to its left.
+
+    Tiles cut by x = 0 truncate toward zero, and near the origin cx + size * cos(angle) can round onto the
+    integer below, so the first columns are not translates of each other; this finds where that stops."""
+    broken = np.ones(len(columns), bool)
+    broken[period_columns:] = np.any(columns[period_columns:] != columns[:-period_columns] + period, axis=1)
+    return int(columns[broken].max()) + 1
+
+
+def fill_tiles(img, xs, ys, colors, y_offset=0):
+    """Fills tiles whose vertices are already truncated, shifted up by y_offset rows."""
+    draw = ImageDraw.Draw(img)
+    visible = (ys.max(axis=1) >= y_offset) & (ys.min(axis=1) < y_offset + img.height)
+    points = np.stack([xs[visible], ys[visible] - y_offset], axis=2).reshape(np.count_nonzero(visible), -1)
+    for tile_points, color in zip(points.astype(np.float64).tolist(), colors[visible].tolist()):
+        draw.polygon(tile_points, fill=color)
+
+
+def render_rows(shape, width, height, size, y_start, y_stop, background=0):
+    """Renders rows [y_start, y_stop) of a tiling as palette indices.
+
+    Squares are two alternating row templates picked by each row's lattice index. Hexagons and triangles
+    repeat every LATTICE_PERIODS * size pixels right of periodic_from(), so only a strip one period wider than
+    that is filled with ImageDraw; every pixel right of the strip is copied from the column whole periods
+    to its left."""
+    if shape == "square":
+        cols = (np.arange(width) // size % 2).astype(np.uint8)
+        return np.stack([cols, 1 - cols])[np.arange(y_start, y_stop) // size % 2]
+    period = LATTICE_PERIODS * size
+    if shape == "hexagon":
+        tile_rows, start = hexagon_tiles, periodic_from(hexagon_columns(width, size), HEX_PERIOD_COLUMNS, period)
+    else:
+        tile_rows = triangle_tiles
+        start = periodic_from(triangle_columns(width, size), TRIANGLE_PERIOD_COLUMNS, period)
+    strip = min(width, start + period)
+    img = Image.new("P", (strip, y_stop - y_start), background)
+    fill_tiles(img, *tile_rows(strip, height, size, y_start, y_stop), y_offset=y_start)
+    rows = np.asarray(img)
+    if strip == width:
+        return rows
+    x = np.arange(width)
+    return rows[:, np.where(x < strip, x, strip - period + (x - strip) % period)]
+
+
+def render_pil(shape, width, height, size, background=0):
+    """Renders a tiling with one ImageDraw call per tile and returns its palette indices."""
+    img = Image.new("P", (width, height), background)
+    draw = ImageDraw.Draw(img)
+    if shape == "square":
+        draw_squares(draw, width, height, size, {0: 0, 1: 1})
+    elif shape == "hexagon":
+        draw_hexagons(draw, width, height, size, {0: 0, 1: 1, 2: 2})
+    elif shape == "triangle":
+        draw_triangles(draw, width, height, size, {0: 0, 1: 1, 2: 2})
+    return np.asarray(img)
+
+
+def png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def save_png_striped(output, shape, width, height, size, palette_data, stripe_rows, background=0):
+    """Renders and writes a palette PNG stripe by stripe, so memory stays proportional to one stripe."""
+    colors = max(min(len(palette_data) // 3, 256), 1)
+    bits = 1 if colors <= 2 else 2 if colors <= 4 else 4 if colors <= 16 else 8
+    per_byte = 8 // bits
+    compressor = zlib.compressobj(6)
+    with open(output, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, bits, 3, 0, 0, 0)))
+        f.write(png_chunk(b"PLTE", bytes(palette_data[: colors * 3])))
+        for y_start in range(0, height, stripe_rows):
+            y_stop = min(y_start + stripe_rows, height)
+            stripe = render_rows(shape, width, height, size, y_start, y_stop, background)
+            padded = np.zeros((len(stripe), -(-width // per_byte) * per_byte), dtype=np.uint8)
+            padded[:, :width] = stripe
+            packed = np.zeros((len(stripe), padded.shape[1] // per_byte), dtype=np.uint8)
+            for i in range(per_byte):
+                packed |= padded[:, i::per_byte] << (8 - bits * (i + 1))
+            raw = np.hstack([np.zeros((len(stripe), 1), dtype=np.uint8), packed])
+            data = compressor.compress(raw.tobytes())
+            if data:
+                f.write(png_chunk(b"IDAT", data))
+        f.write(png_chunk(b"IDAT", compressor.flush()))
+        f.write(png_chunk(b"IEND", b""))
+
+
+def check_renderers():
+    """Verifies that the NumPy renderer is pixel-identical to the ImageDraw renderer."""
+    ok = True
+    for shape in ("square", "hexagon", "triangle"):
+        for width, height, size in CHECK_CASES:
+            expected = render_pil(shape, width, height, size)
+            actual = render_rows(shape, width, height, size, 0, height)
+            striped = np.vstack(
+                [render_rows(shape, width, height, size, y, min(y + 37, height)) for y in range(0, height, 37)]
+            )
+            same = np.array_equal(expected, actual) and np.array_equal(expected, striped)
+            ok &= same
+            status = "ok" if same else f"MISMATCH ({np.count_nonzero(expected != actual)} pixels)"
+            click.echo(f"{shape:>8} {width}x{height} size {size}: {status}")
+    return ok
+
+
+def run_benchmark():
+    """Times the ImageDraw renderer against the NumPy renderer for a range of sizes."""
+    click.echo(f"{'shape':>8} {'image':>10} {'size':>5} {'pil (s)':>9} {'numpy (s)':>10} {'speedup':>8}")
+    for shape in ("square", "hexagon", "triangle"):
+        for width, height, size in BENCHMARK_CASES:
+            start = time.perf_counter()
+            render_pil(shape, width, height, size)
+            pil_time = time.perf_counter() - start
+            start = time.perf_counter()
+            render_rows(shape, width, height, size, 0, height)
+            numpy_time = time.perf_counter() - start
+            image = f"{width}x{height}"
+            click.echo(
+                f"{shape:>8} {image:>10} {size:>5} {pil_time:>9.3f} {numpy_time:>10.3f} {pil_time / numpy_time:>7.1f}x"
+            )
+
+
 @click.command(context_settings=dict(help_option_names=["-h", "--help"]))
 @click.option(
     "--shape",
@@ -96,8 +299,29 @@ def draw_triangles(draw, width, height, size, palette_map):
     default=None,
     help="Output filename. If not specified, it is generated from the shape (e.g. hexagonal_tiling_2bit.png).",
 )
-def generate(shape, width, height, size, output):
+@click.option(
+    "--renderer",
+    type=click.Choice(["numpy", "pil"], case_sensitive=False),
+    default="numpy",
+    show_default=True,
+    help="Render all tiles at once with NumPy, or draw them one by one with ImageDraw.",
+)
+@click.option(
+    "--stripe-rows",
+    type=int,
+    default=0,
+    help="Render and write the PNG in stripes of N rows, for images larger than memory. NumPy renderer only.",
+)
+@click.option("--check", is_flag=True, help="Verify that the NumPy renderer matches ImageDraw pixel for pixel.")
+@click.option("--benchmark", is_flag=True, help="Compare renderer speed for a range of image and tile sizes.")
+def generate(shape, width, height, size, output, renderer, stripe_rows, check, benchmark):
     """Generates a tessellation image with triangles, squares, or hexagons."""
+    if check:
+        sys.exit(0 if check_renderers() else 1)
+    if benchmark:
+        run_benchmark()
+        return
+
     if output is None:
         if shape == "triangle":
             name = "triangular"
@@ -116,19 +340,31 @@ def generate(shape, width, height, size, output):
     for color in COLORS:
         palette_data.extend(color)
 
-    img = Image.new("P", (width, height))
-    img.putpalette(palette_data)
-    draw = ImageDraw.Draw(img)
+    if stripe_rows > 0 and renderer == "numpy":
+        try:
+            save_png_striped(output, shape, width, height, size, palette_data, stripe_rows)
+            click.echo(f"Image saved to '{output}'.")
+        except (IOError, ValueError) as e:
+            click.echo(f"Error: Failed to save image. {e}", err=True)
+        return
 
-    palette_map_3color = {0: 0, 1: 1, 2: 2}
-    palette_map_2color = {0: 0, 1: 1}
+    if renderer == "numpy":
+        img = Image.fromarray(render_rows(shape, width, height, size, 0, height), "P")
+        img.putpalette(palette_data)
+    else:
+        img = Image.new("P", (width, height))
+        img.putpalette(palette_data)
+        draw = ImageDraw.Draw(img)
 
-    if shape == "square":
-        draw_squares(draw, width, height, size, palette_map_2color)
-    elif shape == "hexagon":
-        draw_hexagons(draw, width, height, size, palette_map_3color)
-    elif shape == "triangle":
-        draw_triangles(draw, width, height, size, palette_map_3color)
+        palette_map_3color = {0: 0, 1: 1, 2: 2}
+        palette_map_2color = {0: 0, 1: 1}
+
+        if shape == "square":
+            draw_squares(draw, width, height, size, palette_map_2color)
+        elif shape == "hexagon":
+            draw_hexagons(draw, width, height, size, palette_map_3color)
+        elif shape == "triangle":
+            draw_triangles(draw, width, height, size, palette_map_3color)
 
     try:
         img.save(output)
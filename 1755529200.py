@@ -1,150 +1,305 @@
+import sys
+import time
+
+import numpy as np
 import pyxel
 
+SCREEN_W = 160
+SCREEN_H = 120
+BULLET_W, BULLET_H = 2, 4
+ENEMY_W, ENEMY_H = 8, 8
+BULLET_SPEED = 4
+GRID_STRIDE = 1 << 24
+GRID_OFFSET = 1 << 12
+BENCHMARK_SIZE = 2048
+BENCHMARK_COUNTS = [1000, 5000, 20000]
+BENCHMARK_FRAMES = 200
 
-class App:
-    def __init__(self):
-        pyxel.init(160, 120, title="Pyxel Shooting", fps=60)
 
-        pyxel.sounds[0].set("a3a2c1g1", "p", "7", "v", 5)
-        pyxel.sounds[1].set("g2g1g1f1", "t", "7", "vs", 10)
-        pyxel.sounds[2].set("c2c1g1g0", "n", "7", "v", 20)
+class EntityStore:
+    """NumPy columns for x, y, vx, vy and an alive flag, with freed slots reused by later spawns."""
+
+    def __init__(self, capacity=64):
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def _grow(self):
+        old = len(self.x)
+        for name in ("x", "y", "vx", "vy", "alive"):
+            column = getattr(self, name)
+            grown = np.zeros(old * 2, dtype=column.dtype)
+            grown[:old] = column
+            setattr(self, name, grown)
+        self.free[:0] = range(old * 2 - 1, old - 1, -1)
+
+    def spawn(self, x, y, vx=0.0, vy=0.0):
+        if not self.free:
+            self._grow()
+        slot = self.free.pop()
+        self.x[slot] = x
+        self.y[slot] = y
+        self.vx[slot] = vx
+        self.vy[slot] = vy
+        self.alive[slot] = True
+        return slot
+
+    def kill(self, slots):
+        self.alive[slots] = False
+        self.free.extend(slots.tolist())
+
+    def indices(self):
+        return np.flatnonzero(self.alive)
+
+
+def cell_keys(x, y, cell):
+    # Offsetting keeps cells of slightly negative coordinates positive before they are packed into one key.
+    return (
+        (np.floor(y / cell).astype(np.int64) + GRID_OFFSET) * GRID_STRIDE
+        + np.floor(x / cell).astype(np.int64)
+        + GRID_OFFSET
+    )
+
+
+def collide_pairs(ax, ay, aw, ah, bx, by, bw, bh):
+    """Returns index arrays (i, j) of every overlapping pair of boxes a[i], b[j].
+
+    The b boxes are bucketed into a uniform grid of cells at least as large as any box, stored as sorted
+    cell keys, so each a box only has to look up the 3x3 cells around its own."""
+    cell = max(aw, ah, bw, bh)
+    b_keys = cell_keys(bx, by, cell)
+    order = np.argsort(b_keys, kind="stable")
+    sorted_keys = b_keys[order]
+    a_keys = cell_keys(ax, ay, cell)
+    pairs_i = []
+    pairs_j = []
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            keys = a_keys + dy * GRID_STRIDE + dx
+            lo = np.searchsorted(sorted_keys, keys, side="left")
+            counts = np.searchsorted(sorted_keys, keys, side="right") - lo
+            i = np.repeat(np.arange(len(ax)), counts)
+            offsets = np.arange(len(i)) - np.repeat(np.cumsum(counts) - counts, counts)
+            pairs_i.append(i)
+            pairs_j.append(order[np.repeat(lo, counts) + offsets])
+    i = np.concatenate(pairs_i)
+    j = np.concatenate(pairs_j)
+    overlap = (ax[i] < bx[j] + bw) & (ax[i] + aw > bx[j]) & (ay[i] < by[j] + bh) & (ay[i] + ah > by[j])
+    return i[overlap], j[overlap]
+
+
+class ShooterWorld:
+    """Game state and rules on array-backed entities, independent of Pyxel."""
 
+    def __init__(self, width=SCREEN_W, height=SCREEN_H):
+        self.width = width
+        self.height = height
         self.restart()
-        pyxel.run(self.update, self.draw)
 
     def restart(self):
         """Initialize the game state."""
-        self.player_x = 76
-        self.player_y = 110
+        self.player_x = self.width // 2 - 4
+        self.player_y = self.height - 10
         self.player_w = 8
         self.player_h = 8
 
-        self.bullets = []
-        self.enemies = []
+        self.bullets = EntityStore()
+        self.enemies = EntityStore()
         self.explosions = []
 
         self.score = 0
         self.lives = 3
         self.game_over = False
 
+    def fire(self):
+        self.bullets.spawn(self.player_x + self.player_w / 2 - 1, self.player_y)
+
+    def spawn_enemy(self, x, vx, vy):
+        self.enemies.spawn(x, 0, vx, vy)
+
+    def step(self):
+        """Moves bullets and enemies, resolves collisions and culls, and returns (enemies shot, player hits)."""
+        bullets = self.bullets.indices()
+        self.bullets.y[bullets] -= BULLET_SPEED
+
+        enemies = self.enemies.indices()
+        ex, ey, evx = self.enemies.x, self.enemies.y, self.enemies.vx
+        ex[enemies] += evx[enemies]
+        ey[enemies] += self.enemies.vy[enemies]
+        bounced = enemies[(ex[enemies] < 0) | (ex[enemies] + ENEMY_W > self.width)]
+        evx[bounced] *= -1
+
+        enemy_x = ex[enemies]
+        enemy_y = ey[enemies]
+        bullet_y = self.bullets.y[bullets]
+        shot_bullets, shot_enemies = collide_pairs(
+            self.bullets.x[bullets], bullet_y, BULLET_W, BULLET_H, enemy_x, enemy_y, ENEMY_W, ENEMY_H
+        )
+        self.score += 100 * len(shot_enemies)
+        self.explosions.extend(
+            [x, y, 0] for x, y in zip(enemy_x[shot_enemies].tolist(), enemy_y[shot_enemies].tolist())
+        )
+        bullet_hit = np.zeros(len(bullets), dtype=bool)
+        bullet_hit[shot_bullets] = True
+        enemy_hit = np.zeros(len(enemies), dtype=bool)
+        enemy_hit[shot_enemies] = True
+
+        touching = (
+            ~enemy_hit
+            & (self.player_x < enemy_x + ENEMY_W)
+            & (self.player_x + self.player_w > enemy_x)
+            & (self.player_y < enemy_y + ENEMY_H)
+            & (self.player_y + self.player_h > enemy_y)
+        )
+        player_hits = 0
+        for j in np.flatnonzero(touching).tolist():
+            enemy_hit[j] = True
+            self.lives -= 1
+            player_hits += 1
+            self.explosions.append([self.player_x, self.player_y, 0])
+            if self.lives <= 0:
+                self.game_over = True
+                break
+
+        if not self.game_over:
+            self.bullets.kill(bullets[bullet_hit | (bullet_y <= -BULLET_H)])
+            self.enemies.kill(enemies[enemy_hit | (enemy_y >= self.height)])
+        self.update_explosions()
+        return len(shot_enemies), player_hits
+
+    def update_explosions(self):
+        """Update explosion effects."""
+        self.explosions = [ex for ex in self.explosions if ex[2] < 15]
+        for ex in self.explosions:
+            ex[2] += 1
+
+
+class App:
+    def __init__(self):
+        pyxel.init(SCREEN_W, SCREEN_H, title="Pyxel Shooting", fps=60)
+
+        pyxel.sounds[0].set("a3a2c1g1", "p", "7", "v", 5)
+        pyxel.sounds[1].set("g2g1g1f1", "t", "7", "vs", 10)
+        pyxel.sounds[2].set("c2c1g1g0", "n", "7", "v", 20)
+
+        self.restart()
+        pyxel.run(self.update, self.draw)
+
+    def restart(self):
+        """Initialize the game state."""
+        self.world = ShooterWorld()
+
     def update(self):
         """Update the game logic."""
-        if self.game_over:
+        world = self.world
+        if world.game_over:
             if pyxel.btnp(pyxel.KEY_RETURN):
                 self.restart()
             return
 
-        self.update_player()
-        self.update_bullets_and_enemies()
-        self.update_explosions()
-
-    def update_player(self):
-        """Update the player's state."""
         if pyxel.btn(pyxel.KEY_LEFT):
-            self.player_x = max(self.player_x - 2, 0)
+            world.player_x = max(world.player_x - 2, 0)
         if pyxel.btn(pyxel.KEY_RIGHT):
-            self.player_x = min(self.player_x + 2, pyxel.width - self.player_w)
-
+            world.player_x = min(world.player_x + 2, pyxel.width - world.player_w)
         if pyxel.btnp(pyxel.KEY_SPACE):
-            self.bullets.append([self.player_x + self.player_w / 2 - 1, self.player_y])
+            world.fire()
             pyxel.play(0, 0)
 
-    def update_bullets_and_enemies(self):
-        """Update bullets and enemies, and perform collision detection."""
-        bullet_w, bullet_h = 2, 4
-        enemy_w, enemy_h = 8, 8
-
-        for b in self.bullets:
-            b[1] -= 4
-
         if pyxel.frame_count % 30 == 0:
             vy = pyxel.rndf(0.5, 1.5)
             vx = pyxel.rndf(-1.0, 1.0)
-            self.enemies.append([pyxel.rndi(0, pyxel.width - enemy_w), 0, vy, vx])
-
-        for e in self.enemies:
-            e[0] += e[3]
-            e[1] += e[2]
-            if e[0] < 0 or e[0] + enemy_w > pyxel.width:
-                e[3] *= -1
-
-        bullets_hit = set()
-        enemies_hit = set()
-
-        for i, b in enumerate(self.bullets):
-            for j, e in enumerate(self.enemies):
-                if (
-                    b[0] < e[0] + enemy_w
-                    and b[0] + bullet_w > e[0]
-                    and b[1] < e[1] + enemy_h
-                    and b[1] + bullet_h > e[1]
-                ):
-                    bullets_hit.add(i)
-                    enemies_hit.add(j)
-                    self.score += 100
-                    self.explosions.append([e[0], e[1], 0])
-                    pyxel.play(0, 1)
-
-        for j, e in enumerate(self.enemies):
-            if j in enemies_hit:
-                continue
-
-            # Player-enemy collision
-            if (
-                self.player_x < e[0] + enemy_w
-                and self.player_x + self.player_w > e[0]
-                and self.player_y < e[1] + enemy_h
-                and self.player_y + self.player_h > e[1]
-            ):
-                enemies_hit.add(j)  # Mark enemy as hit
-                self.lives -= 1
-                self.explosions.append([self.player_x, self.player_y, 0])
-                pyxel.play(0, 2)
-
-                if self.lives <= 0:
-                    self.game_over = True
-                    break
-
-        if self.game_over:
-            return
-        self.bullets = [b for i, b in enumerate(self.bullets) if i not in bullets_hit and b[1] > -bullet_h]
-        self.enemies = [e for j, e in enumerate(self.enemies) if j not in enemies_hit and e[1] < pyxel.height]
+            world.spawn_enemy(pyxel.rndi(0, pyxel.width - ENEMY_W), vx, vy)
 
-    def update_explosions(self):
-        """Update explosion effects."""
-        self.explosions = [ex for ex in self.explosions if ex[2] < 15]
-        for ex in self.explosions:
-            ex[2] += 1
+        enemies_shot, player_hits = world.step()
+        if enemies_shot:
+            pyxel.play(0, 1)
+        if player_hits:
+            pyxel.play(0, 2)
 
     def draw(self):
         """Draw the screen."""
+        world = self.world
         pyxel.cls(1)
         pyxel.tri(
-            self.player_x,
-            self.player_y + self.player_h,
-            self.player_x + self.player_w,
-            self.player_y + self.player_h,
-            self.player_x + self.player_w / 2,
-            self.player_y,
+            world.player_x,
+            world.player_y + world.player_h,
+            world.player_x + world.player_w,
+            world.player_y + world.player_h,
+            world.player_x + world.player_w / 2,
+            world.player_y,
             11,
         )
-        for b in self.bullets:
-            pyxel.rect(b[0], b[1], 2, 4, 7)
+        bullets = world.bullets.indices()
+        for x, y in zip(world.bullets.x[bullets].tolist(), world.bullets.y[bullets].tolist()):
+            pyxel.rect(x, y, 2, 4, 7)
 
-        for e in self.enemies:
-            pyxel.tri(e[0], e[1], e[0] + 8, e[1], e[0] + 4, e[1] + 8, 8)
+        enemies = world.enemies.indices()
+        for x, y in zip(world.enemies.x[enemies].tolist(), world.enemies.y[enemies].tolist()):
+            pyxel.tri(x, y, x + 8, y, x + 4, y + 8, 8)
 
-        for ex in self.explosions:
+        for ex in world.explosions:
             frame = ex[2]
             color = 7 if frame < 5 else (10 if frame < 10 else 9)
             radius = frame / 2
             pyxel.circb(ex[0] + 4, ex[1] + 4, radius, color)
-        pyxel.text(5, 5, f"SCORE: {self.score:05}", 7)
-        pyxel.text(5, 15, f"LIVES: {self.lives}", 7)
+        pyxel.text(5, 5, f"SCORE: {world.score:05}", 7)
+        pyxel.text(5, 15, f"LIVES: {world.lives}", 7)
 
-        if self.game_over:
+        if world.game_over:
             pyxel.text(pyxel.width / 2 - 24, pyxel.height / 2 - 8, "GAME OVER", pyxel.frame_count % 16)
             pyxel.text(pyxel.width / 2 - 44, pyxel.height / 2 + 4, "PRESS ENTER TO RESTART", 7)
 
 
-App()
+def benchmark():
+    """Drives ShooterWorld headless with thousands of entities and prints frame times."""
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        ax, ay, bx, by = (rng.uniform(-20, 200, 300) for _ in range(4))
+        i, j = collide_pairs(ax, ay, BULLET_W, BULLET_H, bx, by, ENEMY_W, ENEMY_H)
+        brute = (
+            (ax[:, None] < bx[None, :] + ENEMY_W)
+            & (ax[:, None] + BULLET_W > bx[None, :])
+            & (ay[:, None] < by[None, :] + ENEMY_H)
+            & (ay[:, None] + BULLET_H > by[None, :])
+        )
+        assert set(zip(i.tolist(), j.tolist())) == set(zip(*np.nonzero(brute))), "grid and brute force disagree"
+    print("Grid broad phase pairs match brute force.")
+
+    for count in BENCHMARK_COUNTS:
+        world = ShooterWorld(BENCHMARK_SIZE, BENCHMARK_SIZE)
+        world.lives = float("inf")
+        frame_times = []
+        for _ in range(BENCHMARK_FRAMES):
+            start = time.perf_counter()
+            missing = count - int(world.enemies.alive.sum())
+            for x, vx, vy in zip(
+                rng.uniform(0, BENCHMARK_SIZE - ENEMY_W, missing).tolist(),
+                rng.uniform(-1.0, 1.0, missing).tolist(),
+                rng.uniform(0.5, 1.5, missing).tolist(),
+            ):
+                world.spawn_enemy(x, vx, vy)
+            for x, y in zip(
+                rng.uniform(0, BENCHMARK_SIZE, count // 20).tolist(),
+                rng.uniform(0, BENCHMARK_SIZE, count // 20).tolist(),
+            ):
+                world.bullets.spawn(x, y)
+            world.step()
+            world.explosions.clear()
+            frame_times.append(time.perf_counter() - start)
+        frame_times.sort()
+        entities = int(world.enemies.alive.sum() + world.bullets.alive.sum())
+        p50 = frame_times[len(frame_times) // 2] * 1000
+        p95 = frame_times[int(len(frame_times) * 0.95)] * 1000
+        print(
+            f"{count} enemies ({entities} entities): p50 {p50:.2f} ms, p95 {p95:.2f} ms per frame, score {world.score}"
+        )
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
+    else:
+        App()
@@ -1,5 +1,264 @@
+import heapq
+import random
+import sys
+import time
+from collections import deque
+
 import pyxel
 
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+BENCHMARK_GRIDS = [16, 64, 256, 1024]
+BENCHMARK_TICKS = 200_000
+
+
+class SnakeBody:
+    """The snake's cells, head first, in a deque, with an occupancy bitmap and an index of free cells.
+
+    Cells are numbered y * cols + x. Free cells are kept in a list plus each cell's position in it, so
+    occupying a cell is a swap-remove and food can be drawn uniformly from the list in O(1)."""
+
+    def __init__(self, cols, rows, cells):
+        self.cols = cols
+        self.rows = rows
+        self.cells = deque()
+        self.occupied = bytearray(cols * rows)
+        self.free = list(range(cols * rows))
+        self.free_pos = list(range(cols * rows))
+        for cell in cells:
+            self.cells.append(cell)
+            self._occupy(cell)
+
+    def _occupy(self, cell):
+        self.occupied[cell] = 1
+        i = self.free_pos[cell]
+        last = self.free.pop()
+        if last != cell:
+            self.free[i] = last
+            self.free_pos[last] = i
+
+    def _release(self, cell):
+        self.occupied[cell] = 0
+        self.free_pos[cell] = len(self.free)
+        self.free.append(cell)
+
+    @property
+    def head(self):
+        return self.cells[0]
+
+    def push_head(self, cell):
+        self.cells.appendleft(cell)
+        self._occupy(cell)
+
+    def pop_tail(self):
+        self._release(self.cells.pop())
+
+    def random_free_cell(self, randint):
+        """Returns a uniformly chosen free cell, or None when the snake fills the board."""
+        if not self.free:
+            return None
+        return self.free[randint(0, len(self.free) - 1)]
+
+
+class SnakeGame:
+    """Snake rules on a cols x rows grid of cells, independent of Pyxel."""
+
+    def __init__(self, cols, rows, initial_length, randint):
+        self.cols = cols
+        self.rows = rows
+        self.randint = randint
+        start_x = cols // 2
+        start_y = rows // 2
+        self.body = SnakeBody(cols, rows, [start_y * cols + start_x - i for i in range(initial_length)])
+        self.direction = (1, 0)
+        self.food = self.body.random_free_cell(randint)
+        self.score = 0
+        self.game_over = False
+
+    def cell_xy(self, cell):
+        return cell % self.cols, cell // self.cols
+
+    def step(self, direction):
+        """Moves the snake one cell; the game ends on a wall, the snake's own body, or a full board."""
+        self.direction = direction
+        head_x, head_y = self.cell_xy(self.body.head)
+        x = head_x + direction[0]
+        y = head_y + direction[1]
+        if not (0 <= x < self.cols and 0 <= y < self.rows):
+            self.game_over = True
+            return
+        new_head = y * self.cols + x
+        if self.body.occupied[new_head]:
+            self.game_over = True
+            return
+
+        self.body.push_head(new_head)
+        if new_head == self.food:
+            self.score += 1
+            self.food = self.body.random_free_cell(self.randint)
+            if self.food is None:
+                self.game_over = True
+        else:
+            self.body.pop_tail()
+
+
+def hamiltonian_cycle(cols, rows):
+    """Returns the successor of each cell on a Hamiltonian cycle, or None when rows is odd.
+
+    The cycle runs along every row except column 0 in a zig-zag and returns to the top along column 0."""
+    if rows % 2 or cols < 2:
+        return None
+    order = []
+    for y in range(rows):
+        xs = range(1, cols) if y % 2 == 0 else range(cols - 1, 0, -1)
+        order.extend(y * cols + x for x in xs)
+    order.extend(y * cols for y in range(rows - 1, -1, -1))
+    successor = [0] * (cols * rows)
+    for cell, next_cell in zip(order, order[1:] + order[:1]):
+        successor[cell] = next_cell
+    return successor
+
+
+class Autopilot:
+    """Steers a SnakeGame along a Hamiltonian cycle when the body lies on one, otherwise along shortest paths."""
+
+    def __init__(self, game, mode="hamiltonian"):
+        self.game = game
+        self.successor = None
+        if mode == "hamiltonian":
+            self.successor = self._aligned_cycle()
+        self.path = deque()
+        self.path_food = None
+        self.search_after = 0
+
+    def _aligned_cycle(self):
+        successor = hamiltonian_cycle(self.game.cols, self.game.rows)
+        if successor is None:
+            return None
+        cells = list(self.game.body.cells)
+        for candidate in (successor, self._reversed(successor)):
+            if all(candidate[cells[i + 1]] == cells[i] for i in range(len(cells) - 1)):
+                return candidate
+        return None
+
+    @staticmethod
+    def _reversed(successor):
+        predecessor = [0] * len(successor)
+        for cell, next_cell in enumerate(successor):
+            predecessor[next_cell] = cell
+        return predecessor
+
+    def next_direction(self):
+        game = self.game
+        head = game.body.head
+        if self.successor is not None:
+            return self._direction_to(head, self.successor[head])
+        if game.food != self.path_food:
+            self.path = deque()
+            self.path_food = game.food
+            self.search_after = 0
+        if not self.path and game.food is not None:
+            if self.search_after:
+                self.search_after -= 1
+            else:
+                blockers = set()
+                self.path = self._shortest_path(head, game.food, blockers)
+                if not self.path:
+                    self.search_after = self._ticks_until_freed(blockers)
+        if self.path:
+            return self._direction_to(head, self.path.popleft())
+        # No path to the food: take any free neighbour and hope the tail opens one up.
+        for cell in self._neighbours(head):
+            if not game.body.occupied[cell]:
+                return self._direction_to(head, cell)
+        return game.direction
+
+    def _ticks_until_freed(self, blockers):
+        """Returns how many more ticks the first of blockers to leave the tail stays in the body.
+
+        While the food is out of reach nothing is eaten, so the tail frees one cell per tick, and the wall
+        between the head and the food cannot open before one of its cells is freed."""
+        for ticks, cell in enumerate(reversed(self.game.body.cells)):
+            if cell in blockers:
+                return ticks
+        return 0
+
+    def _direction_to(self, cell, next_cell):
+        x, y = self.game.cell_xy(cell)
+        next_x, next_y = self.game.cell_xy(next_cell)
+        return next_x - x, next_y - y
+
+    def _neighbours(self, cell):
+        cols = self.game.cols
+        x = cell % cols
+        if x + 1 < cols:
+            yield cell + 1
+        if x > 0:
+            yield cell - 1
+        if cell + cols < cols * self.game.rows:
+            yield cell + cols
+        if cell >= cols:
+            yield cell - cols
+
+    def _shortest_path(self, start, goal, blockers=None):
+        """Returns the cells of a shortest path from start to goal around the body, without start.
+
+        A* on Manhattan distance: a BFS that expands cells closest to the food first, so on an open board
+        it explores little more than the path instead of everything within reach of the head. A flood fill
+        from the goal takes one step per expansion until the search reaches it, so a goal shut in a pocket
+        costs about the pocket's size. With no path, the body cells walling in whichever side ran out first
+        are added to blockers."""
+        if goal is None:
+            return deque()
+        cols = self.game.cols
+        goal_x, goal_y = goal % cols, goal // cols
+        occupied = self.game.body.occupied
+        parent = {start: None}
+        distance = {start: 0}
+        frontier = [(0, start)]
+        walls = set()
+        pocket = {goal}
+        pocket_frontier = deque([goal])
+        pocket_walls = set()
+        while frontier:
+            if pocket_frontier is not None:
+                if not pocket_frontier:
+                    walls = pocket_walls
+                    break
+                for neighbour in self._neighbours(pocket_frontier.popleft()):
+                    if neighbour in distance:
+                        pocket_frontier = None
+                        break
+                    if neighbour in pocket:
+                        continue
+                    if occupied[neighbour]:
+                        pocket_walls.add(neighbour)
+                        continue
+                    pocket.add(neighbour)
+                    pocket_frontier.append(neighbour)
+            _, cell = heapq.heappop(frontier)
+            if cell == goal:
+                path = deque()
+                while cell != start:
+                    path.appendleft(cell)
+                    cell = parent[cell]
+                return path
+            next_distance = distance[cell] + 1
+            for neighbour in self._neighbours(cell):
+                if occupied[neighbour]:
+                    walls.add(neighbour)
+                    continue
+                if distance.get(neighbour, next_distance + 1) <= next_distance:
+                    continue
+                if pocket_frontier is not None and neighbour in pocket:
+                    pocket_frontier = None
+                distance[neighbour] = next_distance
+                parent[neighbour] = cell
+                estimate = abs(neighbour % cols - goal_x) + abs(neighbour // cols - goal_y)
+                heapq.heappush(frontier, (next_distance + estimate, neighbour))
+        if blockers is not None:
+            blockers.update(walls)
+        return deque()
+
 
 class App:
     """A simple Snake game implementation using Pyxel."""
@@ -22,75 +281,58 @@ class App:
 
     def reset_game(self):
         """Resets the game state to its initial conditions."""
-        self.snake = []
-        start_x = (self.SCREEN_WIDTH // self.GRID_SIZE // 2) * self.GRID_SIZE
-        start_y = (self.SCREEN_HEIGHT // self.GRID_SIZE // 2) * self.GRID_SIZE
-        for i in range(self.SNAKE_INITIAL_LENGTH):
-            self.snake.append([start_x - i * self.GRID_SIZE, start_y])
-
-        self.direction = (self.GRID_SIZE, 0)
-        self.food = self._generate_food_position()
-        self.score = 0
-        self.game_over = False
+        self.game = SnakeGame(
+            self.SCREEN_WIDTH // self.GRID_SIZE,
+            self.SCREEN_HEIGHT // self.GRID_SIZE,
+            self.SNAKE_INITIAL_LENGTH,
+            pyxel.rndi,
+        )
+        self.direction = self.game.direction
         self.next_direction = self.direction
-
-    def _generate_food_position(self):
-        """Generates a random position for the food, ensuring it's not on the snake."""
-        while True:
-            fx = pyxel.rndi(0, (self.SCREEN_WIDTH // self.GRID_SIZE) - 1) * self.GRID_SIZE
-            fy = pyxel.rndi(0, (self.SCREEN_HEIGHT // self.GRID_SIZE) - 1) * self.GRID_SIZE
-            food_pos = [fx, fy]
-            if food_pos not in self.snake:
-                return food_pos
+        self.autopilot = None
 
     def update(self):
         """Updates the game state based on user input and game logic."""
-        if pyxel.btnp(pyxel.KEY_RETURN) and self.game_over:
+        if pyxel.btnp(pyxel.KEY_RETURN) and self.game.game_over:
             self.reset_game()
             return
 
-        if self.game_over:
+        if self.game.game_over:
             return
+        if pyxel.btnp(pyxel.KEY_A):
+            self.autopilot = None if self.autopilot else Autopilot(self.game, "path")
         if pyxel.btnp(pyxel.KEY_UP) and self.direction[1] == 0:
-            self.next_direction = (0, -self.GRID_SIZE)
+            self.next_direction = (0, -1)
         elif pyxel.btnp(pyxel.KEY_DOWN) and self.direction[1] == 0:
-            self.next_direction = (0, self.GRID_SIZE)
+            self.next_direction = (0, 1)
         elif pyxel.btnp(pyxel.KEY_LEFT) and self.direction[0] == 0:
-            self.next_direction = (-self.GRID_SIZE, 0)
+            self.next_direction = (-1, 0)
         elif pyxel.btnp(pyxel.KEY_RIGHT) and self.direction[0] == 0:
-            self.next_direction = (self.GRID_SIZE, 0)
+            self.next_direction = (1, 0)
 
         if pyxel.frame_count % self.UPDATE_SPEED == 0:
+            if self.autopilot:
+                self.next_direction = self.autopilot.next_direction()
             self.direction = self.next_direction
-            head_x, head_y = self.snake[0]
-            new_head = [head_x + self.direction[0], head_y + self.direction[1]]
-
-            if not (0 <= new_head[0] < self.SCREEN_WIDTH and 0 <= new_head[1] < self.SCREEN_HEIGHT):
-                self.game_over = True
-                return
-            if new_head in self.snake:
-                self.game_over = True
-                return
-
-            self.snake.insert(0, new_head)
-
-            if new_head == self.food:
-                self.score += 1
-                self.food = self._generate_food_position()
-            else:
-                self.snake.pop()
+            self.game.step(self.direction)
 
     def draw(self):
         """Draws all game elements on the screen."""
         pyxel.cls(0)
-        for x, y in self.snake:
-            pyxel.rect(x, y, self.GRID_SIZE, self.GRID_SIZE, 3)
+        game = self.game
+        for cell in game.body.cells:
+            x, y = game.cell_xy(cell)
+            pyxel.rect(x * self.GRID_SIZE, y * self.GRID_SIZE, self.GRID_SIZE, self.GRID_SIZE, 3)
 
-        pyxel.rect(self.food[0], self.food[1], self.GRID_SIZE, self.GRID_SIZE, 8)
+        if game.food is not None:
+            x, y = game.cell_xy(game.food)
+            pyxel.rect(x * self.GRID_SIZE, y * self.GRID_SIZE, self.GRID_SIZE, self.GRID_SIZE, 8)
 
-        pyxel.text(5, 5, f"SCORE: {self.score}", 7)
+        pyxel.text(5, 5, f"SCORE: {game.score}", 7)
+        if self.autopilot:
+            pyxel.text(self.SCREEN_WIDTH - 25, 5, "AUTO", 7)
 
-        if self.game_over:
+        if game.game_over:
             pyxel.text(
                 (self.SCREEN_WIDTH - (len(self.GAME_OVER_TEXT) * 4)) // 2,
                 self.SCREEN_HEIGHT // 2 - 10,
@@ -105,4 +347,34 @@ class App:
             )
 
 
-App()
+def benchmark(mode, grids=BENCHMARK_GRIDS, ticks=BENCHMARK_TICKS, seed=0):
+    """Runs the autopilot headless on square grids and prints ticks per second."""
+    for size in grids:
+        rng = random.Random(seed)
+        game = SnakeGame(size, size, 3, rng.randint)
+        autopilot = Autopilot(game, mode)
+        steered = "hamiltonian" if autopilot.successor is not None else "shortest path"
+        start = time.perf_counter()
+        done = 0
+        while done < ticks and not game.game_over:
+            game.step(autopilot.next_direction())
+            done += 1
+        elapsed = time.perf_counter() - start
+        result = "board filled" if game.food is None else ("died" if game.game_over else "running")
+        print(
+            f"{size}x{size} ({steered}): {done} ticks in {elapsed:.2f} s ({done / elapsed:.0f} ticks/s), "
+            f"length {len(game.body.cells)}, {result}"
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--autopilot" in args:
+        i = args.index("--autopilot")
+        mode = args[i + 1] if i + 1 < len(args) else "hamiltonian"
+        if mode not in ("hamiltonian", "path"):
+            print(f"Usage: python {sys.argv[0]} [--autopilot hamiltonian|path]")
+            sys.exit(1)
+        benchmark(mode)
+    else:
+        App()
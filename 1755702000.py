@@ -1,89 +1,327 @@
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import pyxel
 
+BOARD_WIDTH = 10
+BOARD_HEIGHT = 20
+SPAWN_X = BOARD_WIDTH // 2 - 2
+
+TETROMINOS = [
+    {"shape": [[0, 0, 0, 0], [1, 1, 1, 1], [0, 0, 0, 0], [0, 0, 0, 0]], "color": 1},
+    {"shape": [[0, 0, 0, 0], [0, 1, 1, 0], [0, 1, 1, 0], [0, 0, 0, 0]], "color": 2},
+    {"shape": [[0, 0, 0, 0], [1, 1, 1, 0], [0, 1, 0, 0], [0, 0, 0, 0]], "color": 3},
+    {"shape": [[0, 0, 0, 0], [0, 1, 1, 0], [1, 1, 0, 0], [0, 0, 0, 0]], "color": 4},
+    {"shape": [[0, 0, 0, 0], [1, 1, 0, 0], [0, 1, 1, 0], [0, 0, 0, 0]], "color": 5},
+    {"shape": [[0, 0, 0, 0], [1, 0, 0, 0], [1, 1, 1, 0], [0, 0, 0, 0]], "color": 6},
+    {"shape": [[0, 0, 0, 0], [0, 0, 1, 0], [1, 1, 1, 0], [0, 0, 0, 0]], "color": 7},
+]
+LINE_SCORES = [0, 100, 300, 500, 800]
+
+# Board rows are ints with bit WALL + x set when column x is filled. WALL bits on either side are always set,
+# so a piece pushed past the left or right edge collides like it would with a filled cell.
+WALL = 4
+FIELD_MASK = ((1 << BOARD_WIDTH) - 1) << WALL
+EMPTY_ROW = ((1 << (BOARD_WIDTH + 2 * WALL)) - 1) & ~FIELD_MASK
+FULL_ROW = EMPTY_ROW | FIELD_MASK
+
+# Placement evaluation weights (Pierre Dellacherie's features with El-Tetris' tuned weights).
+WEIGHT_LANDING_HEIGHT = -4.500158825082766
+WEIGHT_ERODED_CELLS = 3.4181268101392694
+WEIGHT_ROW_TRANSITIONS = -3.2178882868487753
+WEIGHT_COLUMN_TRANSITIONS = -9.348695305445199
+WEIGHT_HOLES = -7.899265427351652
+WEIGHT_WELLS = -3.3855972247263626
+
+AUTO_PLAY_INTERVAL = 3
+BATCH_GAMES = 1000
+BATCH_MAX_PIECES = 2000
+
+
+def rotate_shape(shape):
+    """Rotates a 4x4 shape a quarter turn clockwise."""
+    new_shape = [[0 for _ in range(4)] for _ in range(4)]
+    for y in range(4):
+        for x in range(4):
+            new_shape[x][3 - y] = shape[y][x]
+    return new_shape
+
+
+def shape_rows(shape):
+    """Returns the filled rows of a 4x4 shape as (row offset, mask) pairs, bit x set for column x."""
+    rows = []
+    for y in range(4):
+        mask = sum(1 << x for x in range(4) if shape[y][x])
+        if mask:
+            rows.append((y, mask))
+    return tuple(rows)
+
+
+def build_rotations():
+    """Precomputes the four rotations of every tetromino and the indices of the distinct ones."""
+    rotations = []
+    distinct = []
+    for tetromino in TETROMINOS:
+        shape = tetromino["shape"]
+        piece_rotations = []
+        piece_distinct = []
+        seen = set()
+        for rotation in range(4):
+            rows = shape_rows(shape)
+            piece_rotations.append(rows)
+            # A rotation is a duplicate if it fills the same cells up to a translation.
+            top = rows[0][0]
+            left = min((mask & -mask).bit_length() - 1 for _, mask in rows)
+            normalized = tuple((y - top, mask >> left) for y, mask in rows)
+            if normalized not in seen:
+                seen.add(normalized)
+                piece_distinct.append(rotation)
+            shape = rotate_shape(shape)
+        rotations.append(tuple(piece_rotations))
+        distinct.append(tuple(piece_distinct))
+    return tuple(rotations), tuple(distinct)
+
+
+ROTATIONS, DISTINCT_ROTATIONS = build_rotations()
+
+
+def shape_cells(piece, rotation):
+    """Yields the (x, y) cells of a piece rotation within its 4x4 box."""
+    for dy, mask in ROTATIONS[piece][rotation]:
+        for x in range(4):
+            if mask >> x & 1:
+                yield x, dy
+
+
+def new_board():
+    return (EMPTY_ROW,) * BOARD_HEIGHT
+
+
+def collides(board, piece, rotation, x, y):
+    """Returns True if the piece overlaps a filled cell, a wall, or lies above or below the board."""
+    shift = x + WALL
+    for dy, mask in ROTATIONS[piece][rotation]:
+        row = y + dy
+        if not 0 <= row < BOARD_HEIGHT or board[row] & (mask << shift):
+            return True
+    return False
+
+
+def drop(board, piece, rotation, x, y):
+    """Returns the lowest y the piece falls to from (x, y)."""
+    while not collides(board, piece, rotation, x, y + 1):
+        y += 1
+    return y
+
+
+def place(board, piece, rotation, x, y):
+    """Merges the piece into the board and clears full rows; returns (board, cleared row indices)."""
+    rows = list(board)
+    shift = x + WALL
+    for dy, mask in ROTATIONS[piece][rotation]:
+        rows[y + dy] |= mask << shift
+    cleared = [row for row in range(y, min(y + 4, BOARD_HEIGHT)) if rows[row] == FULL_ROW]
+    if cleared:
+        remaining = [row for row in rows if row != FULL_ROW]
+        rows = [EMPTY_ROW] * len(cleared) + remaining
+    return tuple(rows), cleared
+
+
+def evaluate(board, piece, rotation, y, cleared):
+    """Scores a board after placing a piece at row y and clearing the given rows; higher is better."""
+    piece_rows = ROTATIONS[piece][rotation]
+    landing_height = BOARD_HEIGHT - y - (piece_rows[0][0] + piece_rows[-1][0]) / 2
+    eroded_cells = 0
+    for dy, mask in piece_rows:
+        if y + dy in cleared:
+            eroded_cells += mask.bit_count()
+    eroded_cells *= len(cleared)
+
+    row_transitions = 0
+    column_transitions = 0
+    holes = 0
+    wells = 0
+    covered = 0
+    above = EMPTY_ROW
+    well_depths = [0] * BOARD_WIDTH
+    for row in board:
+        # Walls count as filled, so the edges of the field are transitions when the edge cell is empty.
+        row_transitions += ((row ^ (row >> 1)) & (FIELD_MASK | FIELD_MASK >> 1)).bit_count()
+        column_transitions += ((row ^ above) & FIELD_MASK).bit_count()
+        holes += (covered & ~row).bit_count()
+        covered |= row & FIELD_MASK
+        well_cells = ~row & (row << 1) & (row >> 1) & FIELD_MASK
+        for x in range(BOARD_WIDTH):
+            if well_cells >> (x + WALL) & 1:
+                well_depths[x] += 1
+                wells += well_depths[x]
+            else:
+                well_depths[x] = 0
+        above = row
+    column_transitions += ((FULL_ROW ^ above) & FIELD_MASK).bit_count()
+
+    return (
+        WEIGHT_LANDING_HEIGHT * landing_height
+        + WEIGHT_ERODED_CELLS * eroded_cells
+        + WEIGHT_ROW_TRANSITIONS * row_transitions
+        + WEIGHT_COLUMN_TRANSITIONS * column_transitions
+        + WEIGHT_HOLES * holes
+        + WEIGHT_WELLS * wells
+    )
+
+
+def reachable_columns(board, piece, rotation):
+    """Returns the x positions the rotated piece can slide to along the spawn row."""
+    if collides(board, piece, rotation, SPAWN_X, 0):
+        return []
+    columns = [SPAWN_X]
+    for step in (-1, 1):
+        x = SPAWN_X + step
+        while not collides(board, piece, rotation, x, 0):
+            columns.append(x)
+            x += step
+    return columns
+
+
+def best_placement(board, piece):
+    """Searches every rotation and column reachable from the spawn position followed by a hard drop.
+
+    Returns (rotation, x) of the best scoring placement, or None when the piece cannot be placed."""
+    best = None
+    best_value = float("-inf")
+    for rotation in DISTINCT_ROTATIONS[piece]:
+        # Rotations are applied at the spawn position, so every intermediate one has to fit there too.
+        if any(collides(board, piece, r, SPAWN_X, 0) for r in range(rotation + 1)):
+            break
+        for x in reachable_columns(board, piece, rotation):
+            y = drop(board, piece, rotation, x, 0)
+            placed, cleared = place(board, piece, rotation, x, y)
+            value = evaluate(placed, piece, rotation, y, cleared)
+            if value > best_value:
+                best_value = value
+                best = (rotation, x)
+    return best
+
+
+def play_game(seed, max_pieces=BATCH_MAX_PIECES):
+    """Plays one seeded game with the placement search and returns (score, lines, pieces, seconds)."""
+    rng = random.Random(seed)
+    board = new_board()
+    score = 0
+    lines = 0
+    pieces = 0
+    start = time.perf_counter()
+    while pieces < max_pieces:
+        piece = rng.randint(0, len(TETROMINOS) - 1)
+        placement = best_placement(board, piece)
+        if placement is None:
+            break
+        rotation, x = placement
+        y = drop(board, piece, rotation, x, 0)
+        board, cleared = place(board, piece, rotation, x, y)
+        lines += len(cleared)
+        score += LINE_SCORES[len(cleared)]
+        pieces += 1
+    return score, lines, pieces, time.perf_counter() - start
+
+
+def run_batch(games=BATCH_GAMES, max_pieces=BATCH_MAX_PIECES, workers=None, seed=0):
+    """Plays seeded games across a process pool and prints line, score and throughput statistics."""
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        seeds = range(seed, seed + games)
+        results = list(executor.map(play_game, seeds, [max_pieces] * games, chunksize=max(1, games // 64)))
+    elapsed = time.perf_counter() - start
+
+    lines = sorted(result[1] for result in results)
+    total_pieces = sum(result[2] for result in results)
+    survived = sum(result[2] == max_pieces for result in results)
+    print(f"{games} games of up to {max_pieces} pieces in {elapsed:.1f} s")
+    print(f"Score: mean {statistics.mean(result[0] for result in results):.0f}")
+    print(f"Lines: mean {statistics.mean(lines):.1f}, min {lines[0]}, max {lines[-1]}")
+    for percentile in (10, 25, 50, 75, 90):
+        print(f"  p{percentile}: {lines[min(len(lines) - 1, len(lines) * percentile // 100)]}")
+    print(f"Reached the piece limit: {survived} ({100 * survived / games:.1f}%)")
+    print(f"{total_pieces} pieces, {total_pieces / elapsed:.0f} pieces/s overall")
+
 
 class App:
     def __init__(self):
-        self.BOARD_WIDTH = 10
-        self.BOARD_HEIGHT = 20
+        self.BOARD_WIDTH = BOARD_WIDTH
+        self.BOARD_HEIGHT = BOARD_HEIGHT
         self.BLOCK_SIZE = 8
 
         self.WINDOW_WIDTH = self.BOARD_WIDTH * self.BLOCK_SIZE + 80
         self.WINDOW_HEIGHT = self.BOARD_HEIGHT * self.BLOCK_SIZE
 
         self.COLORS = [0, 3, 1, 2, 4, 5, 6, 7]
-        self.TETROMINOS = [
-            {"shape": [[0, 0, 0, 0], [1, 1, 1, 1], [0, 0, 0, 0], [0, 0, 0, 0]], "color": 1},
-            {"shape": [[0, 0, 0, 0], [0, 1, 1, 0], [0, 1, 1, 0], [0, 0, 0, 0]], "color": 2},
-            {"shape": [[0, 0, 0, 0], [1, 1, 1, 0], [0, 1, 0, 0], [0, 0, 0, 0]], "color": 3},
-            {"shape": [[0, 0, 0, 0], [0, 1, 1, 0], [1, 1, 0, 0], [0, 0, 0, 0]], "color": 4},
-            {"shape": [[0, 0, 0, 0], [1, 1, 0, 0], [0, 1, 1, 0], [0, 0, 0, 0]], "color": 5},
-            {"shape": [[0, 0, 0, 0], [1, 0, 0, 0], [1, 1, 1, 0], [0, 0, 0, 0]], "color": 6},
-            {"shape": [[0, 0, 0, 0], [0, 0, 1, 0], [1, 1, 1, 0], [0, 0, 0, 0]], "color": 7},
-        ]
+        self.auto_play = False
 
         pyxel.init(self.WINDOW_WIDTH, self.WINDOW_HEIGHT, title="Pyxel Tetromino")
         self.reset_game()
         pyxel.run(self.update, self.draw)
 
     def reset_game(self):
-        self.board = [[0 for _ in range(self.BOARD_WIDTH)] for _ in range(self.BOARD_HEIGHT)]
-        self.current_piece = self.new_piece()
+        self.board = new_board()
+        # Colors of the settled cells, for drawing only; self.board decides collisions.
+        self.colors = [[0 for _ in range(self.BOARD_WIDTH)] for _ in range(self.BOARD_HEIGHT)]
         self.next_piece = self.new_piece()
-        self.piece_x = self.BOARD_WIDTH // 2 - 2
-        self.piece_y = 0
+        self.spawn_piece(self.new_piece())
         self.score = 0
         self.game_over = False
         self.fall_speed = 30
         self.fall_timer = 0
 
     def new_piece(self):
-        return self.TETROMINOS[pyxel.rndi(0, len(self.TETROMINOS) - 1)].copy()
-
-    def rotate_piece(self, piece):
-        new_shape = [[0 for _ in range(4)] for _ in range(4)]
-        for y in range(4):
-            for x in range(4):
-                new_shape[x][3 - y] = piece["shape"][y][x]
-        return {"shape": new_shape, "color": piece["color"]}
-
-    def check_collision(self, piece, x_offset, y_offset):
-        for y in range(4):
-            for x in range(4):
-                if piece["shape"][y][x] != 0:
-                    board_x = self.piece_x + x + x_offset
-                    board_y = self.piece_y + y + y_offset
-                    if not (0 <= board_x < self.BOARD_WIDTH and 0 <= board_y < self.BOARD_HEIGHT):
-                        return True
-                    if self.board[board_y][board_x] != 0:
-                        return True
-        return False
-
-    def merge_piece(self):
-        for y in range(4):
-            for x in range(4):
-                if self.current_piece["shape"][y][x] != 0:
-                    self.board[self.piece_y + y][self.piece_x + x] = self.current_piece["color"]
-
-    def clear_lines(self):
-        lines_cleared = 0
-        new_board = []
-        for r in range(self.BOARD_HEIGHT):
-            if 0 not in self.board[r]:
-                lines_cleared += 1
-            else:
-                new_board.append(self.board[r])
-        for _ in range(lines_cleared):
-            new_board.insert(0, [0 for _ in range(self.BOARD_WIDTH)])
-        self.board = new_board
-        if lines_cleared > 0:
-            if lines_cleared == 1:
-                self.score += 100
-            elif lines_cleared == 2:
-                self.score += 300
-            elif lines_cleared == 3:
-                self.score += 500
-            elif lines_cleared == 4:
-                self.score += 800
+        return pyxel.rndi(0, len(TETROMINOS) - 1)
+
+    def spawn_piece(self, next_piece):
+        self.current_piece = self.next_piece
+        self.next_piece = next_piece
+        self.rotation = 0
+        self.piece_x = SPAWN_X
+        self.piece_y = 0
+        self.target = None
+
+    def check_collision(self, rotation, x_offset, y_offset):
+        return collides(self.board, self.current_piece, rotation, self.piece_x + x_offset, self.piece_y + y_offset)
+
+    def lock_piece(self):
+        self.board, cleared = place(self.board, self.current_piece, self.rotation, self.piece_x, self.piece_y)
+        color = TETROMINOS[self.current_piece]["color"]
+        for x, y in shape_cells(self.current_piece, self.rotation):
+            self.colors[self.piece_y + y][self.piece_x + x] = color
+        if cleared:
+            kept = [row for y, row in enumerate(self.colors) if y not in cleared]
+            self.colors = [[0 for _ in range(self.BOARD_WIDTH)] for _ in cleared] + kept
+        self.score += LINE_SCORES[len(cleared)]
+
+        self.spawn_piece(self.new_piece())
+        if self.check_collision(self.rotation, 0, 0):
+            self.game_over = True
+
+    def auto_play_step(self):
+        """Moves the current piece one step towards the searched placement, then hard drops it."""
+        if self.target is None:
+            self.target = best_placement(self.board, self.current_piece)
+            if self.target is None:
+                return
+        rotation, x = self.target
+        if self.rotation != rotation:
+            next_rotation = (self.rotation + 1) % 4
+            if not self.check_collision(next_rotation, 0, 0):
+                self.rotation = next_rotation
+                return
+        elif self.piece_x != x:
+            step = 1 if x > self.piece_x else -1
+            if not self.check_collision(self.rotation, step, 0):
+                self.piece_x += step
+                return
+        self.piece_y = drop(self.board, self.current_piece, self.rotation, self.piece_x, self.piece_y)
+        self.lock_piece()
 
     def update(self):
         if self.game_over:
@@ -91,103 +329,72 @@ class App:
                 self.reset_game()
             return
 
+        if pyxel.btnp(pyxel.KEY_A):
+            self.auto_play = not self.auto_play
+            self.target = None
+
         self.fall_timer += 1
         if self.fall_timer >= self.fall_speed:
-            if not self.check_collision(self.current_piece, 0, 1):
+            if not self.check_collision(self.rotation, 0, 1):
                 self.piece_y += 1
             else:
-                self.merge_piece()
-                self.clear_lines()
-                self.current_piece = self.next_piece
-                self.next_piece = self.new_piece()
-                self.piece_x = self.BOARD_WIDTH // 2 - 2
-                self.piece_y = 0
-                if self.check_collision(self.current_piece, 0, 0):
-                    self.game_over = True
+                self.lock_piece()
             self.fall_timer = 0
 
+        if self.auto_play:
+            if not self.game_over and pyxel.frame_count % AUTO_PLAY_INTERVAL == 0:
+                self.auto_play_step()
+            return
+
         if pyxel.btnp(pyxel.KEY_LEFT, 0, 5):
-            if not self.check_collision(self.current_piece, -1, 0):
+            if not self.check_collision(self.rotation, -1, 0):
                 self.piece_x -= 1
 
         if pyxel.btnp(pyxel.KEY_RIGHT, 0, 5):
-            if not self.check_collision(self.current_piece, 1, 0):
+            if not self.check_collision(self.rotation, 1, 0):
                 self.piece_x += 1
 
         if pyxel.btnp(pyxel.KEY_DOWN, 0, 2):
-            if not self.check_collision(self.current_piece, 0, 1):
+            if not self.check_collision(self.rotation, 0, 1):
                 self.piece_y += 1
             self.fall_timer = 0
 
         if pyxel.btnp(pyxel.KEY_UP) or pyxel.btnp(pyxel.KEY_X):
-            rotated_piece = self.rotate_piece(self.current_piece)
-            if not self.check_collision(rotated_piece, 0, 0):
-                self.current_piece = rotated_piece
+            rotated = (self.rotation + 1) % 4
+            if not self.check_collision(rotated, 0, 0):
+                self.rotation = rotated
 
         if pyxel.btnp(pyxel.KEY_SPACE):
-            while not self.check_collision(self.current_piece, 0, 1):
-                self.piece_y += 1
-            self.merge_piece()
-            self.clear_lines()
-            self.current_piece = self.next_piece
-            self.next_piece = self.new_piece()
-            self.piece_x = self.BOARD_WIDTH // 2 - 2
-            self.piece_y = 0
-            if self.check_collision(self.current_piece, 0, 0):
-                self.game_over = True
+            self.piece_y = drop(self.board, self.current_piece, self.rotation, self.piece_x, self.piece_y)
+            self.lock_piece()
+
+    def draw_block(self, x, y, color):
+        pyxel.rect(x, y, self.BLOCK_SIZE, self.BLOCK_SIZE, self.COLORS[color])
+        pyxel.rectb(x, y, self.BLOCK_SIZE, self.BLOCK_SIZE, 0)
 
     def draw(self):
         pyxel.cls(0)
         for y in range(self.BOARD_HEIGHT):
             for x in range(self.BOARD_WIDTH):
-                color = self.board[y][x]
+                color = self.colors[y][x]
                 if color != 0:
-                    pyxel.rect(
-                        x * self.BLOCK_SIZE, y * self.BLOCK_SIZE, self.BLOCK_SIZE, self.BLOCK_SIZE, self.COLORS[color]
-                    )
-                    pyxel.rectb(x * self.BLOCK_SIZE, y * self.BLOCK_SIZE, self.BLOCK_SIZE, self.BLOCK_SIZE, 0)
-
-        for y in range(4):
-            for x in range(4):
-                if self.current_piece["shape"][y][x] != 0:
-                    color = self.current_piece["color"]
-                    pyxel.rect(
-                        (self.piece_x + x) * self.BLOCK_SIZE,
-                        (self.piece_y + y) * self.BLOCK_SIZE,
-                        self.BLOCK_SIZE,
-                        self.BLOCK_SIZE,
-                        self.COLORS[color],
-                    )
-                    pyxel.rectb(
-                        (self.piece_x + x) * self.BLOCK_SIZE,
-                        (self.piece_y + y) * self.BLOCK_SIZE,
-                        self.BLOCK_SIZE,
-                        self.BLOCK_SIZE,
-                        0,
-                    )
+                    self.draw_block(x * self.BLOCK_SIZE, y * self.BLOCK_SIZE, color)
+
+        color = TETROMINOS[self.current_piece]["color"]
+        for x, y in shape_cells(self.current_piece, self.rotation):
+            self.draw_block((self.piece_x + x) * self.BLOCK_SIZE, (self.piece_y + y) * self.BLOCK_SIZE, color)
 
         pyxel.text(self.BOARD_WIDTH * self.BLOCK_SIZE + 10, 10, "NEXT:", 7)
 
-        for y in range(4):
-            for x in range(4):
-                if self.next_piece["shape"][y][x] != 0:
-                    color = self.next_piece["color"]
-                    pyxel.rect(
-                        self.BOARD_WIDTH * self.BLOCK_SIZE + 10 + x * self.BLOCK_SIZE,
-                        30 + y * self.BLOCK_SIZE,
-                        self.BLOCK_SIZE,
-                        self.BLOCK_SIZE,
-                        self.COLORS[color],
-                    )
-                    pyxel.rectb(
-                        self.BOARD_WIDTH * self.BLOCK_SIZE + 10 + x * self.BLOCK_SIZE,
-                        30 + y * self.BLOCK_SIZE,
-                        self.BLOCK_SIZE,
-                        self.BLOCK_SIZE,
-                        0,
-                    )
+        color = TETROMINOS[self.next_piece]["color"]
+        for x, y in shape_cells(self.next_piece, 0):
+            self.draw_block(
+                self.BOARD_WIDTH * self.BLOCK_SIZE + 10 + x * self.BLOCK_SIZE, 30 + y * self.BLOCK_SIZE, color
+            )
 
         pyxel.text(self.BOARD_WIDTH * self.BLOCK_SIZE + 10, 80, f"SCORE: {self.score}", 7)
+        if self.auto_play:
+            pyxel.text(self.BOARD_WIDTH * self.BLOCK_SIZE + 10, 90, "AUTO", 7)
 
         if self.game_over:
             pyxel.rect(0, self.WINDOW_HEIGHT // 2 - 20, self.WINDOW_WIDTH, 40, 0)
@@ -195,4 +402,25 @@ class App:
             pyxel.text(self.WINDOW_WIDTH // 2 - 65, self.WINDOW_HEIGHT // 2 + 5, "Press 'Enter' to Restart", 7)
 
 
-App()
+def option_value(args, name, default):
+    if name not in args:
+        return default
+    return int(args[args.index(name) + 1])
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--batch" in args:
+        try:
+            options = {
+                "games": option_value(args, "--batch", BATCH_GAMES),
+                "max_pieces": option_value(args, "--max-pieces", BATCH_MAX_PIECES),
+                "workers": option_value(args, "--workers", None),
+                "seed": option_value(args, "--seed", 0),
+            }
+        except (IndexError, ValueError):
+            print(f"Usage: python {sys.argv[0]} [--batch GAMES [--max-pieces N] [--workers N] [--seed S]]")
+            sys.exit(1)
+        run_batch(**options)
+    else:
+        App()
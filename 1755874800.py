@@ -348,9 +348,20 @@ class DefaultEventStrategy(EventStrategy):
         self.game_manager.set_state(GameState.IDLE)
 
 
+def index_by_id(records):
+    """Maps each record's id to the record, keeping the first one when an id repeats."""
+    index = {}
+    for record in records:
+        index.setdefault(record["id"], record)
+    return index
+
+
 class GameManager:
     def __init__(self, game_data):
         self.game_data = game_data
+        self._events = index_by_id(game_data["events"])
+        self._items = index_by_id(game_data["items"])
+        self._enemies = index_by_id(game_data["enemies"])
         self.player = {}
         self.game_state = GameState.IDLE
         self.current_state_strategy = None
@@ -425,22 +436,13 @@ class GameManager:
                 break
 
     def _get_event(self, event_id):
-        for event in self.game_data["events"]:
-            if event["id"] == event_id:
-                return event
-        return None
+        return self._events.get(event_id)
 
     def _get_item(self, item_id):
-        for item in self.game_data["items"]:
-            if item["id"] == item_id:
-                return item
-        return None
+        return self._items.get(item_id)
 
     def _get_enemy(self, enemy_id):
-        for enemy in self.game_data["enemies"]:
-            if enemy["id"] == enemy_id:
-                return enemy
-        return None
+        return self._enemies.get(enemy_id)
 
     def _start_event(self, event_id, temp_enemy_id=None):
         self.current_event_id = event_id
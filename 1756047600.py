@@ -1,9 +1,32 @@
+import functools
 import json
+import os
+import pickle
+import sys
+import time
 from abc import ABC, abstractmethod
 from enum import Enum, auto
 
 import pyxel
 
+GAME_DATA_PATH = "1756047620.json"
+START_EVENT_ID = "start_game"
+RANDOM_BATTLE_EVENT_ID = "dungeon_random_battle"
+GAME_CLEAR_EVENT_ID = "game_clear_event"
+BOSS_ENEMY_ID = "goblin_king"
+# Events the strategies move to by fixed id rather than through the event's own fields.
+IMPLICIT_NEXT_EVENTS = {
+    "dungeon_progress": (RANDOM_BATTLE_EVENT_ID,),
+    "dungeon_retreat_logic": (RANDOM_BATTLE_EVENT_ID, "town_return"),
+    "shop_transaction": ("shop_entrance",),
+    "shop_sell_transaction": ("shop_entrance",),
+    "shop_buy_menu": ("shop_transaction", "shop_entrance"),
+    "shop_sell_menu": ("sell_item", "shop_entrance"),
+}
+WORLD_CACHE_SUFFIX = ".cache"
+WORLD_CACHE_FORMAT = 1
+WRAP_CACHE_SIZE = 4096
+
 
 class BattlePhaseActionStrategy(ABC):
     def __init__(self, game_manager):
@@ -448,9 +471,7 @@ class BattleActionStateStrategy(GameStateStrategy):
 
     def handle_z_press(self):
         current_phase = self.game_manager.battle_phase
-        strategy_class = current_phase.strategy
-        strategy_instance = strategy_class(self.game_manager)
-        strategy_instance.execute()
+        self.game_manager.battle_phase_strategies[current_phase].execute()
 
     def enter_state(self):
         pass
@@ -758,13 +779,179 @@ class GameState(Enum):
         return self.draw_strategy_class
 
 
-class GameManager:
-    def __init__(self, game_data):
+def index_by_id(records):
+    """Maps each record's id to the record, keeping the first one when an id repeats."""
+    index = {}
+    for record in records:
+        index.setdefault(record["id"], record)
+    return index
+
+
+@functools.lru_cache(maxsize=WRAP_CACHE_SIZE)
+def wrap_text(text, max_chars_per_line):
+    """Word-wraps text into lines of at most max_chars_per_line; results are cached for redraws."""
+    wrapped_lines = []
+    if not text:
+        return ("",)
+    words = text.split(" ")
+    current_line = ""
+    for word in words:
+        if current_line:
+            if len(current_line) + 1 + len(word) > max_chars_per_line:
+                wrapped_lines.append(current_line)
+                current_line = word
+            else:
+                current_line += " " + word
+        else:
+            current_line = word
+    if current_line:
+        wrapped_lines.append(current_line)
+    return tuple(wrapped_lines)
+
+
+def resolve_event_type(event):
+    event_type_str = event.get("type")
+    if event_type_str:
+        try:
+            return EventType[event_type_str.upper()]
+        except KeyError:
+            pass
+    return EventType.DEFAULT
+
+
+def event_references(event):
+    """Yields (event id, field) for every event this event can lead to, including ids fixed in the strategies."""
+    if "next_event" in event:
+        yield event["next_event"], "next_event"
+    for i, choice in enumerate(event.get("choices", [])):
+        if "next_event" in choice.get("outcome", {}):
+            yield choice["outcome"]["next_event"], f"choices[{i}]"
+    for key in ("on_win", "on_lose"):
+        if "next_event" in event.get(key, {}):
+            yield event[key]["next_event"], key
+    for key in ("boss_event_id", "on_win_dungeon", "on_lose_dungeon"):
+        if key in event:
+            yield event[key], key
+    if "dungeon_id" in event:
+        yield event["dungeon_id"] + "_explore_choice", "dungeon_id"
+    if event.get("enemy_id") == BOSS_ENEMY_ID:
+        yield GAME_CLEAR_EVENT_ID, "enemy_id"
+    for event_id in IMPLICIT_NEXT_EVENTS.get(event.get("type"), ()):
+        yield event_id, "type"
+
+
+def record_references(event):
+    """Yields (kind, id, field) for every item or enemy an event refers to."""
+    if "item_id" in event:
+        yield "item", event["item_id"], "item_id"
+    for item_id in event.get("dungeon_items", []):
+        yield "item", item_id, "dungeon_items"
+    for enemy_id in event.get("normal_enemies", []):
+        yield "enemy", enemy_id, "normal_enemies"
+    # The random dungeon battle is fought against an enemy picked at runtime, not its placeholder.
+    if "enemy_id" in event and event["id"] != RANDOM_BATTLE_EVENT_ID:
+        yield "enemy", event["enemy_id"], "enemy_id"
+
+
+class World:
+    """Game data indexed by id, with the event graph validated and each event's type resolved once."""
+
+    def __init__(self, game_data, compiled=None):
         self.game_data = game_data
+        self.events = index_by_id(game_data["events"])
+        self.items = index_by_id(game_data["items"])
+        self.enemies = index_by_id(game_data["enemies"])
+        if compiled is None:
+            self.event_types = {event_id: resolve_event_type(event) for event_id, event in self.events.items()}
+            self.problems = self._validate()
+        else:
+            self.event_types = {event_id: EventType[name] for event_id, name in compiled["event_types"].items()}
+            self.problems = compiled["problems"]
+
+    def _validate(self):
+        problems = []
+        for kind in ("events", "items", "enemies"):
+            if len(getattr(self, kind)) != len(self.game_data[kind]):
+                seen = set()
+                for record in self.game_data[kind]:
+                    if record["id"] in seen:
+                        problems.append(f"Duplicate id '{record['id']}' in {kind}; the first one is used.")
+                    seen.add(record["id"])
+
+        records = {"item": self.items, "enemy": self.enemies}
+        for event_id, event in self.events.items():
+            for target, field in event_references(event):
+                if target not in self.events:
+                    problems.append(f"Event '{event_id}' {field} leads to missing event '{target}'.")
+            for kind, record_id, field in record_references(event):
+                if record_id not in records[kind]:
+                    problems.append(f"Event '{event_id}' {field} refers to missing {kind} '{record_id}'.")
+        for enemy_id, enemy in self.enemies.items():
+            for drop_item in enemy.get("drop_items", []):
+                if drop_item["item_id"] not in self.items:
+                    problems.append(f"Enemy '{enemy_id}' drops missing item '{drop_item['item_id']}'.")
+
+        if START_EVENT_ID not in self.events:
+            problems.append(f"Start event '{START_EVENT_ID}' is missing.")
+        reachable = {START_EVENT_ID}
+        pending = [START_EVENT_ID]
+        while pending:
+            event = self.events.get(pending.pop())
+            if event is None:
+                continue
+            for target, _ in event_references(event):
+                if target not in reachable:
+                    reachable.add(target)
+                    pending.append(target)
+        for event_id in self.events:
+            if event_id not in reachable:
+                problems.append(f"Event '{event_id}' cannot be reached from '{START_EVENT_ID}'.")
+        return problems
+
+    @classmethod
+    def load(cls, path, use_cache=True):
+        """Loads a scenario JSON, reusing the compiled world cached next to it while the JSON is unchanged."""
+        stat = os.stat(path)
+        source = (stat.st_size, stat.st_mtime_ns)
+        cache_path = path + WORLD_CACHE_SUFFIX
+        if use_cache:
+            try:
+                with open(cache_path, "rb") as f:
+                    cached = pickle.load(f)
+                if cached["format"] == WORLD_CACHE_FORMAT and cached["source"] == source:
+                    return cls(cached["game_data"], cached)
+            except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError):
+                pass
+
+        with open(path, "r", encoding="utf-8") as f:
+            world = cls(json.load(f))
+        if use_cache:
+            world.save_cache(cache_path, source)
+        return world
+
+    def save_cache(self, cache_path, source):
+        compiled = {
+            "format": WORLD_CACHE_FORMAT,
+            "source": source,
+            "game_data": self.game_data,
+            "event_types": {event_id: event_type.name for event_id, event_type in self.event_types.items()},
+            "problems": self.problems,
+        }
+        try:
+            with open(cache_path, "wb") as f:
+                pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            print(f"Warning: could not write world cache {cache_path}: {e}")
+
+
+class GameManager:
+    def __init__(self, world):
+        self.world = world
+        self.game_data = world.game_data
         self.player = {}
         self.game_state = GameState.IDLE
         self.current_state_strategy = None
-        self.current_event_id = "start_game"
+        self.current_event_id = START_EVENT_ID
         self.current_event = None
         self.message_queue = []
         self.choice_selected_index = 0
@@ -785,12 +972,14 @@ class GameManager:
         self._pending_next_event_id = None
         self._pending_temp_enemy_id = None
         self._event_strategies = {event_type: event_type.strategy(self) for event_type in EventType}
+        self._state_strategies = {game_state: game_state.strategy(self) for game_state in GameState}
+        self.battle_phase_strategies = {phase: phase.strategy(self) for phase in BattlePhase}
         self._initialize_player_state()
         self._start_event(self.current_event_id)
 
     def set_state(self, new_state):
         self.game_state = new_state
-        self.current_state_strategy = new_state.strategy(self)
+        self.current_state_strategy = self._state_strategies[new_state]
         self.current_state_strategy.enter_state()
 
     def _initialize_player_state(self):
@@ -805,22 +994,13 @@ class GameManager:
                 break
 
     def _get_event(self, event_id):
-        for event in self.game_data["events"]:
-            if event["id"] == event_id:
-                return event
-        return None
+        return self.world.events.get(event_id)
 
     def _get_item(self, item_id):
-        for item in self.game_data["items"]:
-            if item["id"] == item_id:
-                return item
-        return None
+        return self.world.items.get(item_id)
 
     def _get_enemy(self, enemy_id):
-        for enemy in self.game_data["enemies"]:
-            if enemy["id"] == enemy_id:
-                return enemy
-        return None
+        return self.world.enemies.get(enemy_id)
 
     def _start_event(self, event_id, temp_enemy_id=None, extra_event_data=None):
         self.current_event_id = event_id
@@ -838,15 +1018,7 @@ class GameManager:
         self._pending_temp_enemy_id = None
         if event_id == "town_return":
             self._heal_player_to_max_hp()
-        event_type_str = event.get("type")
-        if event_type_str:
-            try:
-                event_type = EventType[event_type_str.upper()]
-            except KeyError:
-                event_type = EventType.DEFAULT
-        else:
-            event_type = EventType.DEFAULT
-        strategy = self._event_strategies[event_type]
+        strategy = self._event_strategies[self.world.event_types[event_id]]
         strategy.execute(self.current_event, temp_enemy_id)
 
     def _heal_player_to_max_hp(self):
@@ -1052,46 +1224,31 @@ class GameManager:
         return self.battle_item_selected_index
 
     def _wrap_text(self, text, max_chars_per_line):
-        wrapped_lines = []
-        if not text:
-            return [""]
-        words = text.split(" ")
-        current_line = ""
-        for word in words:
-            if current_line:
-                if len(current_line) + 1 + len(word) > max_chars_per_line:
-                    wrapped_lines.append(current_line)
-                    current_line = word
-                else:
-                    current_line += " " + word
-            else:
-                current_line = word
-        if current_line:
-            wrapped_lines.append(current_line)
-        return wrapped_lines
+        return wrap_text(text, max_chars_per_line)
 
 
 class App:
     def __init__(self):
         pyxel.init(256, 192, title="RPG")
         self._load_and_display_rules()
-        game_data = self._load_game_data_from_file()
-        self.game_manager = GameManager(game_data)
+        self.game_manager = GameManager(self._load_world())
         self._draw_strategies = {
             game_state: game_state.draw_strategy(self.game_manager, self) for game_state in GameState
         }
         pyxel.run(self.update, self.draw)
 
-    def _load_game_data_from_file(self):
+    def _load_world(self):
         try:
-            with open("1756047620.json", "r", encoding="utf-8") as f:
-                return json.load(f)
+            world = World.load(GAME_DATA_PATH)
         except FileNotFoundError:
-            print("Error: 1756047620.json not found.")
+            print(f"Error: {GAME_DATA_PATH} not found.")
             pyxel.quit()
         except json.JSONDecodeError:
-            print("Error: Failed to decode 1756047620.json. Check JSON format.")
+            print(f"Error: Failed to decode {GAME_DATA_PATH}. Check JSON format.")
             pyxel.quit()
+        for problem in world.problems:
+            print(f"Warning: {problem}")
+        return world
 
     def _load_and_display_rules(self):
         try:
@@ -1133,4 +1290,28 @@ class App:
         self._draw_strategies[game_state].draw_screen()
 
 
-App()
+def validate(path):
+    """Compiles a scenario without the cache, then loads it through the cache, and reports problems and timings."""
+    start = time.perf_counter()
+    world = World.load(path, use_cache=False)
+    compiled = time.perf_counter() - start
+    world.save_cache(path + WORLD_CACHE_SUFFIX, (os.stat(path).st_size, os.stat(path).st_mtime_ns))
+    start = time.perf_counter()
+    World.load(path)
+    cached = time.perf_counter() - start
+    for problem in world.problems:
+        print(problem)
+    print(
+        f"{path}: {len(world.events)} events, {len(world.items)} items, {len(world.enemies)} enemies, "
+        f"{len(world.problems)} problems"
+    )
+    print(f"Compiled from JSON in {compiled * 1000:.1f} ms, loaded from cache in {cached * 1000:.1f} ms")
+    return not world.problems
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--validate" in args:
+        i = args.index("--validate")
+        sys.exit(0 if validate(args[i + 1] if i + 1 < len(args) else GAME_DATA_PATH) else 1)
+    App()
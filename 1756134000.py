@@ -1,12 +1,92 @@
 import colorsys
 import random
+import sys
+import time
 import tkinter as tk
+from collections import OrderedDict, deque
 
 from PIL import Image, ImageTk
 
+HUE_STEPS = 720
+FRAME_CACHE_MAX_BYTES = 512 * 1024 * 1024
+STATS_INTERVAL_S = 5.0
+STATS_WINDOW = 250
+BENCHMARK_SIZES = [(800, 600), (1920, 1080), (3840, 2160)]
+BENCHMARK_FRAMES = 50
+
+
+class FrameCache:
+    """LRU cache of displayable frames, bounded by their total pixel data size."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, frame, size):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.total_bytes -= old[1]
+        self.entries[key] = (frame, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+
+def gradient_column(hue, saturation, brightness_min, brightness_max, height):
+    """Returns the gradient as a one-pixel-wide RGB image."""
+    column = bytearray()
+    for y in range(height):
+        if height > 1:
+            value = brightness_max - (brightness_max - brightness_min) * (y / (height - 1))
+        else:
+            value = (brightness_max + brightness_min) / 2
+        r, g, b = colorsys.hsv_to_rgb(hue, saturation, value)
+        column += bytes((int(r * 255), int(g * 255), int(b * 255)))
+    return Image.frombytes("RGB", (1, height), bytes(column))
+
+
+def render_gradient(hue, saturation, brightness_min, brightness_max, width, height):
+    """Renders the vertical gradient by stretching a single column to the full width."""
+    column = gradient_column(hue, saturation, brightness_min, brightness_max, height)
+    return column.resize((width, height), Image.Resampling.NEAREST)
+
+
+class FrameStats:
+    """Collects frame times and reports the average, 95th percentile and achievable frame rate."""
+
+    def __init__(self, window=STATS_WINDOW):
+        self.times = deque(maxlen=window)
+        self.cache_hits = 0
+        self.frames = 0
+
+    def record(self, seconds, cache_hit):
+        self.times.append(seconds)
+        self.frames += 1
+        self.cache_hits += cache_hit
+
+    def summary(self):
+        if not self.times:
+            return "no frames"
+        ordered = sorted(self.times)
+        average = sum(ordered) / len(ordered)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return (
+            f"frame avg {average * 1000:.2f} ms, p95 {p95 * 1000:.2f} ms "
+            f"({1 / max(p95, 1e-9):.0f} fps at p95), cache hits {self.cache_hits}/{self.frames}"
+        )
+
 
 class ColorMeditationApp:
-    def __init__(self, master):
+    def __init__(self, master, show_stats=False):
         self.master = master
         master.title("Color Meditation")
         master.geometry("800x600")
@@ -20,6 +100,12 @@ class ColorMeditationApp:
         self.hue_speed = 0.0001
         self.update_interval_ms = 40
 
+        self.frame_cache = FrameCache(FRAME_CACHE_MAX_BYTES)
+        self.displayed_key = None
+        self.stats = FrameStats()
+        self.show_stats = show_stats
+        self.last_stats_report = time.perf_counter()
+
         self.label = tk.Label(master)
         self.label.pack(expand=True, fill="both")
 
@@ -33,37 +119,73 @@ class ColorMeditationApp:
             self.height = event.height
             self._update_image_display()
 
-    def generate_gradient_image(self):
-        """Generates a vertical gradient image."""
-        effective_width = max(1, self.width)
-        effective_height = max(1, self.height)
-        img = Image.new("RGB", (effective_width, effective_height))
-        pixels = img.load()
-        for y in range(effective_height):
-            if effective_height > 1:
-                value = self.brightness_max - (self.brightness_max - self.brightness_min) * (y / (effective_height - 1))
-            else:
-                value = (self.brightness_max + self.brightness_min) / 2
-            r, g, b = colorsys.hsv_to_rgb(self.hue, self.saturation, value)
-            R, G, B = int(r * 255), int(g * 255), int(b * 255)
-            for x in range(effective_width):
-                pixels[x, y] = (R, G, B)
-        return img
-
     def _update_image_display(self):
-        """Generates and displays the current gradient image."""
-        pil_image = self.generate_gradient_image()
-        self.tk_image = ImageTk.PhotoImage(pil_image)
+        """Displays the gradient for the current hue, quantized to HUE_STEPS, reusing cached frames."""
+        start = time.perf_counter()
+        hue_step = round(self.hue * HUE_STEPS) % HUE_STEPS
+        key = (hue_step, max(1, self.width), max(1, self.height))
+        if key == self.displayed_key:
+            return
+
+        frame = self.frame_cache.get(key)
+        cache_hit = frame is not None
+        if not cache_hit:
+            pil_image = render_gradient(
+                hue_step / HUE_STEPS, self.saturation, self.brightness_min, self.brightness_max, key[1], key[2]
+            )
+            frame = ImageTk.PhotoImage(pil_image)
+            self.frame_cache.put(key, frame, key[1] * key[2] * 3)
+        self.tk_image = frame
         self.label.config(image=self.tk_image)
+        self.displayed_key = key
+        self.stats.record(time.perf_counter() - start, cache_hit)
 
     def update_color(self):
         """Updates hue and schedules the next update."""
         self._update_image_display()
         self.hue = (self.hue + self.hue_speed) % 1.0
+        if self.show_stats and time.perf_counter() - self.last_stats_report >= STATS_INTERVAL_S:
+            print(f"{self.width}x{self.height}: {self.stats.summary()}")
+            self.last_stats_report = time.perf_counter()
         self.master.after(self.update_interval_ms, self.update_color)
 
 
+def render_gradient_per_pixel(hue, saturation, brightness_min, brightness_max, width, height):
+    """Renders the gradient pixel by pixel, as the app originally did."""
+    img = Image.new("RGB", (width, height))
+    pixels = img.load()
+    for y in range(height):
+        if height > 1:
+            value = brightness_max - (brightness_max - brightness_min) * (y / (height - 1))
+        else:
+            value = (brightness_max + brightness_min) / 2
+        r, g, b = colorsys.hsv_to_rgb(hue, saturation, value)
+        R, G, B = int(r * 255), int(g * 255), int(b * 255)
+        for x in range(width):
+            pixels[x, y] = (R, G, B)
+    return img
+
+
+def benchmark():
+    """Times gradient rendering per pixel and by column stretching, headless (without PhotoImage)."""
+    for width, height in BENCHMARK_SIZES:
+        start = time.perf_counter()
+        expected = render_gradient_per_pixel(0.3, 1.0, 0.1, 0.9, width, height)
+        per_pixel = time.perf_counter() - start
+        stats = FrameStats()
+        for frame in range(BENCHMARK_FRAMES):
+            start = time.perf_counter()
+            render_gradient(frame / HUE_STEPS, 1.0, 0.1, 0.9, width, height)
+            stats.record(time.perf_counter() - start, False)
+        same = render_gradient(0.3, 1.0, 0.1, 0.9, width, height).tobytes() == expected.tobytes()
+        print(f"{width}x{height}: per pixel {per_pixel * 1000:.0f} ms; stretched column {stats.summary()}")
+        print(f"  identical to per-pixel output: {same}")
+
+
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = ColorMeditationApp(root)
-    root.mainloop()
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
+    else:
+        root = tk.Tk()
+        app = ColorMeditationApp(root, show_stats="--stats" in sys.argv[1:])
+        root.mainloop()
@@ -1,3 +1,10 @@
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
 import pyxel
 
 BOARD_SIZE = 4
@@ -49,148 +56,327 @@ MERGE_EFFECT_COLORS = {
 }
 
 
-class App:
-    def init_board(self):
-        """Initializes a new 4x4 game board with all zeros."""
-        return [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+ROW_MASK = 0xFFFF
+MAX_RANK = 15
+WIN_RANK = 11
+DIRECTIONS = ("left", "right", "up", "down")
+AUTO_PLAY_DEPTH = 1
+AUTO_PLAY_INTERVAL = 4
+BATCH_GAMES = 1000
+BATCH_DEPTH = 1
+PROBABILITY_CUTOFF = 0.0001
+
+SCORE_LOST_PENALTY = 200000.0
+SCORE_MONOTONICITY_POWER = 4.0
+SCORE_MONOTONICITY_WEIGHT = 47.0
+SCORE_SUM_POWER = 3.5
+SCORE_SUM_WEIGHT = 11.0
+SCORE_MERGES_WEIGHT = 700.0
+SCORE_EMPTY_WEIGHT = 270.0
+
+# A board is one 64-bit int of sixteen 4-bit tile ranks (0 for empty, n for a tile of 2**n).
+# Row r is bits 16r..16r+15 and cell (r, c) is the nibble at bit 16r + 4c.
+
+
+def unpack_row(row):
+    return [(row >> (4 * c)) & 0xF for c in range(BOARD_SIZE)]
+
+
+def pack_row(ranks):
+    row = 0
+    for c, rank in enumerate(ranks):
+        row |= rank << (4 * c)
+    return row
+
+
+def reverse_row(row):
+    return ((row >> 12) & 0xF) | ((row >> 4) & 0xF0) | ((row << 4) & 0xF00) | ((row << 12) & 0xF000)
+
+
+def slide_row_left(ranks):
+    """Slides and merges a row toward column 0 and returns (ranks, score gained, merged columns)."""
+    tiles = [rank for rank in ranks if rank]
+    result = []
+    merged = []
+    score = 0
+    i = 0
+    while i < len(tiles):
+        # Two 32768 tiles would overflow a nibble, so they are left unmerged.
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1] and tiles[i] < MAX_RANK:
+            merged.append(len(result))
+            result.append(tiles[i] + 1)
+            score += 1 << (tiles[i] + 1)
+            i += 2
+        else:
+            result.append(tiles[i])
+            i += 1
+    return result + [0] * (BOARD_SIZE - len(result)), score, merged
+
+
+def row_heuristic(ranks):
+    """Scores a row by empty cells, merge opportunities, monotonicity and tile sum."""
+    empty = ranks.count(0)
+    merges = 0
+    prev = 0
+    counter = 0
+    for rank in ranks:
+        if rank == 0:
+            continue
+        if prev == rank:
+            counter += 1
+        elif counter > 0:
+            merges += 1 + counter
+            counter = 0
+        prev = rank
+    if counter > 0:
+        merges += 1 + counter
+
+    monotonicity_left = 0.0
+    monotonicity_right = 0.0
+    for a, b in zip(ranks, ranks[1:]):
+        if a > b:
+            monotonicity_left += a**SCORE_MONOTONICITY_POWER - b**SCORE_MONOTONICITY_POWER
+        else:
+            monotonicity_right += b**SCORE_MONOTONICITY_POWER - a**SCORE_MONOTONICITY_POWER
+    rank_sum = sum(rank**SCORE_SUM_POWER for rank in ranks)
+    return (
+        SCORE_LOST_PENALTY
+        + SCORE_EMPTY_WEIGHT * empty
+        + SCORE_MERGES_WEIGHT * merges
+        - SCORE_MONOTONICITY_WEIGHT * min(monotonicity_left, monotonicity_right)
+        - SCORE_SUM_WEIGHT * rank_sum
+    )
+
+
+def build_row_tables():
+    """Precomputes left/right moves, scores, merge markers and heuristics for all 65536 rows."""
+    left = [0] * (ROW_MASK + 1)
+    right = [0] * (ROW_MASK + 1)
+    left_merges = [0] * (ROW_MASK + 1)
+    right_merges = [0] * (ROW_MASK + 1)
+    score = [0] * (ROW_MASK + 1)
+    heuristic = [0.0] * (ROW_MASK + 1)
+    for row in range(ROW_MASK + 1):
+        ranks = unpack_row(row)
+        result, gained, merged = slide_row_left(ranks)
+        reversed_row = reverse_row(row)
+        left[row] = pack_row(result)
+        right[reversed_row] = reverse_row(left[row])
+        left_merges[row] = pack_row([1 if c in merged else 0 for c in range(BOARD_SIZE)])
+        right_merges[reversed_row] = reverse_row(left_merges[row])
+        score[row] = gained
+        heuristic[row] = row_heuristic(ranks)
+    return left, right, left_merges, right_merges, score, heuristic
+
+
+ROW_LEFT, ROW_RIGHT, ROW_LEFT_MERGES, ROW_RIGHT_MERGES, ROW_SCORE, ROW_HEURISTIC = build_row_tables()
+
+
+def transpose(board):
+    """Swaps rows and columns of a packed board."""
+    a1 = board & 0xF0F00F0FF0F00F0F
+    a2 = board & 0x0000F0F00000F0F0
+    a3 = board & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def pack_board(rows):
+    """Packs a list-of-lists board of tile values (0, 2, 4, ...) into a 64-bit board."""
+    board = 0
+    for r, values in enumerate(rows):
+        board |= pack_row([value.bit_length() - 1 if value else 0 for value in values]) << (16 * r)
+    return board
+
+
+def unpack_board(board):
+    """Unpacks a 64-bit board into a list-of-lists board of tile values."""
+    return [
+        [1 << rank if rank else 0 for rank in unpack_row((board >> (16 * r)) & ROW_MASK)] for r in range(BOARD_SIZE)
+    ]
+
+
+def move_rows(board, moves, merges):
+    result = 0
+    merged = 0
+    score = 0
+    for r in range(BOARD_SIZE):
+        row = (board >> (16 * r)) & ROW_MASK
+        result |= moves[row] << (16 * r)
+        merged |= merges[row] << (16 * r)
+        score += ROW_SCORE[row]
+    return result, score, merged
 
-    def get_empty_cells(self):
-        """Returns a list of (row, col) tuples for all empty cells."""
-        empty_cells = []
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                if self.board[r][c] == 0:
-                    empty_cells.append((r, c))
-        return empty_cells
-
-    def add_random_tile(self):
-        """Adds a new 2 or 4 tile to a random empty spot on the board."""
-        empty_cells = self.get_empty_cells()
-        if empty_cells:
-            r, c = empty_cells[pyxel.rndi(0, len(empty_cells) - 1)]
-            self.board[r][c] = 2 if pyxel.rndi(0, 9) < 9 else 4
-            return True
-        return False
-
-    def compress_row(self, row):
-        """Compresses a row by moving all non-zero tiles to one side."""
-        new_row = [0] * BOARD_SIZE
-        k = 0
-        for i in range(BOARD_SIZE):
-            if row[i] != 0:
-                new_row[k] = row[i]
-                k += 1
-        return new_row
-
-    def merge_row(self, row, current_score):
-        """Merges adjacent identical tiles in a compressed row, updating the score."""
-        merged_positions = []
-        for i in range(BOARD_SIZE - 1):
-            if row[i] != 0 and row[i] == row[i + 1]:
-                row[i] *= 2
-                current_score += row[i]
-                row[i + 1] = 0
-                merged_positions.append(i)
-        return row, current_score, merged_positions
-
-    def move(self, direction):
-        """Applies a move (left, right, up, down) to the board and updates the score."""
-        moved = False
-        temp_board = [row[:] for row in self.board]
-        merge_locations = []
-        if direction == "left":
-            for r in range(BOARD_SIZE):
-                original_row = temp_board[r][:]
-                compressed_row = self.compress_row(original_row)
-                merged_row, self.score, row_merge_positions = self.merge_row(compressed_row, self.score)
-                final_row = self.compress_row(merged_row)
-                if original_row != final_row:
-                    moved = True
-                temp_board[r] = final_row
-                for c_idx in row_merge_positions:
-                    merge_locations.append((r, c_idx))
-        elif direction == "right":
-            for r in range(BOARD_SIZE):
-                original_row = temp_board[r][:]
-                row_rev = original_row[::-1]
-                compressed_row_rev = self.compress_row(row_rev)
-                merged_row_rev, self.score, row_merge_positions_rev = self.merge_row(compressed_row_rev, self.score)
-                final_row = self.compress_row(merged_row_rev)[::-1]
-                if original_row != final_row:
-                    moved = True
-                temp_board[r] = final_row
-                for c_idx_rev in row_merge_positions_rev:
-                    original_c = BOARD_SIZE - 1 - c_idx_rev
-                    merge_locations.append((r, original_c))
-        elif direction == "up":
-            for c in range(BOARD_SIZE):
-                col = [temp_board[r_idx][c] for r_idx in range(BOARD_SIZE)]
-                original_col = col[:]
-                compressed_col = self.compress_row(original_col)
-                merged_col, self.score, col_merge_positions = self.merge_row(compressed_col, self.score)
-                final_col = self.compress_row(merged_col)
-                if original_col != final_col:
-                    moved = True
-                for r_idx in range(BOARD_SIZE):
-                    temp_board[r_idx][c] = final_col[r_idx]
-                for r_idx in col_merge_positions:
-                    merge_locations.append((r_idx, c))
-        elif direction == "down":
-            for c in range(BOARD_SIZE):
-                col = [temp_board[r_idx][c] for r_idx in range(BOARD_SIZE)]
-                original_col = col[:]
-                col_rev = original_col[::-1]
-                compressed_col_rev = self.compress_row(col_rev)
-                merged_col_rev, self.score, col_merge_positions_rev = self.merge_row(compressed_col_rev, self.score)
-                final_col = self.compress_row(merged_col_rev)[::-1]
-                if original_col != final_col:
-                    moved = True
-                for r_idx in range(BOARD_SIZE):
-                    temp_board[r_idx][c] = final_col[r_idx]
-                for r_idx_rev in col_merge_positions_rev:
-                    original_r = BOARD_SIZE - 1 - r_idx_rev
-                    merge_locations.append((original_r, c))
-        self.board = temp_board
-        return moved, merge_locations
-
-    def check_game_over(self):
-        """Checks if the game is over (no empty cells and no possible moves)."""
-        if self.get_empty_cells():
-            return False
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                if c < BOARD_SIZE - 1 and self.board[r][c] == self.board[r][c + 1]:
-                    return False
-                if r < BOARD_SIZE - 1 and self.board[r][c] == self.board[r + 1][c]:
-                    return False
-        return True
-
-    def check_win(self):
-        """Checks if the 2048 tile has been achieved."""
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                if self.board[r][c] == 2048:
-                    return True
-        return False
 
+def move(board, direction):
+    """Returns (board, score gained, merge markers) after a move; the board is unchanged if nothing moved.
+
+    Merge markers are a packed board with rank 1 wherever a merged tile ended up."""
+    if direction == "left":
+        return move_rows(board, ROW_LEFT, ROW_LEFT_MERGES)
+    if direction == "right":
+        return move_rows(board, ROW_RIGHT, ROW_RIGHT_MERGES)
+    moves, merges = (ROW_LEFT, ROW_LEFT_MERGES) if direction == "up" else (ROW_RIGHT, ROW_RIGHT_MERGES)
+    result, score, merged = move_rows(transpose(board), moves, merges)
+    return transpose(result), score, transpose(merged)
+
+
+def empty_cells(board):
+    """Returns the nibble indexes of empty cells."""
+    return [i for i in range(BOARD_SIZE * BOARD_SIZE) if not (board >> (4 * i)) & 0xF]
+
+
+def add_random_tile(board, rng):
+    """Adds a 2 (90%) or a 4 (10%) to a random empty cell."""
+    cells = empty_cells(board)
+    if not cells:
+        return board
+    i = cells[rng.randrange(len(cells))]
+    return board | ((1 if rng.random() < 0.9 else 2) << (4 * i))
+
+
+def new_board(rng):
+    return add_random_tile(add_random_tile(0, rng), rng)
+
+
+def can_move(board):
+    return any(move(board, direction)[0] != board for direction in DIRECTIONS)
+
+
+def max_rank(board):
+    return max(
+        unpack_row(board & ROW_MASK)
+        + unpack_row((board >> 16) & ROW_MASK)
+        + unpack_row((board >> 32) & ROW_MASK)
+        + unpack_row((board >> 48) & ROW_MASK)
+    )
+
+
+def merge_positions(merged):
+    """Converts merge markers into (row, col) positions."""
+    return [divmod(i, BOARD_SIZE) for i in range(BOARD_SIZE * BOARD_SIZE) if (merged >> (4 * i)) & 0xF]
+
+
+def heuristic(board):
+    """Sums the row heuristic over all rows and columns."""
+    transposed = transpose(board)
+    total = 0.0
+    for r in range(BOARD_SIZE):
+        total += ROW_HEURISTIC[(board >> (16 * r)) & ROW_MASK] + ROW_HEURISTIC[(transposed >> (16 * r)) & ROW_MASK]
+    return total
+
+
+class Expectimax:
+    """Expectimax search over the packed board with a per-move cache of chance nodes."""
+
+    def __init__(self, depth):
+        self.depth = depth
+        self.cache = {}
+
+    def best_move(self, board):
+        """Returns the direction with the highest expected heuristic, or None when no move is possible."""
+        self.cache.clear()
+        best_direction = None
+        best_value = -1.0
+        for direction in DIRECTIONS:
+            moved, _, _ = move(board, direction)
+            if moved == board:
+                continue
+            value = self._chance(moved, self.depth - 1, 1.0)
+            if value > best_value:
+                best_value = value
+                best_direction = direction
+        return best_direction
+
+    def _chance(self, board, depth, probability):
+        if depth < 0 or probability < PROBABILITY_CUTOFF:
+            return heuristic(board)
+        key = (board, depth)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        cells = empty_cells(board)
+        if not cells:
+            return self._max(board, depth, probability)
+        total = 0.0
+        cell_probability = probability / len(cells)
+        for i in cells:
+            total += 0.9 * self._max(board | (1 << (4 * i)), depth, cell_probability * 0.9)
+            total += 0.1 * self._max(board | (2 << (4 * i)), depth, cell_probability * 0.1)
+        value = total / len(cells)
+        self.cache[key] = value
+        return value
+
+    def _max(self, board, depth, probability):
+        best = 0.0
+        for direction in DIRECTIONS:
+            moved, _, _ = move(board, direction)
+            if moved != board:
+                best = max(best, self._chance(moved, depth - 1, probability))
+        return best
+
+
+def play_game(seed, depth=BATCH_DEPTH):
+    """Plays one seeded game with expectimax and returns (score, max tile, moves, seconds)."""
+    rng = random.Random(seed)
+    search = Expectimax(depth)
+    board = new_board(rng)
+    score = 0
+    moves = 0
+    start = time.perf_counter()
+    while True:
+        direction = search.best_move(board)
+        if direction is None:
+            break
+        board, gained, _ = move(board, direction)
+        board = add_random_tile(board, rng)
+        score += gained
+        moves += 1
+    return score, 1 << max_rank(board), moves, time.perf_counter() - start
+
+
+def run_batch(games=BATCH_GAMES, depth=BATCH_DEPTH, workers=None, seed=0):
+    """Plays seeded games across a process pool and prints score and max tile distributions."""
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        seeds = range(seed, seed + games)
+        results = list(executor.map(play_game, seeds, [depth] * games, chunksize=max(1, games // 64)))
+    elapsed = time.perf_counter() - start
+
+    scores = sorted(result[0] for result in results)
+    total_moves = sum(result[2] for result in results)
+    print(f"{games} games at depth {depth} in {elapsed:.1f} s")
+    print(f"Score: mean {statistics.mean(scores):.0f}, min {scores[0]}, max {scores[-1]}")
+    for percentile in (10, 25, 50, 75, 90):
+        print(f"  p{percentile}: {scores[min(len(scores) - 1, len(scores) * percentile // 100)]}")
+    print("Max tile:")
+    for tile, count in sorted(Counter(result[1] for result in results).items()):
+        print(f"  {tile:>6}: {count} ({100 * count / games:.1f}%)")
+    print(f"{total_moves} moves, {total_moves / elapsed:.0f} moves/s overall")
+
+
+class App:
     def __init__(self):
         pyxel.init(WINDOW_WIDTH, WINDOW_HEIGHT, title="2048 Pyxel")
         self.merge_effect_duration = 10
+        self.rng = random.Random()
+        self.auto_play = False
+        self.search = Expectimax(AUTO_PLAY_DEPTH)
         self.reset_game()
 
         pyxel.run(self.update, self.draw)
 
     def reset_game(self):
         """Resets the game state to start a new game."""
-        self.board = self.init_board()
+        self.board = new_board(self.rng)
         self.score = 0
         self.game_over = False
         self.game_won = False
         self.merge_effects = {}
 
-        self.add_random_tile()
-        self.add_random_tile()
-
     def update(self):
         """Handles game logic updates, including user input."""
         if self.game_over or self.game_won:
@@ -206,33 +392,43 @@ class App:
         for pos in effects_to_remove:
             del self.merge_effects[pos]
 
-        moved = False
-        current_merge_locations = []
-        if pyxel.btnp(pyxel.KEY_LEFT):
-            moved, current_merge_locations = self.move("left")
+        if pyxel.btnp(pyxel.KEY_A):
+            self.auto_play = not self.auto_play
+
+        direction = None
+        if self.auto_play:
+            if pyxel.frame_count % AUTO_PLAY_INTERVAL == 0:
+                direction = self.search.best_move(self.board)
+        elif pyxel.btnp(pyxel.KEY_LEFT):
+            direction = "left"
         elif pyxel.btnp(pyxel.KEY_RIGHT):
-            moved, current_merge_locations = self.move("right")
+            direction = "right"
         elif pyxel.btnp(pyxel.KEY_UP):
-            moved, current_merge_locations = self.move("up")
+            direction = "up"
         elif pyxel.btnp(pyxel.KEY_DOWN):
-            moved, current_merge_locations = self.move("down")
+            direction = "down"
+        if direction is None:
+            return
 
-        if moved:
-            self.add_random_tile()
-            for pos in current_merge_locations:
+        moved, gained, merged = move(self.board, direction)
+        if moved != self.board:
+            self.board = add_random_tile(moved, self.rng)
+            self.score += gained
+            for pos in merge_positions(merged):
                 self.merge_effects[pos] = self.merge_effect_duration
-            self.game_won = self.check_win()
-            if self.check_game_over():
+            self.game_won = max_rank(self.board) >= WIN_RANK
+            if not can_move(self.board):
                 self.game_over = True
 
     def draw(self):
         """Renders the game state to the Pyxel window."""
         pyxel.cls(COLOR_BACKGROUND)
+        board = unpack_board(self.board)
         for r in range(BOARD_SIZE):
             for c in range(BOARD_SIZE):
                 x = BOARD_OFFSET_X + c * TILE_SIZE
                 y = BOARD_OFFSET_Y + r * TILE_SIZE
-                tile_value = self.board[r][c]
+                tile_value = board[r][c]
                 tile_color_base = TILE_COLORS.get(tile_value, COLOR_EMPTY_TILE_BG)
                 draw_color = tile_color_base
                 if (r, c) in self.merge_effects:
@@ -251,6 +447,10 @@ class App:
                     pyxel.text(text_x, text_y, text, COLOR_TEXT)
 
         pyxel.text(BOARD_OFFSET_X, WINDOW_HEIGHT - 20, f"Score: {self.score}", COLOR_SCORE_TEXT)
+        if self.auto_play:
+            pyxel.text(
+                WINDOW_WIDTH - BOARD_OFFSET_X - 4 * pyxel.FONT_WIDTH, WINDOW_HEIGHT - 20, "AUTO", COLOR_SCORE_TEXT
+            )
 
         if self.game_over:
             msg = "GAME OVER! Press 'Enter' to Restart."
@@ -264,4 +464,25 @@ class App:
             pyxel.text(msg_x, msg_y, msg, COLOR_GAME_WON)
 
 
-App()
+def option_value(args, name, default):
+    if name not in args:
+        return default
+    return int(args[args.index(name) + 1])
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--batch" in args:
+        try:
+            options = {
+                "games": option_value(args, "--batch", BATCH_GAMES),
+                "depth": option_value(args, "--depth", BATCH_DEPTH),
+                "workers": option_value(args, "--workers", None),
+                "seed": option_value(args, "--seed", 0),
+            }
+        except (IndexError, ValueError):
+            print(f"Usage: python {sys.argv[0]} [--batch GAMES [--depth D] [--workers N] [--seed S]]")
+            sys.exit(1)
+        run_batch(**options)
+    else:
+        App()
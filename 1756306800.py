@@ -1,3 +1,8 @@
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pyxel
 
 BOARD_SIZE = 8
@@ -25,6 +30,290 @@ RESTART_BUTTON_H = 10
 COLOR_BUTTON_BG = 5
 COLOR_BUTTON_TEXT = 0
 
+AI_TIME_BUDGET = 1.0
+TT_MAX_ENTRIES = 1 << 20
+TIME_CHECK_INTERVAL = 1024
+WIN_SCORE = 10000
+PERFT_EXPECTED = [1, 4, 12, 56, 244, 1396, 8200, 55092]
+
+# Bit r * 8 + c of a bitboard is square (r, c). Each direction is a shift plus the mask that drops
+# bits which wrapped around to the other side of the board.
+FULL_MASK = (1 << 64) - 1
+NOT_FIRST_COLUMN = FULL_MASK & ~sum(1 << (r * 8) for r in range(8))
+NOT_LAST_COLUMN = FULL_MASK & ~sum(1 << (r * 8 + 7) for r in range(8))
+DIRECTIONS = [
+    (1, NOT_FIRST_COLUMN),
+    (-1, NOT_LAST_COLUMN),
+    (8, FULL_MASK),
+    (-8, FULL_MASK),
+    (9, NOT_FIRST_COLUMN),
+    (7, NOT_LAST_COLUMN),
+    (-7, NOT_FIRST_COLUMN),
+    (-9, NOT_LAST_COLUMN),
+]
+SQUARE_WEIGHTS = [
+    100, -20, 10, 5, 5, 10, -20, 100,
+    -20, -50, -2, -2, -2, -2, -50, -20,
+    10, -2, -1, -1, -1, -1, -2, 10,
+    5, -2, -1, -1, -1, -1, -2, 5,
+    5, -2, -1, -1, -1, -1, -2, 5,
+    10, -2, -1, -1, -1, -1, -2, 10,
+    -20, -50, -2, -2, -2, -2, -50, -20,
+    100, -20, 10, 5, 5, 10, -20, 100,
+]  # fmt: skip
+WEIGHT_MASKS = [
+    (weight, sum(1 << sq for sq in range(64) if SQUARE_WEIGHTS[sq] == weight)) for weight in set(SQUARE_WEIGHTS)
+]
+MOBILITY_WEIGHT = 5
+
+_zobrist = random.Random(2025)
+PIECE_KEYS = [[_zobrist.getrandbits(64) for _ in range(64)] for _ in (BLACK, WHITE)]
+FLIP_KEYS = [black_key ^ white_key for black_key, white_key in zip(*PIECE_KEYS)]
+SIDE_KEY = _zobrist.getrandbits(64)
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+def shift(bits, amount, mask):
+    return ((bits << amount) if amount > 0 else (bits >> -amount)) & mask
+
+
+def iter_squares(bits):
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+def legal_moves(own, opp):
+    """Returns the bitboard of squares where the side owning `own` can play."""
+    empty = ~(own | opp) & FULL_MASK
+    moves = 0
+    for amount, mask in DIRECTIONS:
+        line = shift(own, amount, mask) & opp
+        for _ in range(5):
+            line |= shift(line, amount, mask) & opp
+        moves |= shift(line, amount, mask) & empty
+    return moves
+
+
+def flipped_by(own, opp, move_bit):
+    """Returns the bitboard of opponent discs flipped by playing move_bit."""
+    flipped = 0
+    for amount, mask in DIRECTIONS:
+        line = 0
+        square = shift(move_bit, amount, mask)
+        while square & opp:
+            line |= square
+            square = shift(square, amount, mask)
+        if square & own:
+            flipped |= line
+    return flipped
+
+
+def board_to_bitboards(board):
+    """Converts a list-of-lists board into (black, white) bitboards."""
+    black = 0
+    white = 0
+    for r in range(BOARD_SIZE):
+        for c in range(BOARD_SIZE):
+            if board[r][c] == BLACK:
+                black |= 1 << (r * 8 + c)
+            elif board[r][c] == WHITE:
+                white |= 1 << (r * 8 + c)
+    return black, white
+
+
+def position_hash(own, opp, player):
+    opponent = BLACK if player == WHITE else WHITE
+    h = SIDE_KEY if player == WHITE else 0
+    for sq in iter_squares(own):
+        h ^= PIECE_KEYS[player - 1][sq]
+    for sq in iter_squares(opp):
+        h ^= PIECE_KEYS[opponent - 1][sq]
+    return h
+
+
+def perft(own, opp, depth, passed=False):
+    """Counts leaf positions at the given depth, counting a forced pass as a move."""
+    if depth == 0:
+        return 1
+    moves = legal_moves(own, opp)
+    if not moves:
+        return 0 if passed else perft(opp, own, depth - 1, True)
+    total = 0
+    for sq in iter_squares(moves):
+        flipped = flipped_by(own, opp, 1 << sq)
+        total += perft(opp & ~flipped, own | flipped | (1 << sq), depth - 1)
+    return total
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchEngine:
+    """Alpha-beta search on bitboards with iterative deepening, a Zobrist transposition table and move ordering."""
+
+    def __init__(self):
+        self.table = {}
+        self.nodes = 0
+        self.deadline = None
+        self.depth_reached = 0
+
+    def search(self, own, opp, player, time_budget=AI_TIME_BUDGET):
+        """Returns the best square (r * 8 + c) for player within time_budget seconds, or None without moves."""
+        moves = list(iter_squares(legal_moves(own, opp)))
+        self.nodes = 0
+        self.depth_reached = 0
+        if len(moves) <= 1:
+            return moves[0] if moves else None
+        if len(self.table) > TT_MAX_ENTRIES:
+            self.table.clear()
+
+        start = time.perf_counter()
+        h = position_hash(own, opp, player)
+        empties = 64 - (own | opp).bit_count()
+        best_move = max(moves, key=SQUARE_WEIGHTS.__getitem__)
+        for depth in range(1, empties + 1):
+            # The first iteration always completes so there is a searched move to fall back on.
+            self.deadline = None if depth == 1 else start + time_budget
+            try:
+                best_move = self._search_root(own, opp, h, player, depth, moves, best_move)
+            except SearchTimeout:
+                break
+            self.depth_reached = depth
+            if time.perf_counter() - start > time_budget / 2:
+                break
+        return best_move
+
+    def _search_root(self, own, opp, h, player, depth, moves, previous_best):
+        alpha = -WIN_SCORE * 2
+        best_move = previous_best
+        ordered = sorted(moves, key=lambda sq: (sq != previous_best, -SQUARE_WEIGHTS[sq]))
+        for sq in ordered:
+            value = -self._child(own, opp, h, player, sq, depth - 1, -WIN_SCORE * 2, -alpha)
+            if value > alpha:
+                alpha = value
+                best_move = sq
+        self.table[h] = (depth, alpha, EXACT, best_move)
+        return best_move
+
+    def _child(self, own, opp, h, player, sq, depth, alpha, beta):
+        move_bit = 1 << sq
+        flipped = flipped_by(own, opp, move_bit)
+        h ^= PIECE_KEYS[player - 1][sq] ^ SIDE_KEY
+        for flipped_sq in iter_squares(flipped):
+            h ^= FLIP_KEYS[flipped_sq]
+        opponent = BLACK if player == WHITE else WHITE
+        return self._negamax(opp & ~flipped, own | flipped | move_bit, h, opponent, depth, alpha, beta)
+
+    def _negamax(self, own, opp, h, player, depth, alpha, beta, passed=False):
+        self.nodes += 1
+        if self.deadline and self.nodes % TIME_CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+
+        entry = self.table.get(h)
+        tt_move = None
+        if entry:
+            entry_depth, entry_value, entry_flag, tt_move = entry
+            if entry_depth >= depth:
+                if entry_flag == EXACT:
+                    return entry_value
+                if entry_flag == LOWER_BOUND:
+                    alpha = max(alpha, entry_value)
+                else:
+                    beta = min(beta, entry_value)
+                if alpha >= beta:
+                    return entry_value
+
+        moves = legal_moves(own, opp)
+        if not moves:
+            if passed:
+                diff = own.bit_count() - opp.bit_count()
+                return ((diff > 0) - (diff < 0)) * WIN_SCORE + diff
+            opponent = BLACK if player == WHITE else WHITE
+            return -self._negamax(opp, own, h ^ SIDE_KEY, opponent, depth, -beta, -alpha, True)
+        if depth == 0:
+            return self.evaluate(own, opp, moves)
+
+        alpha_orig = alpha
+        best_value = -WIN_SCORE * 2
+        best_move = None
+        ordered = sorted(iter_squares(moves), key=lambda sq: (sq != tt_move, -SQUARE_WEIGHTS[sq]))
+        for sq in ordered:
+            value = -self._child(own, opp, h, player, sq, depth - 1, -beta, -alpha)
+            if value > best_value:
+                best_value = value
+                best_move = sq
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                break
+
+        if best_value <= alpha_orig:
+            flag = UPPER_BOUND
+        elif best_value >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.table[h] = (depth, best_value, flag, best_move)
+        return best_value
+
+    def evaluate(self, own, opp, own_moves):
+        """Scores a position for the side to move from square weights and mobility."""
+        score = MOBILITY_WEIGHT * (own_moves.bit_count() - legal_moves(opp, own).bit_count())
+        for weight, mask in WEIGHT_MASKS:
+            score += weight * ((own & mask).bit_count() - (opp & mask).bit_count())
+        return score
+
+
+def initial_bitboards():
+    return (1 << 28) | (1 << 35), (1 << 27) | (1 << 36)
+
+
+def run_benchmark(time_budget=0.5):
+    """Checks move generation with perft and reports search speed over a self-played game."""
+    black, white = initial_bitboards()
+    for depth, expected in enumerate(PERFT_EXPECTED):
+        start = time.perf_counter()
+        count = perft(black, white, depth)
+        status = "ok" if count == expected else f"expected {expected}"
+        print(f"perft({depth}) = {count} in {time.perf_counter() - start:.3f} s: {status}")
+
+    engine = SearchEngine()
+    player = BLACK
+    total_nodes = 0
+    total_time = 0.0
+    passed = False
+    while True:
+        own, opp = (black, white) if player == BLACK else (white, black)
+        start = time.perf_counter()
+        move = engine.search(own, opp, player, time_budget)
+        elapsed = time.perf_counter() - start
+        if move is None:
+            if passed:
+                break
+            passed = True
+        else:
+            passed = False
+            total_nodes += engine.nodes
+            total_time += elapsed
+            print(
+                f"{'BLACK' if player == BLACK else 'WHITE'} {divmod(move, 8)}: depth {engine.depth_reached}, "
+                f"{engine.nodes} nodes, {engine.nodes / max(elapsed, 1e-9):.0f} nodes/s"
+            )
+            move_bit = 1 << move
+            flipped = flipped_by(own, opp, move_bit)
+            own |= flipped | move_bit
+            opp &= ~flipped
+            black, white = (own, opp) if player == BLACK else (opp, own)
+        player = BLACK if player == WHITE else WHITE
+    print(f"Final score BLACK {black.bit_count()} WHITE {white.bit_count()}")
+    print(f"Total: {total_nodes} nodes in {total_time:.2f} s ({total_nodes / max(total_time, 1e-9):.0f} nodes/s)")
+
 
 class App:
     def __init__(self):
@@ -34,6 +323,9 @@ class App:
         self.ai_player = WHITE
         self.ai_move_delay = 30
         self.ai_timer = 0
+        self.ai_engine = SearchEngine()
+        self.ai_executor = ThreadPoolExecutor(max_workers=1)
+        self.ai_future = None
 
         self.reset_game()
         self.message = ""
@@ -53,6 +345,8 @@ class App:
         self.valid_moves = self._get_valid_moves(self.turn)
         self.message = ""
         self.ai_timer = 0
+        # A search still running for the previous game finishes in the background and its result is dropped.
+        self.ai_future = None
 
     def _is_on_board(self, r, c):
         return 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE
@@ -69,27 +363,6 @@ class App:
             return True
         return False
 
-    def _count_flips_for_direction(self, r, c, dr, dc, player):
-        opponent = BLACK if player == WHITE else WHITE
-        r_curr, c_curr = r + dr, c + dc
-        path = []
-        while self._is_on_board(r_curr, c_curr) and self.board[r_curr][c_curr] == opponent:
-            path.append((r_curr, c_curr))
-            r_curr += dr
-            c_curr += dc
-        if self._is_on_board(r_curr, c_curr) and self.board[r_curr][c_curr] == player:
-            return len(path)
-        return 0
-
-    def _count_flips_for_move(self, r, c, player):
-        total_flips = 0
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == 0 and dc == 0:
-                    continue
-                total_flips += self._count_flips_for_direction(r, c, dr, dc, player)
-        return total_flips
-
     def _is_valid_move(self, r, c, player):
         if not self._is_on_board(r, c) or self.board[r][c] != EMPTY:
             return False
@@ -109,21 +382,11 @@ class App:
                     moves.append((r, c))
         return moves
 
-    def _get_best_ai_move(self, player):
-        max_flips = -1
-        candidate_moves = []
-
-        for r, c in self.valid_moves:
-            flips = self._count_flips_for_move(r, c, player)
-            if flips > max_flips:
-                max_flips = flips
-                candidate_moves = [(r, c)]
-            elif flips == max_flips:
-                candidate_moves.append((r, c))
-
-        if candidate_moves:
-            return candidate_moves[pyxel.rndi(0, len(candidate_moves) - 1)]
-        return None
+    def _start_ai_search(self, player):
+        """Starts the engine on a worker thread so the frame loop keeps running while it thinks."""
+        black, white = board_to_bitboards(self.board)
+        own, opp = (black, white) if player == BLACK else (white, black)
+        self.ai_future = self.ai_executor.submit(self.ai_engine.search, own, opp, player)
 
     def _flip_pieces_direction(self, r, c, dr, dc, player):
         opponent = BLACK if player == WHITE else WHITE
@@ -195,10 +458,15 @@ class App:
             return
         if self.turn == self.ai_player:
             self.ai_timer += 1
-            if self.ai_timer >= self.ai_move_delay:
-                if self.valid_moves:
-                    r, c = self._get_best_ai_move(self.turn)
-                    self._make_move(r, c, self.turn)
+            if self.ai_future is None and self.valid_moves:
+                self._start_ai_search(self.turn)
+            if self.ai_timer >= self.ai_move_delay and (self.ai_future is None or self.ai_future.done()):
+                if self.ai_future is not None:
+                    move = self.ai_future.result()
+                    self.ai_future = None
+                    if move is not None:
+                        r, c = divmod(move, BOARD_SIZE)
+                        self._make_move(r, c, self.turn)
                 self._advance_turn()
             return
         if pyxel.btnp(pyxel.MOUSE_BUTTON_LEFT):
@@ -261,4 +529,8 @@ class App:
             pyxel.text(BOARD_OFFSET_X, HEIGHT - 20, turn_text, COLOR_TEXT)
 
 
-App()
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv[1:]:
+        run_benchmark()
+    else:
+        App()
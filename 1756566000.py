@@ -1,3 +1,9 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 from PIL import Image
 
 WIDTH, HEIGHT = 1024, 1024
@@ -6,27 +12,224 @@ RE_START, RE_END = -2, 1
 IM_START, IM_END = -1.5, 1.5
 MAX_ITER = 256
 
-img = Image.new("RGB", (WIDTH, HEIGHT))
-pixels = img.load()
+TILE_SIZE = 128
+SMOOTH_BAILOUT = 256.0
+CHECK_SIZE = 160
+ZOOM_CENTER = (-0.743643887037151, 0.131825904205330)
+ZOOM_FACTOR = 0.9
+ZOOM_DIR = "mandelbrot_zoom"
+
+
+def report(mode, pixels, elapsed):
+    print(f"{mode}: {pixels / 1e6:.2f} MP in {elapsed:.2f} s ({pixels / 1e6 / max(elapsed, 1e-9):.2f} MP/s)")
+
+
+def render_reference(width, height, bounds):
+    """Renders pixel by pixel with Python complex numbers."""
+    re_start, re_end, im_start, im_end = bounds
+    img = Image.new("RGB", (width, height))
+    pixels = img.load()
+
+    for x in range(width):
+        for y in range(height):
+            c_real = re_start + (x / width) * (re_end - re_start)
+            c_imag = im_start + (y / height) * (im_end - im_start)
+
+            c = complex(c_real, c_imag)
+            z = complex(0, 0)
+
+            for i in range(MAX_ITER):
+                z = z * z + c
+                if abs(z) > 2:
+                    break
 
-for x in range(WIDTH):
-    for y in range(HEIGHT):
-        c_real = RE_START + (x / WIDTH) * (RE_END - RE_START)
-        c_imag = IM_START + (y / HEIGHT) * (IM_END - IM_START)
+            if i == MAX_ITER - 1:
+                pixels[x, y] = (0, 0, 0)
+            else:
+                color_component = int(10 + 245 * ((i + 1) / MAX_ITER))
+                pixels[x, y] = (color_component, color_component // 2, color_component // 4)
+    return img
 
-        c = complex(c_real, c_imag)
-        z = complex(0, 0)
 
-        for i in range(MAX_ITER):
-            z = z * z + c
-            if abs(z) > 2:
+def escape_counts(c_real, c_imag, max_iter=MAX_ITER, bailout=2.0):
+    """Iterates a tile of c values and returns the escape iteration of each point and |z| when it escaped.
+
+    Points that never escape get max_iter - 1, like the last value of the reference loop counter.
+    Points inside the main cardioid or the period-2 bulb, or whose orbit repeats exactly, are
+    known not to escape and are dropped from the iteration early."""
+    iterations = np.full(c_real.shape, max_iter - 1, dtype=np.int32)
+    magnitude = np.zeros(c_real.shape)
+
+    q = (c_real - 0.25) ** 2 + c_imag**2
+    interior = (q * (q + (c_real - 0.25)) <= 0.25 * c_imag**2) | ((c_real + 1) ** 2 + c_imag**2 <= 1 / 16)
+    index = np.flatnonzero(~interior)
+    cr = c_real.ravel()[index]
+    ci = c_imag.ravel()[index]
+    zr = np.zeros_like(cr)
+    zi = np.zeros_like(ci)
+    saved_r = zr.copy()
+    saved_i = zi.copy()
+    flat_iterations = iterations.ravel()
+    flat_magnitude = magnitude.ravel()
+    limit = bailout * bailout
+    period = 8
+
+    for i in range(max_iter):
+        # Same operation order as complex multiplication, so results match the reference loop bit for bit.
+        zr2 = zr * zr
+        zi2 = zi * zi
+        zi = (zr * zi) * 2 + ci
+        zr = zr2 - zi2 + cr
+        escaped = zr * zr + zi * zi > limit
+        if bailout == 2.0:
+            # |z| > 2 is decided with hypot for the points close enough to the circle for rounding to matter.
+            near = np.abs(zr * zr + zi * zi - limit) < 1e-9
+            if near.any():
+                escaped[near] = np.hypot(zr[near], zi[near]) > bailout
+        if escaped.any():
+            flat_iterations[index[escaped]] = i
+            flat_magnitude[index[escaped]] = np.hypot(zr[escaped], zi[escaped])
+        cycling = (zr == saved_r) & (zi == saved_i) & ~escaped
+        keep = ~(escaped | cycling)
+        if not keep.all():
+            index, cr, ci, zr, zi = index[keep], cr[keep], ci[keep], zr[keep], zi[keep]
+            saved_r, saved_i = saved_r[keep], saved_i[keep]
+            if not len(index):
                 break
+        if i % period == period - 1:
+            # Brent-style periodicity check: compare against a snapshot taken at growing intervals.
+            saved_r = zr.copy()
+            saved_i = zi.copy()
+            period = min(period * 2, 256)
+    return iterations, magnitude
+
+
+def colorize(iterations, magnitude, max_iter=MAX_ITER, smooth=False):
+    """Maps escape iterations to the red-brown gradient, with interior points black."""
+    if smooth:
+        escaped = magnitude > 0
+        log_magnitude = np.log(np.where(escaped, magnitude, 2.0))
+        mu = iterations + 2 - np.log2(np.maximum(log_magnitude, 1e-12) / np.log(2.0))
+        value = 10 + 245 * np.clip(mu / max_iter, 0, 1)
+        inside = ~escaped
+    else:
+        value = 10 + 245 * ((iterations + 1) / max_iter)
+        inside = iterations == max_iter - 1
+    component = np.where(inside, 0, value.astype(np.int64))
+    rgb = np.stack([component, component // 2, component // 4], axis=-1)
+    return rgb.astype(np.uint8)
+
+
+def render_tile(width, height, bounds, x0, y0, x1, y1, max_iter=MAX_ITER, smooth=False):
+    """Renders pixels [x0, x1) x [y0, y1) of a frame and returns (x0, y0, rgb)."""
+    re_start, re_end, im_start, im_end = bounds
+    xs = np.arange(x0, x1)
+    ys = np.arange(y0, y1)
+    c_real = re_start + (xs / width) * (re_end - re_start)
+    c_imag = im_start + (ys / height) * (im_end - im_start)
+    c_real, c_imag = np.meshgrid(c_real, c_imag)
+    bailout = SMOOTH_BAILOUT if smooth else 2.0
+    iterations, magnitude = escape_counts(c_real, c_imag, max_iter, bailout)
+    return x0, y0, colorize(iterations, magnitude, max_iter, smooth)
+
+
+def frame_tiles(width, height, tile_size=TILE_SIZE):
+    for y0 in range(0, height, tile_size):
+        for x0 in range(0, width, tile_size):
+            yield x0, y0, min(x0 + tile_size, width), min(y0 + tile_size, height)
+
+
+def render_frame(width, height, bounds, executor=None, max_iter=MAX_ITER, smooth=False):
+    """Renders a frame tile by tile, across the executor's workers when one is given."""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    if executor is None:
+        results = (render_tile(width, height, bounds, *tile, max_iter, smooth) for tile in frame_tiles(width, height))
+    else:
+        futures = [
+            executor.submit(render_tile, width, height, bounds, *tile, max_iter, smooth)
+            for tile in frame_tiles(width, height)
+        ]
+        results = (future.result() for future in futures)
+    for x0, y0, rgb in results:
+        frame[y0 : y0 + rgb.shape[0], x0 : x0 + rgb.shape[1]] = rgb
+    return Image.fromarray(frame, "RGB")
+
+
+def zoom_bounds(frame):
+    """Returns the view of a zoom frame, shrinking around ZOOM_CENTER by ZOOM_FACTOR per frame."""
+    scale = ZOOM_FACTOR**frame
+    half_re = (RE_END - RE_START) / 2 * scale
+    half_im = (IM_END - IM_START) / 2 * scale
+    center_re = RE_START + (RE_END - RE_START) / 2
+    center_im = IM_START + (IM_END - IM_START) / 2
+    center_re += (ZOOM_CENTER[0] - center_re) * (1 - scale)
+    center_im += (ZOOM_CENTER[1] - center_im) * (1 - scale)
+    return center_re - half_re, center_re + half_re, center_im - half_im, center_im + half_im
+
+
+def render_zoom(frames, workers=None, smooth=False):
+    """Renders a zoom sequence to ZOOM_DIR, keeping one worker pool for every frame."""
+    os.makedirs(ZOOM_DIR, exist_ok=True)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for frame in range(frames):
+            frame_start = time.perf_counter()
+            img = render_frame(WIDTH, HEIGHT, zoom_bounds(frame), executor, smooth=smooth)
+            path = os.path.join(ZOOM_DIR, f"frame_{frame:04d}.png")
+            img.save(path)
+            report(path, WIDTH * HEIGHT, time.perf_counter() - frame_start)
+    report("Zoom sequence", WIDTH * HEIGHT * frames, time.perf_counter() - start)
+
+
+def check():
+    """Compares the vectorized renderer with the per-pixel reference on a small frame."""
+    bounds = (RE_START, RE_END, IM_START, IM_END)
+    expected = np.asarray(render_reference(CHECK_SIZE, CHECK_SIZE, bounds))
+    actual = np.asarray(render_frame(CHECK_SIZE, CHECK_SIZE, bounds))
+    mismatches = np.count_nonzero(np.any(expected != actual, axis=-1))
+    print(f"{CHECK_SIZE}x{CHECK_SIZE}: {'ok' if mismatches == 0 else f'{mismatches} pixels differ'}")
+    return mismatches == 0
+
+
+def option_value(args, name, default):
+    if name not in args:
+        return default
+    return int(args[args.index(name) + 1])
+
+
+def main():
+    args = sys.argv[1:]
+    smooth = "--smooth" in args
+    try:
+        workers = option_value(args, "--workers", None)
+        zoom_frames = option_value(args, "--zoom", None)
+    except (IndexError, ValueError):
+        print(f"Usage: python {sys.argv[0]} [--reference | --check | --zoom N] [--workers N] [--smooth]")
+        sys.exit(1)
+
+    if "--check" in args:
+        sys.exit(0 if check() else 1)
+    if zoom_frames:
+        render_zoom(zoom_frames, workers, smooth)
+        return
+
+    bounds = (RE_START, RE_END, IM_START, IM_END)
+    start = time.perf_counter()
+    if "--reference" in args:
+        img = render_reference(WIDTH, HEIGHT, bounds)
+        mode = "Per-pixel reference"
+    elif "--workers" in args:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            img = render_frame(WIDTH, HEIGHT, bounds, executor, smooth=smooth)
+        mode = f"Tiled, {workers} worker processes"
+    else:
+        img = render_frame(WIDTH, HEIGHT, bounds, smooth=smooth)
+        mode = "Tiled, single process"
+    report(mode, WIDTH * HEIGHT, time.perf_counter() - start)
+
+    img.save("mandelbrot.png")
+    print("Mandelbrot set image saved as mandelbrot.png")
 
-        if i == MAX_ITER - 1:
-            pixels[x, y] = (0, 0, 0)
-        else:
-            color_component = int(10 + 245 * ((i + 1) / MAX_ITER))
-            pixels[x, y] = (color_component, color_component // 2, color_component // 4)
 
-img.save("mandelbrot.png")
-print("Mandelbrot set image saved as mandelbrot.png")
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,9 @@
+import math
+import re
+import sys
+import time
+
+import numpy as np
 import pyxel
 
 WIDTH = 160
@@ -5,58 +11,160 @@ HEIGHT = 120
 CELL_SIZE = 4
 GRID_W = WIDTH // CELL_SIZE
 GRID_H = HEIGHT // CELL_SIZE
+DEFAULT_RULE = "B3/S23"
+COLOR_LIVE = 3
+COLOR_DEAD = 0
+BENCHMARK_SIZES = [256, 1024, 4096, 8192]
+BENCHMARK_SECONDS = 2.0
+
+
+def parse_rule(rule):
+    """Parses a rule like "B3/S23" (or "23/3" in S/B order) into birth and survival neighbour counts."""
+    text = rule.strip().upper()
+    match = re.fullmatch(r"B([0-8]*)/S([0-8]*)", text) or re.fullmatch(r"S([0-8]*)/B([0-8]*)", text)
+    if match and text.startswith("S"):
+        survive, birth = match.groups()
+    elif match:
+        birth, survive = match.groups()
+    elif match := re.fullmatch(r"([0-8]*)/([0-8]*)", text):
+        survive, birth = match.groups()
+    else:
+        raise ValueError(f"Invalid rule '{rule}', expected a form like B3/S23")
+    return {int(n) for n in birth}, {int(n) for n in survive}
+
+
+class LifeEngine:
+    """Steps a Life-like cellular automaton on a NumPy grid, counting neighbours from shifted views."""
+
+    def __init__(self, width, height, rule=DEFAULT_RULE, wrap=True):
+        self.width = width
+        self.height = height
+        self.wrap = wrap
+        birth, survive = parse_rule(rule)
+        # Next state indexed by neighbour count + 9 * current state.
+        self.lut = np.zeros(18, dtype=np.uint8)
+        self.lut[sorted(birth)] = 1
+        self.lut[[9 + n for n in sorted(survive)]] = 1
+        self.grid = np.zeros((height, width), dtype=np.uint8)
+        self.padded = np.zeros((height + 2, width + 2), dtype=np.uint8)
+        self.row_sums = np.zeros((height + 2, width), dtype=np.uint8)
+        self.counts = np.zeros((height, width), dtype=np.uint8)
+        self.generation = 0
+
+    def randomize(self, rng=None, density=0.5):
+        rng = rng or np.random.default_rng()
+        self.grid = (rng.random((self.height, self.width)) < density).astype(np.uint8)
+        self.generation = 0
+
+    def step(self):
+        """Advances one generation; cells outside the grid are dead unless the world wraps."""
+        padded = self.padded
+        padded[1:-1, 1:-1] = self.grid
+        if self.wrap:
+            padded[0, 1:-1] = self.grid[-1]
+            padded[-1, 1:-1] = self.grid[0]
+            padded[:, 0] = padded[:, -2]
+            padded[:, -1] = padded[:, 1]
+
+        # The 3x3 box sum is separable: sum each row of three, then three rows. It includes the cell itself,
+        # so adding 8 * state gives the lookup index neighbours + 9 * state.
+        h, w = self.height, self.width
+        row_sums = self.row_sums
+        counts = self.counts
+        np.add(padded[:, 0:w], padded[:, 1 : w + 1], out=row_sums)
+        row_sums += padded[:, 2 : w + 2]
+        np.add(row_sums[0:h], row_sums[1 : h + 1], out=counts)
+        counts += row_sums[2 : h + 2]
+        counts += self.grid << 3
+        self.grid = self.lut[counts]
+        self.generation += 1
+
+    def view(self, columns, rows):
+        """Downsamples the grid to at most columns x rows cells; a view cell is live if any cell in its block is."""
+        block = max(math.ceil(self.width / columns), math.ceil(self.height / rows), 1)
+        if block == 1:
+            return self.grid
+        view_h = math.ceil(self.height / block)
+        view_w = math.ceil(self.width / block)
+        padded = np.zeros((view_h * block, view_w * block), dtype=np.uint8)
+        padded[: self.height, : self.width] = self.grid
+        return padded.reshape(view_h, block, view_w, block).max(axis=(1, 3))
 
 
 class GameOfLife:
-    def __init__(self):
+    def __init__(self, world_w=GRID_W, world_h=GRID_H, rule=DEFAULT_RULE, wrap=False):
         pyxel.init(WIDTH, HEIGHT, title="Game of Life")
-        self.grid = self._init_grid()
+        self.engine = LifeEngine(world_w, world_h, rule, wrap)
+        self._init_grid()
         pyxel.run(self.update, self.draw)
 
     def _init_grid(self):
-        grid = []
-        for _ in range(GRID_H):
-            row = [pyxel.rndi(0, 1) for _ in range(GRID_W)]
-            grid.append(row)
-        return grid
+        self.engine.randomize()
+        # None forces a full redraw on the next frame.
+        self.shown = None
 
     def update(self):
         if pyxel.btnp(pyxel.KEY_RETURN):
-            self.grid = self._init_grid()
-        next_grid = [[0 for _ in range(GRID_W)] for _ in range(GRID_H)]
-        for y in range(GRID_H):
-            for x in range(GRID_W):
-                live_neighbors = self._count_live_neighbors(x, y)
-                current_cell_state = self.grid[y][x]
-                if current_cell_state == 1:
-                    if live_neighbors < 2 or live_neighbors > 3:
-                        next_grid[y][x] = 0
-                    else:
-                        next_grid[y][x] = 1
-                else:
-                    if live_neighbors == 3:
-                        next_grid[y][x] = 1
-                    else:
-                        next_grid[y][x] = 0
-        self.grid = next_grid
-
-    def _count_live_neighbors(self, x, y):
-        live_neighbors = 0
-        for dy in [-1, 0, 1]:
-            for dx in [-1, 0, 1]:
-                if dx == 0 and dy == 0:
-                    continue
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < GRID_W and 0 <= ny < GRID_H:
-                    live_neighbors += self.grid[ny][nx]
-        return live_neighbors
+            self._init_grid()
+        self.engine.step()
 
     def draw(self):
-        pyxel.cls(0)
-        for y in range(GRID_H):
-            for x in range(GRID_W):
-                if self.grid[y][x] == 1:
-                    pyxel.rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE, 3)
+        view = self.engine.view(GRID_W, GRID_H)
+        if self.shown is None or self.shown.shape != view.shape:
+            pyxel.cls(COLOR_DEAD)
+            ys, xs = np.nonzero(view)
+        else:
+            ys, xs = np.nonzero(view != self.shown)
+        # The screen keeps its contents between frames, so only cells that changed are repainted.
+        for y, x in zip(ys.tolist(), xs.tolist()):
+            color = COLOR_LIVE if view[y, x] else COLOR_DEAD
+            pyxel.rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE, color)
+        self.shown = view.copy()
+
+
+def check_glider():
+    """A glider on a wrapping 32x32 world returns to its starting cells after 128 generations."""
+    engine = LifeEngine(32, 32, wrap=True)
+    engine.grid[1, 2] = engine.grid[2, 3] = engine.grid[3, 1] = engine.grid[3, 2] = engine.grid[3, 3] = 1
+    start = engine.grid.copy()
+    for _ in range(128):
+        engine.step()
+    return np.array_equal(start, engine.grid)
+
+
+def benchmark(rule=DEFAULT_RULE):
+    """Prints generations per second for a range of wrapping world sizes."""
+    print(f"Glider check: {'ok' if check_glider() else 'FAILED'}")
+    rng = np.random.default_rng(0)
+    for size in BENCHMARK_SIZES:
+        engine = LifeEngine(size, size, rule, wrap=True)
+        engine.randomize(rng)
+        generations = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < BENCHMARK_SECONDS:
+            engine.step()
+            generations += 1
+        elapsed = time.perf_counter() - start
+        rate = generations / elapsed
+        print(f"{size}x{size}: {rate:.1f} generations/s ({rate * size * size / 1e6:.0f} M cells/s)")
+
 
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    try:
+        rule = args[args.index("--rule") + 1] if "--rule" in args else DEFAULT_RULE
+        parse_rule(rule)
+        world_w, world_h = GRID_W, GRID_H
+        if "--world" in args:
+            i = args.index("--world")
+            world_w, world_h = int(args[i + 1]), int(args[i + 2])
+    except (IndexError, ValueError) as e:
+        if isinstance(e, ValueError):
+            print(e)
+        print(f"Usage: python {sys.argv[0]} [--world W H] [--rule B3/S23] [--wrap] | --benchmark")
+        sys.exit(1)
 
-GameOfLife()
+    if "--benchmark" in args:
+        benchmark(rule)
+    else:
+        GameOfLife(world_w, world_h, rule, wrap="--wrap" in args)
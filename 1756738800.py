@@ -1,4 +1,8 @@
+import json
 import math
+import random
+import sys
+import time
 
 import pyxel
 
@@ -12,40 +16,287 @@ BLOCK_WIDTH = 20
 BLOCK_HEIGHT = 10
 BLOCK_ROWS = 5
 BLOCK_COLS = 12
+BLOCK_TOP = 20
 INITIAL_BALL_SPEED_MAGNITUDE = 2.5
 PADDLE_SPEED = 3
 
+# The ball moves at most this far per sub-step, so each sweep only looks at the few grid cells around it.
+MAX_SUBSTEP_DISTANCE = BLOCK_HEIGHT / 2
+MAX_CONTACTS_PER_SUBSTEP = 8
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+SOUNDS = {"wall": 0, "paddle": 1, "lost": 2, "block": 3}
+BENCHMARK_FRAMES = 20_000
+BENCHMARK_LEVELS = [(SCREEN_WIDTH, SCREEN_HEIGHT, BLOCK_COLS, BLOCK_ROWS), (2560, 1920, 128, 120)]
+
+
+class BlockGrid:
+    """Blocks on a grid of BLOCK_WIDTH x BLOCK_HEIGHT cells; each cell holds its block's color, or 0 if empty."""
+
+    def __init__(self, cols, rows, x0, y0):
+        self.cols = cols
+        self.rows = rows
+        self.x0 = x0
+        self.y0 = y0
+        self.cells = bytearray(cols * rows)
+        self.remaining = 0
+
+    @classmethod
+    def standard(cls, width, cols=BLOCK_COLS, rows=BLOCK_ROWS):
+        """Fills cols x rows blocks centered horizontally, colored by row like the original level."""
+        grid = cls(cols, rows, max(0, (width - cols * BLOCK_WIDTH) / 2), BLOCK_TOP)
+        for r in range(rows):
+            for c in range(cols):
+                grid.cells[r * cols + c] = (r % 6) + 8
+        grid.remaining = cols * rows
+        return grid
+
+    def block_rect(self, index):
+        x = self.x0 + (index % self.cols) * BLOCK_WIDTH
+        y = self.y0 + (index // self.cols) * BLOCK_HEIGHT
+        return x, y, x + BLOCK_WIDTH, y + BLOCK_HEIGHT
+
+    def blocks_in(self, left, top, right, bottom):
+        """Yields the indices of live blocks whose cells overlap the rectangle."""
+        c0 = max(0, math.floor((left - self.x0) / BLOCK_WIDTH))
+        c1 = min(self.cols - 1, math.floor((right - self.x0) / BLOCK_WIDTH))
+        r0 = max(0, math.floor((top - self.y0) / BLOCK_HEIGHT))
+        r1 = min(self.rows - 1, math.floor((bottom - self.y0) / BLOCK_HEIGHT))
+        cells = self.cells
+        for r in range(r0, r1 + 1):
+            for index in range(r * self.cols + c0, r * self.cols + c1 + 1):
+                if cells[index]:
+                    yield index
+
+    def remove(self, index):
+        self.cells[index] = 0
+        self.remaining -= 1
+
+
+def sweep_box(x, y, dx, dy, left, top, right, bottom):
+    """Sweeps the point (x, y) along (dx, dy) against a box; returns (t, nx, ny) of the first contact or None.
+
+    t is the fraction of the move in [0, 1] and (nx, ny) the normal of the face hit. A point that already
+    lies inside the box hits it at t = 0 on the face it entered through."""
+    if dx == 0:
+        if not left < x < right:
+            return None
+        tx_enter, tx_exit = -math.inf, math.inf
+    else:
+        t1 = (left - x) / dx
+        t2 = (right - x) / dx
+        tx_enter, tx_exit = (t1, t2) if t1 < t2 else (t2, t1)
+    if dy == 0:
+        if not top < y < bottom:
+            return None
+        ty_enter, ty_exit = -math.inf, math.inf
+    else:
+        t1 = (top - y) / dy
+        t2 = (bottom - y) / dy
+        ty_enter, ty_exit = (t1, t2) if t1 < t2 else (t2, t1)
+
+    enter = max(tx_enter, ty_enter)
+    exit_ = min(tx_exit, ty_exit)
+    if enter >= exit_ or enter > 1 or exit_ <= 0:
+        return None
+    if tx_enter > ty_enter:
+        return max(enter, 0.0), (-1 if dx > 0 else 1), 0
+    return max(enter, 0.0), 0, (-1 if dy > 0 else 1)
+
+
+class BreakoutPhysics:
+    """Breakout rules and ball physics on a fixed timestep of one frame, independent of Pyxel.
+
+    The ball is swept against walls, the paddle and the blocks in the grid cells it passes, so it cannot
+    tunnel through anything however fast it moves. step() returns the names of the sounds the frame plays."""
+
+    def __init__(self, randint, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, blocks=None):
+        self.randint = randint
+        self.width = width
+        self.height = height
+        self.paddle_y = height - PADDLE_HEIGHT - 5
+        self.blocks = blocks or BlockGrid.standard(width)
+        self.paddle_x = (width - PADDLE_WIDTH) / 2
+        self.score = 0
+        self.lives = 3
+        self.state = "PLAYING"
+        self.frames = 0
+        self._serve(width / 2)
+
+    def _serve(self, x):
+        self.ball_x = x
+        self.ball_y = self.paddle_y - BALL_RADIUS - 1
+        self.ball_vx = INITIAL_BALL_SPEED_MAGNITUDE * (1 if self.randint(0, 1) else -1) * 0.7
+        self.ball_vy = -INITIAL_BALL_SPEED_MAGNITUDE * 0.7
+
+    def step(self, buttons):
+        """Advances one frame with the given INPUT_LEFT / INPUT_RIGHT bits held."""
+        events = []
+        if self.state != "PLAYING":
+            return events
+        self.frames += 1
+        if buttons & INPUT_LEFT:
+            self.paddle_x = max(0, self.paddle_x - PADDLE_SPEED)
+        if buttons & INPUT_RIGHT:
+            self.paddle_x = min(self.width - PADDLE_WIDTH, self.paddle_x + PADDLE_SPEED)
+
+        substeps = max(1, math.ceil(math.hypot(self.ball_vx, self.ball_vy) / MAX_SUBSTEP_DISTANCE))
+        lives = self.lives
+        for _ in range(substeps):
+            self._advance(1 / substeps, events)
+            if self.state != "PLAYING" or self.lives != lives:
+                break
+        return events
+
+    def _advance(self, fraction, events):
+        """Moves the ball by fraction of its velocity, bouncing off everything it touches on the way."""
+        remaining = fraction
+        for _ in range(MAX_CONTACTS_PER_SUBSTEP):
+            hit = self._first_contact(self.ball_vx * remaining, self.ball_vy * remaining)
+            if hit is None:
+                self.ball_x += self.ball_vx * remaining
+                self.ball_y += self.ball_vy * remaining
+                break
+            t, nx, ny, kind, index = hit
+            self.ball_x += self.ball_vx * remaining * t
+            self.ball_y += self.ball_vy * remaining * t
+            remaining *= 1 - t
+            self._respond(nx, ny, kind, index, events)
+            if self.state != "PLAYING":
+                return
+
+        if (
+            self.ball_vy > 0
+            and self.paddle_y <= self.ball_y + BALL_RADIUS <= self.paddle_y + PADDLE_HEIGHT
+            and self.paddle_x <= self.ball_x <= self.paddle_x + PADDLE_WIDTH
+        ):
+            # The paddle slid under a ball that was already level with it.
+            self._respond(0, -1, "paddle", None, events)
+
+        if self.ball_y + BALL_RADIUS > self.height:
+            self.lives -= 1
+            events.append("lost")
+            if self.lives <= 0:
+                self.state = "GAME_OVER"
+            else:
+                self._serve(self.paddle_x + PADDLE_WIDTH / 2)
+
+    def _first_contact(self, dx, dy):
+        """Returns (t, nx, ny, kind, block index) of the earliest contact along (dx, dy), or None."""
+        x, y = self.ball_x, self.ball_y
+        best = None
+        # Walls: the ball's center may not come closer to them than its radius.
+        if dx < 0 and x + dx < BALL_RADIUS:
+            best = (max(0.0, (BALL_RADIUS - x) / dx), 1, 0, "wall", None)
+        elif dx > 0 and x + dx > self.width - BALL_RADIUS:
+            best = (max(0.0, (self.width - BALL_RADIUS - x) / dx), -1, 0, "wall", None)
+        if dy < 0 and y + dy < BALL_RADIUS:
+            t = max(0.0, (BALL_RADIUS - y) / dy)
+            if best is None or t < best[0]:
+                best = (t, 0, 1, "wall", None)
+
+        # Paddle: only its top face bounces the ball, and only while the center is over the paddle.
+        top = self.paddle_y - BALL_RADIUS
+        if dy > 0 and y <= top < y + dy:
+            t = (top - y) / dy
+            hit_x = x + dx * t
+            if self.paddle_x <= hit_x <= self.paddle_x + PADDLE_WIDTH and (best is None or t < best[0]):
+                best = (t, 0, -1, "paddle", None)
+
+        blocks = self.blocks
+        r = BALL_RADIUS
+        for index in blocks.blocks_in(min(x, x + dx) - r, min(y, y + dy) - r, max(x, x + dx) + r, max(y, y + dy) + r):
+            left, block_top, right, bottom = blocks.block_rect(index)
+            # Sweeping the center against the block grown by the radius is the circle-vs-box test,
+            # with square instead of rounded corners.
+            contact = sweep_box(x, y, dx, dy, left - r, block_top - r, right + r, bottom + r)
+            if contact is not None and (best is None or contact[0] < best[0]):
+                best = (*contact, "block", index)
+        return best
+
+    def _respond(self, nx, ny, kind, index, events):
+        if kind == "paddle":
+            self._bounce_off_paddle()
+        else:
+            if nx:
+                self.ball_vx = abs(self.ball_vx) * nx
+            if ny:
+                self.ball_vy = abs(self.ball_vy) * ny
+        if kind == "block":
+            self.blocks.remove(index)
+            self.score += 100
+            current_speed_mag = math.hypot(self.ball_vx, self.ball_vy)
+            if current_speed_mag < INITIAL_BALL_SPEED_MAGNITUDE * 2:
+                speed_boost_factor = 1.02
+                self.ball_vx *= speed_boost_factor
+                self.ball_vy *= speed_boost_factor
+            if self.blocks.remaining == 0:
+                self.state = "GAME_CLEAR"
+        events.append(kind)
+
+    def _bounce_off_paddle(self):
+        relative_impact = (self.ball_x - (self.paddle_x + PADDLE_WIDTH / 2)) / (PADDLE_WIDTH / 2)
+        target_speed = INITIAL_BALL_SPEED_MAGNITUDE + (self.score / 2000)
+        if target_speed > INITIAL_BALL_SPEED_MAGNITUDE * 2:
+            target_speed = INITIAL_BALL_SPEED_MAGNITUDE * 2
+        desired_ball_vx = relative_impact * INITIAL_BALL_SPEED_MAGNITUDE * 1.5
+        max_vx_for_45_deg_angle = target_speed / math.sqrt(2)
+        if abs(desired_ball_vx) > max_vx_for_45_deg_angle:
+            self.ball_vx = max_vx_for_45_deg_angle * (1 if desired_ball_vx > 0 else -1)
+        else:
+            self.ball_vx = desired_ball_vx
+        vy_squared = target_speed**2 - self.ball_vx**2
+        if vy_squared < 0:
+            vy_squared = 0
+        self.ball_vy = -math.sqrt(vy_squared)
+
+
+def replay(log, frames=None):
+    """Runs a recorded input log headless and returns the finished physics state."""
+    rng = random.Random(log["seed"])
+    physics = BreakoutPhysics(rng.randint, log.get("width", SCREEN_WIDTH), log.get("height", SCREEN_HEIGHT))
+    for buttons in log["inputs"][:frames]:
+        physics.step(int(buttons))
+        if physics.state != "PLAYING":
+            break
+    return physics
+
+
+def tracking_input(physics):
+    """Input for a player who keeps the paddle under the ball."""
+    center = physics.paddle_x + PADDLE_WIDTH / 2
+    if physics.ball_x < center - 4:
+        return INPUT_LEFT
+    if physics.ball_x > center + 4:
+        return INPUT_RIGHT
+    return 0
+
 
 class App:
-    def __init__(self):
+    def __init__(self, record_path=None):
         pyxel.init(SCREEN_WIDTH, SCREEN_HEIGHT, title="Breakout")
         pyxel.sounds[0].set("a3a2c2", "p", "7", "n", 5)
         pyxel.sounds[1].set("c3f3", "p", "7", "n", 5)
         pyxel.sounds[2].set("f1e1d1", "n", "7", "n", 5)
         pyxel.sounds[3].set("g4c4", "p", "7", "n", 5)
+        self.record_path = record_path
         self.game_state = "TITLE"
         self.reset_game()
         pyxel.run(self.update, self.draw)
 
     def reset_game(self):
-        self.paddle_x = (SCREEN_WIDTH - PADDLE_WIDTH) / 2
-        self.ball_x = SCREEN_WIDTH / 2
-        self.ball_y = PADDLE_Y - BALL_RADIUS - 1
-        self.ball_vx = INITIAL_BALL_SPEED_MAGNITUDE * (1 if pyxel.rndi(0, 1) else -1) * 0.7
-        self.ball_vy = -INITIAL_BALL_SPEED_MAGNITUDE * 0.7
-        self.score = 0
-        self.lives = 3
-        self.blocks = []
-
-        total_blocks_width = BLOCK_COLS * BLOCK_WIDTH
-        start_x_offset = (SCREEN_WIDTH - total_blocks_width) / 2
-        if start_x_offset < 0:
-            start_x_offset = 0
-        for r in range(BLOCK_ROWS):
-            for c in range(BLOCK_COLS):
-                block_x = start_x_offset + c * BLOCK_WIDTH
-                block_y = r * BLOCK_HEIGHT + 20
-                self.blocks.append({"x": block_x, "y": block_y, "alive": True, "color": (r % 6) + 8})
+        # The physics gets its own seeded generator so a recorded input log replays the same game.
+        self.seed = pyxel.rndi(0, 0x7FFFFFFF)
+        self.physics = BreakoutPhysics(random.Random(self.seed).randint)
+        self.inputs = []
+
+    def save_recording(self):
+        if not self.record_path:
+            return
+        log = {"seed": self.seed, "width": SCREEN_WIDTH, "height": SCREEN_HEIGHT, "inputs": "".join(self.inputs)}
+        with open(self.record_path, "w", encoding="utf-8") as f:
+            json.dump(log, f)
+        print(f"Recorded {len(self.inputs)} frames to {self.record_path}")
 
     def update(self):
         if self.game_state == "TITLE":
@@ -58,83 +309,17 @@ class App:
                 self.game_state = "TITLE"
             return
 
+        buttons = 0
         if pyxel.btn(pyxel.KEY_LEFT):
-            self.paddle_x = max(0, self.paddle_x - PADDLE_SPEED)
+            buttons |= INPUT_LEFT
         if pyxel.btn(pyxel.KEY_RIGHT):
-            self.paddle_x = min(SCREEN_WIDTH - PADDLE_WIDTH, self.paddle_x + PADDLE_SPEED)
-
-        self.ball_x += self.ball_vx
-        self.ball_y += self.ball_vy
-        if self.ball_x - BALL_RADIUS < 0:
-            self.ball_x = BALL_RADIUS
-            self.ball_vx *= -1
-            pyxel.play(3, 0)
-        elif self.ball_x + BALL_RADIUS > SCREEN_WIDTH:
-            self.ball_x = SCREEN_WIDTH - BALL_RADIUS
-            self.ball_vx *= -1
-            pyxel.play(3, 0)
-        if self.ball_y - BALL_RADIUS < 0:
-            self.ball_y = BALL_RADIUS
-            self.ball_vy *= -1
-            pyxel.play(3, 0)
-
-        if (
-            self.ball_vy > 0
-            and PADDLE_Y <= self.ball_y + BALL_RADIUS <= PADDLE_Y + PADDLE_HEIGHT
-            and self.paddle_x <= self.ball_x <= self.paddle_x + PADDLE_WIDTH
-        ):
-            self.ball_vy *= -1
-            relative_impact = (self.ball_x - (self.paddle_x + PADDLE_WIDTH / 2)) / (PADDLE_WIDTH / 2)
-            target_speed = INITIAL_BALL_SPEED_MAGNITUDE + (self.score / 2000)
-            if target_speed > INITIAL_BALL_SPEED_MAGNITUDE * 2:
-                target_speed = INITIAL_BALL_SPEED_MAGNITUDE * 2
-            desired_ball_vx = relative_impact * INITIAL_BALL_SPEED_MAGNITUDE * 1.5
-            max_vx_for_45_deg_angle = target_speed / math.sqrt(2)
-            if abs(desired_ball_vx) > max_vx_for_45_deg_angle:
-                self.ball_vx = max_vx_for_45_deg_angle * (1 if desired_ball_vx > 0 else -1)
-            else:
-                self.ball_vx = desired_ball_vx
-            vy_squared = target_speed**2 - self.ball_vx**2
-            if vy_squared < 0:
-                vy_squared = 0
-            self.ball_vy = -math.sqrt(vy_squared)
-            pyxel.play(3, 1)
-
-        if self.ball_y + BALL_RADIUS > SCREEN_HEIGHT:
-            self.lives -= 1
-            pyxel.play(3, 2)
-            if self.lives <= 0:
-                self.game_state = "GAME_OVER"
-            else:
-                self.ball_x = self.paddle_x + PADDLE_WIDTH / 2
-                self.ball_y = PADDLE_Y - BALL_RADIUS - 1
-                self.ball_vx = INITIAL_BALL_SPEED_MAGNITUDE * (1 if pyxel.rndi(0, 1) else -1) * 0.7
-                self.ball_vy = -INITIAL_BALL_SPEED_MAGNITUDE * 0.7
-
-        blocks_remaining = 0
-        for block in self.blocks:
-            if block["alive"]:
-                blocks_remaining += 1
-                block_x, block_y = block["x"], block["y"]
-                if (
-                    block_x < self.ball_x + BALL_RADIUS
-                    and self.ball_x - BALL_RADIUS < block_x + BLOCK_WIDTH
-                    and block_y < self.ball_y + BALL_RADIUS
-                    and self.ball_y - BALL_RADIUS < block_y + BLOCK_HEIGHT
-                ):
-                    block["alive"] = False
-                    self.score += 100
-                    pyxel.play(3, 3)
-                    self.ball_vy *= -1
-                    current_speed_mag = math.sqrt(self.ball_vx**2 + self.ball_vy**2)
-                    if current_speed_mag < INITIAL_BALL_SPEED_MAGNITUDE * 2:
-                        speed_boost_factor = 1.02
-                        self.ball_vx *= speed_boost_factor
-                        self.ball_vy *= speed_boost_factor
-                    break
-
-        if blocks_remaining == 0:
-            self.game_state = "GAME_CLEAR"
+            buttons |= INPUT_RIGHT
+        self.inputs.append(str(buttons))
+        for event in self.physics.step(buttons):
+            pyxel.play(3, SOUNDS[event])
+        if self.physics.state != "PLAYING":
+            self.game_state = self.physics.state
+            self.save_recording()
 
     def draw(self):
         pyxel.cls(0)
@@ -148,15 +333,18 @@ class App:
             pyxel.text(x_start, SCREEN_HEIGHT / 2 + 10, text_start, 7)
             return
 
-        pyxel.rect(self.paddle_x, PADDLE_Y, PADDLE_WIDTH, PADDLE_HEIGHT, 11)
-        pyxel.circ(self.ball_x, self.ball_y, BALL_RADIUS, 7)
+        physics = self.physics
+        pyxel.rect(physics.paddle_x, PADDLE_Y, PADDLE_WIDTH, PADDLE_HEIGHT, 11)
+        pyxel.circ(physics.ball_x, physics.ball_y, BALL_RADIUS, 7)
 
-        for block in self.blocks:
-            if block["alive"]:
-                pyxel.rect(block["x"], block["y"], BLOCK_WIDTH, BLOCK_HEIGHT, block["color"])
+        blocks = physics.blocks
+        for index, color in enumerate(blocks.cells):
+            if color:
+                x, y, _, _ = blocks.block_rect(index)
+                pyxel.rect(x, y, BLOCK_WIDTH, BLOCK_HEIGHT, color)
 
-        pyxel.text(0, 0, f"SCORE: {self.score}", 7)
-        pyxel.text(0, 10, f"LIVES: {self.lives}", 7)
+        pyxel.text(0, 0, f"SCORE: {physics.score}", 7)
+        pyxel.text(0, 10, f"LIVES: {physics.lives}", 7)
 
         if self.game_state == "GAME_OVER":
             text_game_over = "GAME OVER"
@@ -176,4 +364,58 @@ class App:
             pyxel.text(x_press_enter, SCREEN_HEIGHT / 2 + 10, text_press_enter, 7)
 
 
-App()
+def check_tunneling():
+    """Fires the ball straight up at 120 px per frame; it has to hit the bottom block of the column above it."""
+    physics = BreakoutPhysics(random.Random(0).randint)
+    blocks = physics.blocks
+    physics.ball_x = blocks.x0 + 2.5 * BLOCK_WIDTH
+    physics.ball_y = physics.paddle_y - 20
+    physics.ball_vx, physics.ball_vy = 0.0, -120.0
+    physics.step(0)
+    bottom_block = (blocks.rows - 1) * blocks.cols + 2
+    return physics.score == 100 and blocks.cells[bottom_block] == 0 and physics.ball_vy > 0
+
+
+def benchmark(frames=BENCHMARK_FRAMES):
+    """Plays the standard and a large level headless with a tracking paddle and prints frames per second."""
+    print(f"Tunneling check: {'ok' if check_tunneling() else 'FAILED'}")
+    for width, height, cols, rows in BENCHMARK_LEVELS:
+        rng = random.Random(0)
+        physics = BreakoutPhysics(rng.randint, width, height, BlockGrid.standard(width, cols, rows))
+        start = time.perf_counter()
+        while physics.frames < frames and physics.state == "PLAYING":
+            physics.step(tracking_input(physics))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{cols * rows} blocks on {width}x{height}: {physics.frames} frames in {elapsed:.2f} s "
+            f"({physics.frames / elapsed:.0f} frames/s), score {physics.score}, {physics.state.lower()}"
+        )
+
+
+def replay_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        log = json.load(f)
+    start = time.perf_counter()
+    physics = replay(log)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{path}: {physics.frames} frames in {elapsed:.3f} s ({physics.frames / max(elapsed, 1e-9):.0f} frames/s), "
+        f"score {physics.score}, lives {physics.lives}, {physics.state.lower()}"
+    )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    try:
+        replay_path = args[args.index("--replay") + 1] if "--replay" in args else None
+        record_path = args[args.index("--record") + 1] if "--record" in args else None
+    except IndexError:
+        print(f"Usage: python {sys.argv[0]} [--record LOG | --replay LOG | --benchmark]")
+        sys.exit(1)
+
+    if "--benchmark" in args:
+        benchmark()
+    elif replay_path:
+        replay_file(replay_path)
+    else:
+        App(record_path)
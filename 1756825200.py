@@ -1,13 +1,489 @@
 import difflib
+import functools
+import html
+import mmap
 import os
+import random
 import sys
+import tempfile
+import time
+from bisect import bisect_left
+from collections import Counter
 
 import click
 
+MYERS_MAX_D = 1000
+HTML_CONTEXT = 5
+HTML_PAGE_ROWS = 5000
+BENCHMARK_SIZES = [10_000, 100_000, 1_000_000]
+BENCHMARK_EDIT_RATE = 0.01
+DIFFLIB_MAX_LINES = 100_000
+HTMLDIFF_MAX_LINES = 10_000
+
+HTML_HEADER = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: monospace; }}
+table {{ border-collapse: collapse; width: 100%; table-layout: fixed; }}
+td {{ padding: 0 4px; white-space: pre-wrap; word-break: break-all; vertical-align: top; }}
+td.num {{ width: 4em; text-align: right; color: #888; background: #f4f4f4; }}
+tr.skip td {{ background: #f8f8f8; color: #888; text-align: center; }}
+.add {{ background: #dfd; }}
+.sub {{ background: #fdd; }}
+.chg {{ background: #ffc; }}
+</style>
+</head>
+<body>
+<table>
+<tr><th colspan="2">{fromdesc}</th><th colspan="2">{todesc}</th></tr>
+"""
+HTML_FOOTER = """</table>
+{nav}
+</body>
+</html>
+"""
+
+
+def read_lines(path):
+    """Reads a file's lines as bytes through mmap; line endings are normalized to \\n like text mode does."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b"\r") == -1:
+                return mm[:].splitlines(keepends=True)
+            data = mm[:]
+    return data.replace(b"\r\n", b"\n").replace(b"\r", b"\n").splitlines(keepends=True)
+
+
+def line_ids(lines1, lines2):
+    """Maps equal lines of both files to the same small int, so the diff compares ints instead of strings."""
+    table = {}
+    ids1 = [table.setdefault(line, len(table)) for line in lines1]
+    ids2 = [table.setdefault(line, len(table)) for line in lines2]
+    return ids1, ids2
+
+
+def unique_anchors(a, b, alo, ahi, blo, bhi):
+    """Returns the (i, j) pairs of lines that occur once in each region, in their longest common order."""
+    count_a = Counter(a[alo:ahi])
+    count_b = Counter(b[blo:bhi])
+    position_b = {line: j for j, line in enumerate(b[blo:bhi], blo) if count_b[line] == 1}
+    pairs = [
+        (i, position_b[line]) for i, line in enumerate(a[alo:ahi], alo) if count_a[line] == 1 and line in position_b
+    ]
+
+    # Patience sorting: the longest increasing subsequence of b positions, in a order.
+    tails = []
+    tail_index = []
+    previous = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        k = bisect_left(tails, j)
+        if k == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[k] = j
+            tail_index[k] = index
+        previous[index] = tail_index[k - 1] if k else -1
+    anchors = []
+    index = tail_index[-1] if tail_index else -1
+    while index >= 0:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+@functools.cache
+def warn_not_minimal():
+    click.echo(
+        f"Warning: a region needed more than {MYERS_MAX_D} edits and was split at its midpoint; "
+        "the diff is correct but may not be minimal.",
+        err=True,
+    )
+
+
+def myers_blocks(a, b, alo, ahi, blo, bhi, max_d=MYERS_MAX_D):
+    """Myers' O(ND) greedy diff of a region; returns its matching blocks, or None if it needs more than max_d edits."""
+    n = ahi - alo
+    m = bhi - blo
+    if abs(n - m) > max_d:
+        return None
+    limit = min(n + m, max_d)
+    offset = limit + 1
+    v = [0] * (2 * limit + 3)
+    trace = []
+    for d in range(limit + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                trace.append(v[offset - d : offset + d + 1])
+                return _myers_backtrack(trace, alo, blo, n, m)
+        trace.append(v[offset - d : offset + d + 1])
+    return None
+
+
+def _myers_backtrack(trace, alo, blo, x, y):
+    blocks = []
+    for d in range(len(trace) - 1, 0, -1):
+        k = x - y
+        previous = trace[d - 1]
+        # previous holds k from -(d - 1) to d - 1.
+        if k == -d or (k != d and previous[k - 1 + d - 1] < previous[k + 1 + d - 1]):
+            prev_k = k + 1
+            prev_x = previous[prev_k + d - 1]
+            start_x = prev_x
+        else:
+            prev_k = k - 1
+            prev_x = previous[prev_k + d - 1]
+            start_x = prev_x + 1
+        if x > start_x:
+            blocks.append((alo + start_x, blo + start_x - k, x - start_x))
+        x, y = prev_x, prev_x - prev_k
+    if x > 0:
+        blocks.append((alo, blo, x))
+    blocks.reverse()
+    return blocks
+
+
+def matching_blocks(a, b, alo=0, ahi=None, blo=0, bhi=None):
+    """Yields (i, j, n) runs of equal lines in order, using patience diff with Myers for anchorless regions.
+
+    Common prefixes and suffixes are matched first; the rest is split on lines unique to both sides and
+    each gap is diffed recursively. A gap with no unique lines that Myers cannot finish within MYERS_MAX_D
+    edits is cut in half on both sides and each half is diffed again, so the recursion stays shallow."""
+    ahi = len(a) if ahi is None else ahi
+    bhi = len(b) if bhi is None else bhi
+    prefix = 0
+    while alo + prefix < ahi and blo + prefix < bhi and a[alo + prefix] == b[blo + prefix]:
+        prefix += 1
+    if prefix:
+        yield alo, blo, prefix
+        alo += prefix
+        blo += prefix
+    suffix = 0
+    while alo < ahi - suffix and blo < bhi - suffix and a[ahi - suffix - 1] == b[bhi - suffix - 1]:
+        suffix += 1
+    ahi -= suffix
+    bhi -= suffix
+
+    if alo < ahi and blo < bhi:
+        anchors = unique_anchors(a, b, alo, ahi, blo, bhi)
+        if anchors:
+            i, j = alo, blo
+            for anchor_i, anchor_j in anchors:
+                if i < anchor_i or j < anchor_j:
+                    yield from matching_blocks(a, b, i, anchor_i, j, anchor_j)
+                yield anchor_i, anchor_j, 1
+                i, j = anchor_i + 1, anchor_j + 1
+            yield from matching_blocks(a, b, i, ahi, j, bhi)
+        elif not set(a[alo:ahi]).isdisjoint(b[blo:bhi]):
+            # No line is unique to both sides: fall back to Myers, or split the region if it is too far apart.
+            blocks = myers_blocks(a, b, alo, ahi, blo, bhi)
+            if blocks is not None:
+                yield from blocks
+            else:
+                warn_not_minimal()
+                amid = (alo + ahi) // 2
+                bmid = (blo + bhi) // 2
+                yield from matching_blocks(a, b, alo, amid, blo, bmid)
+                yield from matching_blocks(a, b, amid, ahi, bmid, bhi)
+    if suffix:
+        yield ahi, bhi, suffix
+
+
+def change_tag(i1, i2, j1, j2):
+    return "replace" if i1 < i2 and j1 < j2 else ("delete" if i1 < i2 else "insert")
+
+
+def opcodes(a, b):
+    """Yields difflib-style (tag, i1, i2, j1, j2) opcodes as the matching blocks are found."""
+    i = j = 0
+    equal = None
+    for block_i, block_j, size in matching_blocks(a, b):
+        if equal is not None and equal[1] == block_i and equal[3] == block_j:
+            equal[1] += size
+            equal[3] += size
+            continue
+        if equal is not None:
+            yield ("equal", *equal)
+            i, j = equal[1], equal[3]
+        if i < block_i or j < block_j:
+            yield change_tag(i, block_i, j, block_j), i, block_i, j, block_j
+        equal = [block_i, block_i + size, block_j, block_j + size]
+    if equal is not None:
+        yield ("equal", *equal)
+        i, j = equal[1], equal[3]
+    if i < len(a) or j < len(b):
+        yield change_tag(i, len(a), j, len(b)), i, len(a), j, len(b)
+
+
+def grouped_opcodes(codes, n=3):
+    """Groups opcodes into hunks with n lines of context, like SequenceMatcher.get_grouped_opcodes, lazily."""
+    nn = n + n
+    group = []
+    codes = iter(codes)
+    code = next(codes, None)
+    first = True
+    while code is not None:
+        following = next(codes, None)
+        tag, i1, i2, j1, j2 = code
+        if tag == "equal":
+            # Unchanged runs at the start and end keep only the n lines next to a change.
+            if first:
+                i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+            if following is None:
+                i2, j2 = min(i2, i1 + n), min(j2, j1 + n)
+            if i2 - i1 > nn:
+                group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+                yield group
+                group = []
+                i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+        first = False
+        code = following
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def decode(line):
+    return line.decode("utf-8", errors="replace")
+
+
+def format_range_unified(start, stop):
+    """Formats a hunk's line range for a unified diff header, as difflib does."""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        # An empty range is given as the line just before it.
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def format_range_context(start, stop):
+    """Formats a hunk's line range for a context diff header, as difflib does."""
+    beginning = start + 1
+    length = stop - start
+    if not length:
+        beginning -= 1
+    if length <= 1:
+        return f"{beginning}"
+    return f"{beginning},{beginning + length - 1}"
+
+
+def unified_diff(lines1, lines2, groups, fromfile, tofile):
+    """Formats hunks like difflib.unified_diff."""
+    started = False
+    for group in groups:
+        if not started:
+            started = True
+            yield f"--- {fromfile}\n"
+            yield f"+++ {tofile}\n"
+        first, last = group[0], group[-1]
+        file1_range = format_range_unified(first[1], last[2])
+        file2_range = format_range_unified(first[3], last[4])
+        yield f"@@ -{file1_range} +{file2_range} @@\n"
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in lines1[i1:i2]:
+                    yield " " + decode(line)
+                continue
+            if tag in {"replace", "delete"}:
+                for line in lines1[i1:i2]:
+                    yield "-" + decode(line)
+            if tag in {"replace", "insert"}:
+                for line in lines2[j1:j2]:
+                    yield "+" + decode(line)
+
+
+def context_diff(lines1, lines2, groups, fromfile, tofile):
+    """Formats hunks like difflib.context_diff."""
+    prefix = dict(insert="+ ", delete="- ", replace="! ", equal="  ")
+    started = False
+    for group in groups:
+        if not started:
+            started = True
+            yield f"*** {fromfile}\n"
+            yield f"--- {tofile}\n"
+        first, last = group[0], group[-1]
+        yield "***************\n"
+        yield f"*** {format_range_context(first[1], last[2])} ****\n"
+        if any(tag in {"replace", "delete"} for tag, _, _, _, _ in group):
+            for tag, i1, i2, _, _ in group:
+                if tag != "insert":
+                    for line in lines1[i1:i2]:
+                        yield prefix[tag] + decode(line)
+        yield f"--- {format_range_context(first[3], last[4])} ----\n"
+        if any(tag in {"replace", "insert"} for tag, _, _, _, _ in group):
+            for tag, _, _, j1, j2 in group:
+                if tag != "delete":
+                    for line in lines2[j1:j2]:
+                        yield prefix[tag] + decode(line)
+
+
+def html_cell(number, line, css):
+    if line is None:
+        return '<td class="num"></td><td></td>'
+    text = html.escape(decode(line).rstrip("\n"))
+    css_attribute = f' class="{css}"' if css else ""
+    return f'<td class="num">{number}</td><td{css_attribute}>{text}</td>'
+
+
+def html_rows(lines1, lines2, groups):
+    """Yields side-by-side table rows for each hunk, collapsing the unchanged lines between hunks to one row."""
+    shown_to = 0
+    for group in groups:
+        first, last = group[0], group[-1]
+        if first[1] > shown_to:
+            yield f'<tr class="skip"><td colspan="4">&#8943; {first[1] - shown_to} unchanged lines &#8943;</td></tr>\n'
+        shown_to = last[2]
+        for tag, i1, i2, j1, j2 in group:
+            css = {"equal": "", "replace": "chg", "delete": "sub", "insert": "add"}[tag]
+            for k in range(max(i2 - i1, j2 - j1)):
+                left = lines1[i1 + k] if i1 + k < i2 else None
+                right = lines2[j1 + k] if j1 + k < j2 else None
+                left_css = css if tag != "replace" or right is not None else "sub"
+                right_css = css if tag != "replace" or left is not None else "add"
+                yield f"<tr>{html_cell(i1 + k + 1, left, left_css)}{html_cell(j1 + k + 1, right, right_css)}</tr>\n"
+    if shown_to < len(lines1):
+        yield f'<tr class="skip"><td colspan="4">&#8943; {len(lines1) - shown_to} unchanged lines &#8943;</td></tr>\n'
+
+
+def html_page_path(output, page):
+    if page == 1:
+        return output
+    base, ext = os.path.splitext(output)
+    return f"{base}-{page}{ext}"
+
+
+def html_pages(rows, fromdesc, todesc, output=None, page_rows=HTML_PAGE_ROWS):
+    """Yields (page, text) chunks of the HTML document; with an output path, pages of page_rows rows are linked."""
+    header = HTML_HEADER.format(
+        title=html.escape(f"{fromdesc} vs {todesc}"), fromdesc=html.escape(fromdesc), todesc=html.escape(todesc)
+    )
+
+    def link(page, label):
+        return f'<a href="{html.escape(os.path.basename(html_page_path(output, page)))}">{label}</a>'
+
+    page = 1
+    count = 0
+    yield page, header
+    for row in rows:
+        if output and count == page_rows:
+            previous = link(page - 1, "previous") + " " if page > 1 else ""
+            yield page, HTML_FOOTER.format(nav=f"<p>{previous}{link(page + 1, 'next')}</p>")
+            page += 1
+            count = 0
+            yield page, header
+        yield page, row
+        count += 1
+    yield page, HTML_FOOTER.format(nav=f"<p>{link(page - 1, 'previous')}</p>" if page > 1 else "")
+
+
+def save_html(rows, fromdesc, todesc, output, page_rows=HTML_PAGE_ROWS):
+    """Writes the HTML pages to output, NAME-2.html, ... and returns the number of pages."""
+    outfile = None
+    page_open = 0
+    try:
+        for page, text in html_pages(rows, fromdesc, todesc, output, page_rows):
+            if page != page_open:
+                if outfile is not None:
+                    outfile.close()
+                outfile = open(html_page_path(output, page), "w", encoding="utf-8")
+                page_open = page
+            outfile.write(text)
+    finally:
+        if outfile is not None:
+            outfile.close()
+    return page_open
+
+
+def generate_corpus(size, edit_rate=BENCHMARK_EDIT_RATE, seed=0):
+    """Generates a source-like file of size lines and a copy with a fraction of lines inserted, deleted or changed."""
+    rng = random.Random(seed)
+    words = ["value", "index", "result", "self", "return", "data", "node", "count", "item", "error"]
+    lines1 = []
+    for i in range(size):
+        if i % 10 == 9:
+            lines1.append("\n")
+        elif i % 10 == 8:
+            lines1.append("    }\n")
+        else:
+            lines1.append(f"    {rng.choice(words)}_{i} = {rng.choice(words)}({rng.randint(0, 999)})\n")
+    lines2 = []
+    for i, line in enumerate(lines1):
+        roll = rng.random()
+        if roll < edit_rate / 3:
+            continue
+        if roll < 2 * edit_rate / 3:
+            lines2.append(f"    {rng.choice(words)}_{i} = changed({rng.randint(0, 999)})\n")
+            continue
+        lines2.append(line)
+        if roll < edit_rate:
+            lines2.append(f"    inserted_{i} = {rng.choice(words)}()\n")
+    return lines1, lines2
+
+
+def run_benchmark():
+    """Diffs generated corpora with this engine and difflib, and checks the engine's hunks rebuild the new file."""
+    with tempfile.TemporaryDirectory() as directory:
+        for size in BENCHMARK_SIZES:
+            text1, text2 = generate_corpus(size)
+            path1 = os.path.join(directory, "old.txt")
+            path2 = os.path.join(directory, "new.txt")
+            with open(path1, "w", encoding="utf-8") as f:
+                f.writelines(text1)
+            with open(path2, "w", encoding="utf-8") as f:
+                f.writelines(text2)
+
+            start = time.perf_counter()
+            lines1 = read_lines(path1)
+            lines2 = read_lines(path2)
+            ids1, ids2 = line_ids(lines1, lines2)
+            codes = list(opcodes(ids1, ids2))
+            output = list(unified_diff(lines1, lines2, grouped_opcodes(iter(codes)), "old.txt", "new.txt"))
+            engine = time.perf_counter() - start
+            rebuilt = [line for tag, _, _, j1, j2 in codes if tag != "delete" for line in lines2[j1:j2]]
+            valid = rebuilt == lines2 and all(
+                ids1[i1:i2] == ids2[j1:j2] for tag, i1, i2, j1, j2 in codes if tag == "equal"
+            )
+            changed = sum(line[0] in "+-" for line in output[2:] if not line.startswith("@@"))
+            print(f"{size} lines: engine {engine:.2f} s, {changed} changed lines, opcodes valid: {valid}")
+
+            if size <= DIFFLIB_MAX_LINES:
+                start = time.perf_counter()
+                expected = list(difflib.unified_diff(text1, text2, "old.txt", "new.txt"))
+                elapsed = time.perf_counter() - start
+                changed = sum(line[0] in "+-" for line in expected[2:] if not line.startswith("@@"))
+                same = "identical output" if expected == output else "different alignment"
+                print(f"  difflib.unified_diff {elapsed:.2f} s, {changed} changed lines, {same}")
+            if size <= HTMLDIFF_MAX_LINES:
+                start = time.perf_counter()
+                difflib.HtmlDiff().make_file(text1, text2, "old.txt", "new.txt")
+                elapsed = time.perf_counter() - start
+                start = time.perf_counter()
+                rows = html_rows(lines1, lines2, grouped_opcodes(opcodes(ids1, ids2), HTML_CONTEXT))
+                "".join(text for _, text in html_pages(rows, "old.txt", "new.txt"))
+                print(f"  HTML: engine {time.perf_counter() - start:.2f} s, difflib.HtmlDiff {elapsed:.2f} s")
+
 
 @click.command(context_settings=dict(help_option_names=["-h", "--help"]))
-@click.argument("file1", type=click.Path(exists=True, dir_okay=False, readable=True))
-@click.argument("file2", type=click.Path(exists=True, dir_okay=False, readable=True))
+@click.argument("file1", required=False, type=click.Path(exists=True, dir_okay=False, readable=True))
+@click.argument("file2", required=False, type=click.Path(exists=True, dir_okay=False, readable=True))
 @click.option(
     "--output",
     "-o",
@@ -21,69 +497,79 @@ import click
     "--unified", "-u", type=int, default=3, help="Generates a unified diff with N lines of context. Default is 3."
 )
 @click.option("--html", "-H", is_flag=True, help="Generates diff in HTML format. Overrides --context and --unified.")
-def diff_tool(file1, file2, output, context, unified, html):
+@click.option(
+    "--page-rows",
+    type=int,
+    default=HTML_PAGE_ROWS,
+    show_default=True,
+    help="Rows per page when saving an HTML diff to a file; later pages go to NAME-2.html, NAME-3.html, ...",
+)
+@click.option("--benchmark", is_flag=True, help="Compares the diff engine with difflib on generated files and exits.")
+def diff_tool(file1, file2, output, context, unified, html, page_rows, benchmark):
     """High-performance file DIFF tool. Displays differences between FILE1 and FILE2."""
+    if benchmark:
+        run_benchmark()
+        return
+    if file1 is None or file2 is None:
+        raise click.UsageError("FILE1 and FILE2 are required.")
     try:
-        with open(file1, "r", encoding="utf-8") as f1:
-            lines1 = f1.readlines()
-        with open(file2, "r", encoding="utf-8") as f2:
-            lines2 = f2.readlines()
+        lines1 = read_lines(file1)
+        lines2 = read_lines(file2)
     except Exception as e:
         click.echo(f"Error: Failed to read file '{file1}' or '{file2}' - {e}", err=True)
         sys.exit(1)
 
     from_file_name = os.path.basename(file1)
     to_file_name = os.path.basename(file2)
-    diff_output_lines = []
-    output_is_html = False
-
+    ids1, ids2 = line_ids(lines1, lines2)
+    n = unified
     if html:
         if context is not None:
             click.echo("Warning: --context option will be ignored because --html is specified.", err=True)
         if unified != 3:
             click.echo("Warning: --unified option will be ignored because --html is specified.", err=True)
-        differ = difflib.HtmlDiff()
-        diff_str = differ.make_file(
-            lines1,
-            lines2,
-            fromdesc=from_file_name,
-            todesc=to_file_name,
-        )
-        diff_output_lines = [diff_str]
-        output_is_html = True
+        n = HTML_CONTEXT
     elif context is not None:
         if unified != 3:
             click.echo("Warning: --unified option will be ignored because --context is specified.", err=True)
-        diff_output_lines = difflib.context_diff(
-            lines1, lines2, fromfile=from_file_name, tofile=to_file_name, n=context
-        )
+        n = context
+    groups = grouped_opcodes(opcodes(ids1, ids2), n)
+
+    if html:
+        rows = html_rows(lines1, lines2, groups)
+        if output:
+            try:
+                pages = save_html(rows, from_file_name, to_file_name, output, page_rows)
+            except Exception as e:
+                click.echo(f"Error: Failed to write to output file '{output}' - {e}", err=True)
+                sys.exit(1)
+            click.echo(f"Diff saved to '{output}'" + (f" and {pages - 1} more pages." if pages > 1 else "."))
+        else:
+            for _, text in html_pages(rows, from_file_name, to_file_name):
+                click.echo(text, nl=False)
+        return
+
+    if context is not None:
+        diff_output_lines = context_diff(lines1, lines2, groups, from_file_name, to_file_name)
     else:
-        diff_output_lines = difflib.unified_diff(
-            lines1, lines2, fromfile=from_file_name, tofile=to_file_name, n=unified
-        )
+        diff_output_lines = unified_diff(lines1, lines2, groups, from_file_name, to_file_name)
 
     if output:
         try:
             with open(output, "w", encoding="utf-8") as outfile:
-                if output_is_html:
-                    outfile.write(diff_output_lines[0])
-                else:
-                    outfile.writelines(diff_output_lines)
+                outfile.writelines(diff_output_lines)
             click.echo(f"Diff saved to '{output}'.")
         except Exception as e:
             click.echo(f"Error: Failed to write to output file '{output}' - {e}", err=True)
             sys.exit(1)
     else:
-        if output_is_html:
-            click.echo(diff_output_lines[0])
-        else:
-            for line in diff_output_lines:
-                if line.startswith("+"):
-                    click.echo(click.style(line, fg="green"), nl=False)
-                elif line.startswith("-"):
-                    click.echo(click.style(line, fg="red"), nl=False)
-                else:
-                    click.echo(line, nl=False)
+        for line in diff_output_lines:
+            if line.startswith("+"):
+                click.echo(click.style(line, fg="green"), nl=False)
+            elif line.startswith("-"):
+                click.echo(click.style(line, fg="red"), nl=False)
+            else:
+                click.echo(line, nl=False)
 
 
 if __name__ == "__main__":
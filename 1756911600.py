@@ -1,13 +1,34 @@
+import itertools
 import json
+import os
+import random
+import re
 import sys
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from json.encoder import encode_basestring
 from urllib.parse import urlsplit
 
+SUFFIX_LIST_FILE = "public_suffix_list.dat"
+CACHE_SIZE = 100_000
+CHUNK_LINES = 20_000
+BENCHMARK_URLS = 10_000_000
+BENCHMARK_HOSTS = 50_000
+BENCHMARK_BLOCK = 200_000
+BASELINE_URLS = 200_000
+BENCHMARK_SUFFIXES = ["com", "net", "org", "de", "io", "co.uk", "co.jp", "com.au", "com.br", "github.io"]
+BENCHMARK_PREFIXES = ["", "www.", "www.", "api.", "cdn.", "m.", "static.img."]
+RULE_END = ""
+EXCEPTION_END = "!"
+# A scheme and a netloc urlsplit would return unchanged: no brackets, tabs or line breaks.
+PLAIN_URL = re.compile(r"([A-Za-z]+)://([^/?#\[\]\t\r\n]+)(?=[/?#]|\Z)")
 
-def extract_domain_name_components(input_string):
-    """Parses an input string as a URL or bare domain into its first label and remaining domain name."""
+
+def find_domain_name_candidate(input_string):
+    """Returns the part of a URL, e-mail style URI or bare domain that names the domain."""
     parsed_original = urlsplit(input_string)
-    first_label = ""
-    remaining_domain_name = ""
+    domain_name_candidate = ""
 
     if parsed_original.scheme in ("mailto", "sip", "sips"):
         path_content = parsed_original.path
@@ -28,7 +49,107 @@ def extract_domain_name_components(input_string):
         domain_name_candidate = temp_parsed.netloc
     elif parsed_original.path:
         domain_name_candidate = parsed_original.path
+    return domain_name_candidate
+
+
+def fast_netloc(line):
+    """Returns the netloc of a plain scheme://netloc/... URL without going through urlsplit, or None."""
+    match = PLAIN_URL.match(line)
+    if match is None or match[1].lower() in ("mailto", "sip", "sips"):
+        return None
+    return match[2]
+
+
+def _rule_forms(rule):
+    yield rule
+    if not rule.isascii():
+        try:
+            yield ".".join(label if label == "*" else label.encode("idna").decode("ascii") for label in rule.split("."))
+        except UnicodeError:
+            pass
+
+
+def load_suffix_trie(path):
+    """Compiles a public suffix list file into a trie of nested dicts keyed by label, TLD first.
+
+    A node holding RULE_END ends a rule and one holding EXCEPTION_END ends an exception rule. Wildcard rules
+    are stored under "*" like any other label, and internationalized rules also under their punycode form."""
+    trie = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0].startswith("//"):
+                continue
+            rule = fields[0].lower()
+            marker = RULE_END
+            if rule.startswith("!"):
+                marker = EXCEPTION_END
+                rule = rule[1:]
+            for form in _rule_forms(rule):
+                node = trie
+                for label in reversed(form.split(".")):
+                    node = node.setdefault(label, {})
+                node[marker] = True
+    return trie
+
+
+def public_suffix_length(trie, labels):
+    """Returns how many labels at the end of a host form its public suffix; labels are given TLD first.
+
+    The longest matching rule wins, a matching exception rule drops that rule's leftmost label, and a TLD
+    no rule mentions is a public suffix on its own."""
+    length = 1
+    node = trie
+    for depth, label in enumerate(labels, 1):
+        child = node.get(label)
+        if child is not None and EXCEPTION_END in child:
+            return depth - 1
+        wildcard = node.get("*")
+        if (child is not None and RULE_END in child) or (wildcard is not None and RULE_END in wildcard):
+            length = depth
+        if child is None:
+            break
+        node = child
+    return length
+
 
+def normalize_host(domain_name_candidate):
+    """Strips user info, port and a trailing dot from a netloc and lowercases it."""
+    host = domain_name_candidate.rpartition("@")[2]
+    if host.startswith("["):
+        return host[: host.find("]") + 1]
+    return host.partition(":")[0].rstrip(".").lower()
+
+
+def split_host(host, trie):
+    """Splits a host into its first label and the rest like the plain split does, but never inside the
+    public suffix, and adds the public suffix and the registered domain. IP addresses are not split."""
+    if not host or host.startswith("[") or host.rpartition(".")[2].isdigit():
+        return {"first_label": "", "remaining_domain_name": host, "public_suffix": "", "registered_domain": ""}
+    labels = host.split(".")
+    suffix_length = public_suffix_length(trie, labels[::-1])
+    first_label = ""
+    remaining_domain_name = host
+    if len(labels) > suffix_length + 1:
+        first_label, remaining_domain_name = host.split(".", 1)
+    return {
+        "first_label": first_label,
+        "remaining_domain_name": remaining_domain_name,
+        "public_suffix": ".".join(labels[-suffix_length:]) if suffix_length else "",
+        "registered_domain": ".".join(labels[-suffix_length - 1 :]) if len(labels) > suffix_length else "",
+    }
+
+
+def extract_domain_name_components(input_string, trie=None):
+    """Parses an input string as a URL or bare domain into its first label and remaining domain name.
+
+    With a public suffix trie the split respects multi-label suffixes such as co.jp."""
+    domain_name_candidate = find_domain_name_candidate(input_string)
+    if trie is not None:
+        return split_host(normalize_host(domain_name_candidate), trie)
+
+    first_label = ""
+    remaining_domain_name = ""
     if domain_name_candidate:
         if domain_name_candidate.count(".") >= 2:
             parts = domain_name_candidate.split(".", 1)
@@ -40,11 +161,191 @@ def extract_domain_name_components(input_string):
     return {"first_label": first_label, "remaining_domain_name": remaining_domain_name}
 
 
+class DomainExtractor:
+    """Turns lines of URLs into JSON lines, memoizing the split of each netloc in a bounded LRU."""
+
+    def __init__(self, trie, cache_size=CACHE_SIZE):
+        self.trie = trie
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _fields(self, netloc):
+        """Returns the JSON members of a netloc's split, after the input member."""
+        cache = self.cache
+        fields = cache.get(netloc)
+        if fields is not None:
+            cache.move_to_end(netloc)
+            self.hits += 1
+            return fields
+        self.misses += 1
+        result = split_host(normalize_host(netloc), self.trie)
+        fields = "," + json.dumps(result, ensure_ascii=False, separators=(",", ":"))[1:]
+        cache[netloc] = fields
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return fields
+
+    def format_lines(self, lines):
+        """Returns one JSON line per non-blank input line, with the input line under "input"."""
+        out = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            netloc = fast_netloc(line)
+            if netloc is None:
+                try:
+                    netloc = find_domain_name_candidate(line)
+                except ValueError as e:
+                    out.append(json.dumps({"input": line, "error": str(e)}, ensure_ascii=False, separators=(",", ":")))
+                    continue
+            out.append('{"input":' + encode_basestring(line) + self._fields(netloc))
+        out.append("")
+        return "\n".join(out) if len(out) > 1 else ""
+
+
+_worker_extractor = None
+
+
+def _init_worker(suffix_list, cache_size):
+    global _worker_extractor
+    _worker_extractor = DomainExtractor(load_suffix_trie(suffix_list), cache_size)
+
+
+def _format_chunk(lines):
+    return _worker_extractor.format_lines(lines)
+
+
+def read_chunks(paths, size=CHUNK_LINES):
+    """Yields the lines of the given files, or of stdin for "-" or no files, in lists of up to size lines."""
+    for path in paths or ["-"]:
+        if path == "-":
+            sys.stdin.reconfigure(errors="replace")
+            f = sys.stdin
+        else:
+            f = open(path, encoding="utf-8", errors="replace")
+        with f:
+            while chunk := list(itertools.islice(f, size)):
+                yield chunk
+
+
+def extract_stream(chunks, suffix_list, out, workers=1, cache_size=CACHE_SIZE):
+    """Writes the JSON lines for chunks of input lines to out, in input order, and returns the line count.
+
+    With several workers each process keeps its own LRU and at most two chunks per worker are in flight."""
+    count = 0
+    if workers <= 1:
+        extractor = DomainExtractor(load_suffix_trie(suffix_list), cache_size)
+        for chunk in chunks:
+            out.write(extractor.format_lines(chunk))
+            count += len(chunk)
+        return count
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(suffix_list, cache_size)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_format_chunk, chunk))
+            count += len(chunk)
+            if len(pending) >= workers * 2:
+                out.write(pending.popleft().result())
+        while pending:
+            out.write(pending.popleft().result())
+    return count
+
+
+def synthetic_urls(count, seed=0):
+    """Yields count log-like URLs in chunks, over a pool of hosts whose popularity is heavily skewed.
+
+    One block of URLs is generated up front and repeated, so the timing covers extraction only."""
+    rng = random.Random(seed)
+    hosts = [
+        f"{rng.choice(BENCHMARK_PREFIXES)}site{i}.{rng.choice(BENCHMARK_SUFFIXES)}" for i in range(BENCHMARK_HOSTS)
+    ]
+    block = []
+    for _ in range(min(count, BENCHMARK_BLOCK)):
+        host = hosts[int(len(hosts) * rng.random() ** 3)]
+        block.append(f"https://{host}/path/{rng.randrange(10**6)}?q={rng.randrange(100)}\n")
+    block_chunks = [block[i : i + CHUNK_LINES] for i in range(0, len(block), CHUNK_LINES)]
+    produced = 0
+    for chunk in itertools.cycle(block_chunks):
+        if produced >= count:
+            return
+        chunk = chunk[: count - produced]
+        produced += len(chunk)
+        yield chunk
+
+
+def run_benchmark(count, suffix_list, workers=1):
+    """Extracts synthetic URLs to /dev/null and prints lines per second, next to the one-at-a-time path."""
+    trie = load_suffix_trie(suffix_list)
+    sample = [line.strip() for chunk in synthetic_urls(min(count, BASELINE_URLS)) for line in chunk]
+    start = time.perf_counter()
+    for line in sample:
+        json.dumps(extract_domain_name_components(line, trie), ensure_ascii=False, separators=(",", ":"))
+    elapsed = time.perf_counter() - start
+    print(f"baseline: {len(sample)} URLs in {elapsed:.2f} s ({len(sample) / elapsed:,.0f} lines/s)")
+
+    with open(os.devnull, "w", encoding="utf-8") as out:
+        start = time.perf_counter()
+        done = extract_stream(synthetic_urls(count), suffix_list, out, workers)
+        elapsed = time.perf_counter() - start
+    print(f"stream ({workers} worker(s)): {done} URLs in {elapsed:.2f} s ({done / elapsed:,.0f} lines/s)")
+
+
+def option_value(args, name, default, convert=int):
+    if name not in args:
+        return default
+    return convert(args[args.index(name) + 1])
+
+
+def print_error(message):
+    print(json.dumps({"error": message}, ensure_ascii=False, separators=(",", ":")))
+    sys.exit(1)
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        error_data = {"error": "Usage: python script.py <url_or_domain>"}
-        print(json.dumps(error_data, ensure_ascii=False, separators=(",", ":")))
-        sys.exit(1)
-    input_arg = sys.argv[1]
-    result = extract_domain_name_components(input_arg)
+    args = sys.argv[1:]
+    usage = (
+        f"Usage: python {sys.argv[0]} <url_or_domain> [--suffix-list PATH] | "
+        f"--stream [FILE ...] [--suffix-list PATH] [--workers N] [--cache-size N] | "
+        f"--benchmark [URLS] [--suffix-list PATH] [--workers N]"
+    )
+    try:
+        suffix_list = option_value(args, "--suffix-list", None, str)
+        workers = option_value(args, "--workers", 1)
+        cache_size = option_value(args, "--cache-size", CACHE_SIZE)
+    except (IndexError, ValueError):
+        print_error(usage)
+    positional = []
+    i = 0
+    while i < len(args):
+        if args[i] in ("--suffix-list", "--workers", "--cache-size"):
+            i += 2
+            continue
+        positional.append(args[i])
+        i += 1
+
+    if "--stream" in positional or "--benchmark" in positional:
+        suffix_list = suffix_list or SUFFIX_LIST_FILE
+        if not os.path.isfile(suffix_list):
+            print_error(f"Public suffix list not found: {suffix_list}")
+        if "--benchmark" in positional:
+            rest = [arg for arg in positional if arg != "--benchmark"]
+            if len(rest) > 1 or (rest and not rest[0].isdigit()):
+                print_error(usage)
+            run_benchmark(int(rest[0]) if rest else BENCHMARK_URLS, suffix_list, workers)
+        else:
+            paths = [arg for arg in positional if arg != "--stream"]
+            for path in paths:
+                if path != "-" and not os.path.isfile(path):
+                    print_error(f"File not found: {path}")
+            extract_stream(read_chunks(paths), suffix_list, sys.stdout, workers, cache_size)
+        sys.exit(0)
+
+    if len(positional) != 1:
+        print_error(usage)
+    trie = load_suffix_trie(suffix_list) if suffix_list else None
+    result = extract_domain_name_components(positional[0], trie)
     print(json.dumps(result, ensure_ascii=False, separators=(",", ":")))
@@ -1,29 +1,63 @@
+import bisect
+import ipaddress
+import itertools
+import os
+import random
 import socket
 import struct
 import sys
+import time
 import urllib.parse
 
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+BLOCK_BYTES = 8 * 1024 * 1024
+CHUNK_LINES = 100_000
+EXPAND_CHUNK = 65_536
+BENCHMARK_LINES = 10_000_000
+BENCHMARK_BLOCK = 200_000
+BENCHMARK_IPV6_SHARE = 0.1
+# Each octet's decimal digits right-aligned in three columns, and which of the columns they use.
+OCTET_CHARS = np.array([list(f"{octet:>3}".encode()) for octet in range(256)], dtype=np.uint8)
+OCTET_USED = OCTET_CHARS != ord(" ")
+POWERS_OF_TEN = 10 ** np.arange(1, 10, dtype=np.int64)
+
 
 def ip_to_decimal(ip_address):
     """Converts an IP address string (IPv4 or IPv6) to its decimal representation."""
     if ip_address == "::1" or ip_address == "0:0:0:0:0:0:0:1":
         ip_address = "127.0.0.1"
-    try:
-        packed_ip = socket.inet_aton(ip_address)
-        decimal_ip = struct.unpack("!I", packed_ip)[0]
-        return str(decimal_ip)
-    except socket.error:
+    if ":" not in ip_address:
         try:
-            packed_ip_v6 = socket.inet_pton(socket.AF_INET6, ip_address)
-            if packed_ip_v6[0:12] == b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\xff\xff":
-                ipv4_bytes = packed_ip_v6[12:]
-                decimal_ip = struct.unpack("!I", ipv4_bytes)[0]
-                return str(decimal_ip)
-            else:
-                decimal_ip = int.from_bytes(packed_ip_v6, byteorder="big")
-                return str(decimal_ip)
+            packed_ip = socket.inet_aton(ip_address)
+            decimal_ip = struct.unpack("!I", packed_ip)[0]
+            return str(decimal_ip)
         except socket.error:
             return None
+    try:
+        packed_ip_v6 = socket.inet_pton(socket.AF_INET6, ip_address)
+        if packed_ip_v6[0:12] == b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\xff\xff":
+            ipv4_bytes = packed_ip_v6[12:]
+            decimal_ip = struct.unpack("!I", ipv4_bytes)[0]
+            return str(decimal_ip)
+        else:
+            decimal_ip = int.from_bytes(packed_ip_v6, byteorder="big")
+            return str(decimal_ip)
+    except socket.error:
+        return None
+
+
+def decimal_to_ip(decimal):
+    """Converts a decimal string back to an address: IPv4 below 2**32, IPv6 up to 2**128, otherwise None."""
+    if not (decimal.isascii() and decimal.isdigit()):
+        return None
+    value = int(decimal)
+    if value < 2**32:
+        return socket.inet_ntoa(struct.pack("!I", value))
+    if value < 2**128:
+        return socket.inet_ntop(socket.AF_INET6, value.to_bytes(16, byteorder="big"))
+    return None
 
 
 def convert_url_ip_to_decimal(url):
@@ -46,11 +80,449 @@ def convert_url_ip_to_decimal(url):
     return new_parsed_url.geturl()
 
 
+def parse_ipv4_chars(chars, lengths):
+    """Parses dotted quads from an (n, 15) matrix of ASCII codes and their lengths, in bulk.
+
+    Returns the values as uint32 and a mask of the rows that parsed. Only four decimal octets without leading
+    zeros are accepted; IPv6 and the short, octal and hex forms inet_aton also allows are left out of the mask
+    for the scalar path. The matrix is scanned one column at a time with a few array operations per column."""
+    n = len(chars)
+    columns = np.zeros((16, n), np.int16)
+    columns[:15] = chars.T
+    lengths = np.minimum(lengths, 16).astype(np.int16)
+    ok = lengths >= 7
+    value = np.zeros(n, np.uint32)
+    octet = np.zeros(n, np.int16)
+    digits = np.zeros(n, np.int16)
+    dots = np.zeros(n, np.int16)
+    for j, column in enumerate(columns):
+        d = column - np.int16(48)
+        digit = (d >= 0) & (d <= 9)
+        dot = column == 46
+        closes = dot | (lengths == j)
+        ok &= digit | dot | (lengths <= j)
+        ok &= ~(digit & ((digits == 3) | ((digits > 0) & (octet == 0))))
+        ok &= ~(closes & ((digits == 0) | (octet > 255)))
+        value = np.where(closes, (value << np.uint32(8)) | octet.astype(np.uint32), value)
+        octet = np.where(closes, np.int16(0), octet * np.int16(10) + d)
+        digits = np.where(closes, np.int16(0), digits + np.int16(1))
+        dots += dot
+    ok &= (dots == 3) & (lengths <= 15)
+    return value, ok
+
+
+def parse_ipv4(addresses):
+    """Parses a list of address strings with parse_ipv4_chars."""
+    text = np.array(addresses, dtype="U16")
+    chars = np.minimum(text.view(np.uint32).reshape(len(addresses), 16), 255).astype(np.uint8)
+    value, ok = parse_ipv4_chars(chars[:, :15], np.strings.str_len(text))
+    return value, ok & (chars[:, 15] == 0)
+
+
+def parse_decimal_chars(chars, lengths):
+    """Parses decimal numbers below 2**32 from an (n, 10) matrix of ASCII codes and their lengths, in bulk."""
+    ok = (lengths >= 1) & (lengths <= 10)
+    value = np.zeros(len(chars), np.int64)
+    for j, column in enumerate(chars.T.astype(np.int64)):
+        inside = j < lengths
+        d = column - 48
+        ok &= ~inside | ((d >= 0) & (d <= 9))
+        value = np.where(inside, value * 10 + d, value)
+    ok &= value < 2**32
+    return value, ok
+
+
+def decimal_chars(values):
+    """Formats integers below 2**32 as an (n, 10) matrix of right-aligned ASCII digits and a mask of the used ones."""
+    chars = np.empty((10, len(values)), np.uint8)
+    rest = values.copy()
+    for j in range(9, -1, -1):
+        chars[j] = rest % 10 + 48
+        rest //= 10
+    lengths = np.searchsorted(POWERS_OF_TEN, values, side="right") + 1
+    return chars.T, np.arange(10) >= 10 - lengths[:, None]
+
+
+def ipv4_chars(values):
+    """Formats integer IPv4 addresses as an (n, 16) matrix of ASCII codes and a mask of the used ones.
+
+    Each octet takes three right-aligned columns and a dot, and the mask drops the padding and the last dot."""
+    chars = np.full((len(values), 16), 46, np.uint8)
+    used = np.ones((len(values), 16), bool)
+    used[:, 15] = False
+    for k, shift in enumerate((24, 16, 8, 0)):
+        octets = (values >> shift) & 255
+        chars[:, 4 * k : 4 * k + 3] = OCTET_CHARS[octets]
+        used[:, 4 * k : 4 * k + 3] = OCTET_USED[octets]
+    return chars, used
+
+
+def rewrite_line(line, column, convert):
+    """Converts one space-separated column of a log line, keeping a CR before the line break in place."""
+    body, cr = (line[:-1], "\r") if line.endswith("\r") else (line, "")
+    fields = body.split(" ", column + 1)
+    if len(fields) <= column or not fields[column]:
+        return line
+    try:
+        converted = convert(fields[column])
+    except ValueError:
+        converted = None
+    if converted is None:
+        return line
+    fields[column] = converted
+    return " ".join(fields) + cr
+
+
+def rewrite_lines(data, column=0, reverse=False):
+    """Converts one space-separated column of a block of log lines one line at a time.
+
+    Fields that ip_to_decimal or decimal_to_ip do not accept are left as they are, and bytes that are not
+    UTF-8 pass through unchanged."""
+    convert = decimal_to_ip if reverse else ip_to_decimal
+    lines = data.decode("utf-8", "surrogateescape").split("\n")
+    return "\n".join([rewrite_line(line, column, convert) for line in lines]).encode("utf-8", "surrogateescape")
+
+
+def gather_fields(buf, starts, lengths, width):
+    """Copies fields of buf into an (n, width) matrix, zero-padded and cut at width."""
+    windows = sliding_window_view(np.concatenate((buf, np.zeros(width, np.uint8))), width)
+    return np.where(np.arange(width) < lengths[:, None], windows[starts], 0).astype(np.uint8)
+
+
+def column_bounds(buf, column):
+    """Returns the start and end of one space-separated column on each line of buf.
+
+    A line without that column gets an empty field at its end, and a CR before the line break is not part
+    of the field."""
+    newlines = np.flatnonzero(buf == 10)
+    line_ends = newlines if len(buf) and buf[-1] == 10 else np.append(newlines, len(buf))
+    line_starts = np.concatenate(([0], newlines + 1))[: len(line_ends)]
+    spaces = np.append(np.flatnonzero(buf == 32), len(buf))
+    starts = line_starts
+    if column:
+        before = spaces[np.minimum(np.searchsorted(spaces, line_starts) + column - 1, len(spaces) - 1)]
+        starts = np.where(before < line_ends, before + 1, line_ends)
+    ends = np.minimum(spaces[np.searchsorted(spaces, starts)], line_ends)
+    cr = (ends == line_ends) & (ends > starts) & (buf[ends - 1] == 13)
+    return starts, ends - cr
+
+
+def byte_ranges(starts, lengths):
+    """Returns the indices of every byte in the ranges [starts, starts + lengths), in order."""
+    return np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+
+
+def splice(data, starts, ends, pieces, piece_lengths):
+    """Returns data with the sorted, disjoint ranges [starts, ends) replaced by consecutive runs of pieces."""
+    if not len(starts):
+        return data
+    buf = np.frombuffer(data, np.uint8)
+    keep = np.ones(len(buf), bool)
+    keep[byte_ranges(starts, ends - starts)] = False
+    growth = np.cumsum(piece_lengths - (ends - starts))
+    out = np.empty(len(buf) + growth[-1], np.uint8)
+    placed = byte_ranges(ends + growth - piece_lengths, piece_lengths)
+    out[placed] = np.frombuffer(pieces, np.uint8)
+    rest = np.ones(len(out), bool)
+    rest[placed] = False
+    out[rest] = buf[keep]
+    return out.tobytes()
+
+
+def rewrite_block(data, column=0, reverse=False):
+    """Converts one space-separated column of a block of whole log lines to decimal, or back with reverse.
+
+    Dotted quads (or decimals below 2**32 with reverse) are parsed and formatted in bulk with NumPy. Fields the
+    bulk parser leaves out (IPv6, the other inet_aton forms, anything invalid) go through ip_to_decimal or
+    decimal_to_ip one at a time like rewrite_lines() does, and fields neither accepts are left as they are."""
+    if not data:
+        return data
+    buf = np.frombuffer(data, np.uint8)
+    starts, ends = column_bounds(buf, column)
+    lengths = ends - starts
+    if reverse:
+        values, ok = parse_decimal_chars(gather_fields(buf, starts, lengths, 10), lengths)
+        chars, used = ipv4_chars(values[ok])
+        convert = decimal_to_ip
+    else:
+        values, ok = parse_ipv4_chars(gather_fields(buf, starts, lengths, 15), lengths)
+        chars, used = decimal_chars(values[ok])
+        convert = ip_to_decimal
+    rows = np.flatnonzero(ok)
+    piece_lengths = used.sum(axis=1)
+    pieces = chars[used].tobytes()
+
+    scalar_rows = []
+    scalar_pieces = []
+    fallback = np.flatnonzero(~ok & (lengths > 0))
+    for i, start, end in zip(fallback.tolist(), starts[fallback].tolist(), ends[fallback].tolist()):
+        try:
+            converted = convert(data[start:end].decode("utf-8"))
+        except ValueError:
+            continue
+        if converted is not None:
+            scalar_rows.append(i)
+            scalar_pieces.append(converted.encode())
+    if scalar_rows:
+        # Scalar results come after the bulk ones; put every piece back in line order.
+        order = np.argsort(np.concatenate((rows, scalar_rows)), kind="stable")
+        rows = np.concatenate((rows, scalar_rows))[order]
+        piece_lengths = np.concatenate((piece_lengths, [len(piece) for piece in scalar_pieces]))
+        piece_starts = (np.cumsum(piece_lengths) - piece_lengths)[order]
+        piece_lengths = piece_lengths[order]
+        pieces = np.frombuffer(pieces + b"".join(scalar_pieces), np.uint8)[byte_ranges(piece_starts, piece_lengths)]
+    return splice(data, starts[rows], ends[rows], pieces, piece_lengths)
+
+
+def flatten_networks(networks):
+    """Flattens nested or disjoint (start, end, label) ranges into disjoint ones labelled by the innermost range.
+
+    CIDR blocks never partially overlap, so one sweep in start order with a stack of the open blocks suffices."""
+    segments = []
+    stack = []
+    cursor = 0
+    for start, end, label in sorted(networks, key=lambda network: (network[0], -network[1])):
+        while stack and stack[-1][0] < start:
+            top_end, top_label = stack.pop()
+            if cursor <= top_end:
+                segments.append((cursor, top_end, top_label))
+            cursor = top_end + 1
+        if stack and cursor < start:
+            segments.append((cursor, start - 1, stack[-1][1]))
+        stack.append((end, label))
+        cursor = start
+    while stack:
+        top_end, top_label = stack.pop()
+        if cursor <= top_end:
+            segments.append((cursor, top_end, top_label))
+        cursor = top_end + 1
+    return segments
+
+
+class CidrIndex:
+    """Finds the most specific listed network containing each address, by binary search over sorted intervals.
+
+    IPv4 intervals are NumPy arrays searched with np.searchsorted for a whole batch at once; IPv6 ones are
+    lists searched with bisect."""
+
+    def __init__(self, networks):
+        ranges = {4: [], 6: []}
+        for text in networks:
+            network = ipaddress.ip_network(text, strict=False)
+            ranges[network.version].append((int(network.network_address), int(network.broadcast_address), str(network)))
+        segments = flatten_networks(ranges[4])
+        self.starts4 = np.array([segment[0] for segment in segments], dtype=np.int64)
+        self.ends4 = np.array([segment[1] for segment in segments], dtype=np.int64)
+        self.labels4 = [segment[2] for segment in segments]
+        segments = flatten_networks(ranges[6])
+        self.starts6 = [segment[0] for segment in segments]
+        self.ends6 = [segment[1] for segment in segments]
+        self.labels6 = [segment[2] for segment in segments]
+
+    @classmethod
+    def from_file(cls, path):
+        """Reads one CIDR block per line; blank lines and # comments are skipped."""
+        with open(path, encoding="utf-8") as f:
+            return cls(line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip())
+
+    def lookup(self, addresses):
+        """Returns the innermost containing network for each address string, or None."""
+        values, ok = parse_ipv4(addresses)
+        result = [None] * len(addresses)
+        index = np.searchsorted(self.starts4, values, side="right") - 1
+        hit = ok & (index >= 0)
+        hit[hit] = values[hit] <= self.ends4[index[hit]]
+        for i, j in zip(np.flatnonzero(hit).tolist(), index[hit].tolist()):
+            result[i] = self.labels4[j]
+        for i in np.flatnonzero(~ok).tolist():
+            result[i] = self.lookup_one(addresses[i])
+        return result
+
+    def lookup_one(self, address):
+        try:
+            address = ipaddress.ip_address(address)
+        except ValueError:
+            return None
+        value = int(address)
+        if address.version == 4:
+            j = int(np.searchsorted(self.starts4, value, side="right")) - 1
+            return self.labels4[j] if j >= 0 and value <= self.ends4[j] else None
+        j = bisect.bisect_right(self.starts6, value) - 1
+        return self.labels6[j] if j >= 0 and value <= self.ends6[j] else None
+
+
+def expand_cidr(cidr):
+    """Yields "address decimal" lines for every address of a network, as blocks of bytes."""
+    network = ipaddress.ip_network(cidr, strict=False)
+    first = int(network.network_address)
+    last = int(network.broadcast_address)
+    for start in range(first, last + 1, EXPAND_CHUNK):
+        stop = min(start + EXPAND_CHUNK, last + 1)
+        if network.version == 6:
+            yield "".join(f"{decimal_to_ip(str(value))} {value}\n" for value in range(start, stop)).encode()
+            continue
+        values = np.arange(start, stop, dtype=np.int64)
+        address_chars, address_used = ipv4_chars(values)
+        number_chars, number_used = decimal_chars(values)
+        separators = np.zeros((len(values), 1), np.uint8)
+        chars = np.hstack((address_chars, separators + 32, number_chars, separators + 10))
+        used = np.hstack((address_used, separators == 0, number_used, separators == 0))
+        yield chars[used].tobytes()
+
+
+def read_blocks(paths, size=BLOCK_BYTES):
+    """Yields the bytes of the given files, or of stdin for "-" or no files, in blocks of whole lines."""
+    for path in paths or ["-"]:
+        f = sys.stdin.buffer if path == "-" else open(path, "rb")
+        with f:
+            rest = b""
+            while block := f.read(size):
+                block = rest + block
+                cut = block.rfind(b"\n") + 1
+                rest = block[cut:]
+                if cut:
+                    yield block[:cut]
+            if rest:
+                yield rest
+
+
+def read_chunks(paths, size=CHUNK_LINES):
+    """Yields the lines of the given files, or of stdin for "-" or no files, in lists of up to size lines."""
+    for path in paths or ["-"]:
+        if path == "-":
+            sys.stdin.reconfigure(errors="replace")
+            f = sys.stdin
+        else:
+            f = open(path, encoding="utf-8", errors="replace")
+        with f:
+            while chunk := list(itertools.islice(f, size)):
+                yield chunk
+
+
+def synthetic_log(lines, seed=0):
+    """Returns an access log in combined format whose client addresses are about 10% IPv6."""
+    rng = random.Random(seed)
+    paths = ["/", "/index.html", "/api/v1/items", "/static/app.js", "/login"]
+    log = []
+    for _ in range(lines):
+        if rng.random() < BENCHMARK_IPV6_SHARE:
+            address = str(ipaddress.IPv6Address(rng.getrandbits(128)))
+        else:
+            address = socket.inet_ntoa(struct.pack("!I", rng.getrandbits(32)))
+        log.append(
+            f"{address} - - [18/Oct/2026:10:{rng.randrange(60):02d}:{rng.randrange(60):02d} +0000] "
+            f'"GET {rng.choice(paths)} HTTP/1.1" {rng.choice((200, 200, 304, 404))} {rng.randrange(50000)} '
+            f'"-" "Mozilla/5.0"\n'
+        )
+    return log
+
+
+def run_benchmark(lines):
+    """Rewrites a synthetic access log both ways, one line at a time and in bulk, and looks its addresses up
+    in bulk and one at a time, printing the rates."""
+    log = synthetic_log(min(lines, BENCHMARK_BLOCK))
+    block = "".join(log).encode()
+    decimal_block = rewrite_block(block)
+    print(f"round trip: {rewrite_block(decimal_block, reverse=True) == block}")
+
+    same = decimal_block == rewrite_lines(block) and rewrite_lines(decimal_block, reverse=True) == block
+    print(f"bulk output matches per-line output: {same}")
+
+    for name, data, reverse in (("to decimal", block, False), ("to address", decimal_block, True)):
+        start = time.perf_counter()
+        rewrite_lines(data, reverse=reverse)
+        per_line = len(log) / (time.perf_counter() - start)
+
+        done = 0
+        start = time.perf_counter()
+        while done < lines:
+            if lines - done < len(log):
+                data = b"".join(data.splitlines(keepends=True)[: lines - done])
+            rewrite_block(data, reverse=reverse)
+            done += min(len(log), lines - done)
+        bulk = done / (time.perf_counter() - start)
+        print(
+            f"{name}: per line {per_line:,.0f} lines/s, bulk {bulk:,.0f} lines/s over {done} lines "
+            f"({bulk / per_line:.1f}x)"
+        )
+
+    rng = random.Random(1)
+    index = CidrIndex(f"{ipaddress.IPv4Address(rng.getrandbits(32))}/16" for _ in range(1000))
+    addresses = [line.partition(" ")[0] for line in log]
+    start = time.perf_counter()
+    index.lookup(addresses)
+    bulk = len(addresses) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for address in addresses:
+        index.lookup_one(address)
+    per_address = len(addresses) / (time.perf_counter() - start)
+    print(
+        f"lookup: one at a time {per_address:,.0f} addresses/s, bulk {bulk:,.0f} addresses/s "
+        f"({bulk / per_address:.1f}x)"
+    )
+
+
+def option_value(args, name, default):
+    if name not in args:
+        return default
+    return int(args[args.index(name) + 1])
+
+
+def print_usage():
+    print("Usage: python <script_name>.py <URL>")
+    print("       python <script_name>.py --batch [FILE ...] [--column N] [--reverse]")
+    print("       python <script_name>.py --expand CIDR")
+    print("       python <script_name>.py --lookup NETWORKS_FILE [ADDRESS ...]")
+    print("       python <script_name>.py --benchmark [LINES]")
+    print("Example: python 1756998000.py http://127.0.0.1:8080/")
+    sys.exit(1)
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python <script_name>.py <URL>")
-        print("Example: python 1756998000.py http://127.0.0.1:8080/")
-        sys.exit(1)
-    input_url = sys.argv[1]
-    result_url = convert_url_ip_to_decimal(input_url)
-    print(result_url)
+    args = sys.argv[1:]
+    if not args:
+        print_usage()
+    if args[0] == "--batch":
+        try:
+            column = option_value(args, "--column", 0)
+        except (IndexError, ValueError):
+            print_usage()
+        if "--column" in args:
+            i = args.index("--column")
+            args = args[:i] + args[i + 2 :]
+        reverse = "--reverse" in args
+        paths = [arg for arg in args[1:] if arg != "--reverse"]
+        for path in paths:
+            if path != "-" and not os.path.isfile(path):
+                print(f"Error: File not found: {path}")
+                sys.exit(1)
+        for block in read_blocks(paths):
+            sys.stdout.buffer.write(rewrite_block(block, column, reverse))
+    elif args[0] == "--expand" and len(args) == 2:
+        try:
+            for block in expand_cidr(args[1]):
+                sys.stdout.buffer.write(block)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    elif args[0] == "--lookup" and len(args) >= 2:
+        try:
+            index = CidrIndex.from_file(args[1])
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        chunks = [args[2:]] if len(args) > 2 else ([line.strip() for line in chunk] for chunk in read_chunks([]))
+        for addresses in chunks:
+            sys.stdout.write(
+                "".join(f"{address} {network or '-'}\n" for address, network in zip(addresses, index.lookup(addresses)))
+            )
+    elif args[0] == "--benchmark" and len(args) <= 2:
+        if len(args) == 2 and not args[1].isdigit():
+            print_usage()
+        run_benchmark(int(args[1]) if len(args) == 2 else BENCHMARK_LINES)
+    elif len(args) == 1 and not args[0].startswith("--"):
+        input_url = args[0]
+        result_url = convert_url_ip_to_decimal(input_url)
+        print(result_url)
+    else:
+        print_usage()
@@ -1,9 +1,16 @@
+import glob
 import os
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
 from PIL import Image
 
 SUPPORTED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif")
+JPEG_MODES = ("1", "L", "RGB", "CMYK")
+FILES_PER_TASK = 16
+TASKS_PER_WORKER = 4
+PROGRESS_EVERY = 1000
 
 
 def convert(input_path, output_path):
@@ -43,10 +50,210 @@ def convert(input_path, output_path):
         print(f"Error during image processing: {e}")
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 3:
+def convert_file(input_path, output_path, size=None):
+    """Converts one image for the batch mode and returns (decode, convert, encode) seconds.
+
+    With a target size, JPEGs are decoded at the smallest scale that still covers it (Image.draft) and the
+    result is shrunk to fit within it. The output is written to a temporary file and renamed into place, so
+    an interrupted run never leaves a partial file that looks up to date."""
+    output_ext = os.path.splitext(output_path)[1].lower()
+    start = time.perf_counter()
+    with Image.open(input_path) as img:
+        if size:
+            img.draft(img.mode, size)
+        img.load()
+        decoded = time.perf_counter()
+
+        if output_ext in (".jpg", ".jpeg") and img.mode not in JPEG_MODES:
+            img = img.convert("RGB")
+        if size:
+            img.thumbnail(size)
+        converted = time.perf_counter()
+
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        temp_path = f"{output_path}.{os.getpid()}.tmp"
+        try:
+            img.save(temp_path, format=Image.registered_extensions()[output_ext])
+            os.replace(temp_path, output_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    return decoded - start, converted - decoded, time.perf_counter() - converted
+
+
+def convert_files(jobs, size):
+    """Converts a list of (input, output) pairs in a worker and returns (input, timings or None, error) for each."""
+    results = []
+    for input_path, output_path in jobs:
+        try:
+            results.append((input_path, convert_file(input_path, output_path, size), None))
+        except Image.UnidentifiedImageError:
+            results.append((input_path, None, "not a valid image file"))
+        except Exception as e:
+            results.append((input_path, None, str(e)))
+    return results
+
+
+def has_glob_magic(path):
+    return any(char in path for char in "*?[")
+
+
+def find_inputs(sources):
+    """Expands directories (recursively), glob patterns and files into (input path, root) pairs.
+
+    The root is the part of the path that is mirrored under the output directory from."""
+    for source in sources:
+        if os.path.isdir(source):
+            for dirpath, _, filenames in os.walk(source):
+                for filename in sorted(filenames):
+                    if os.path.splitext(filename)[1].lower() in SUPPORTED_EXTENSIONS:
+                        yield os.path.join(dirpath, filename), source
+        elif has_glob_magic(source):
+            root = source
+            while has_glob_magic(root):
+                root = os.path.dirname(root)
+            for path in sorted(glob.iglob(source, recursive=True)):
+                if os.path.isfile(path) and os.path.splitext(path)[1].lower() in SUPPORTED_EXTENSIONS:
+                    yield path, root
+        elif os.path.isfile(source):
+            yield source, os.path.dirname(source)
+        else:
+            print(f"Error: No such file or directory: {source}")
+
+
+def output_path_for(input_path, root, output_dir, output_ext):
+    relative = os.path.relpath(input_path, root or ".")
+    return os.path.join(output_dir, os.path.splitext(relative)[0] + output_ext)
+
+
+def is_up_to_date(input_path, output_path):
+    """Tells whether the output exists and is newer than the input."""
+    try:
+        return os.stat(output_path).st_mtime_ns >= os.stat(input_path).st_mtime_ns
+    except OSError:
+        return False
+
+
+def convert_batch(sources, output_dir, output_ext, size=None, workers=None):
+    """Converts every image found in sources into output_dir across a process pool.
+
+    Files are sent to the workers in groups of FILES_PER_TASK with at most TASKS_PER_WORKER groups per worker
+    in flight, so memory stays bounded however many files there are. Inputs that map to the same output path
+    (a.png and a.jpg with --to jpg) are reported as failures instead of overwriting each other. Prints
+    per-stage timings at the end and returns the number of failed files."""
+    workers = workers or os.cpu_count() or 1
+    converted = skipped = failed = 0
+    stage_totals = [0.0, 0.0, 0.0]
+    start = time.perf_counter()
+
+    def collect(done):
+        nonlocal converted, failed
+        for future in done:
+            for input_path, timings, error in future.result():
+                if timings is None:
+                    failed += 1
+                    print(f"Error: '{input_path}': {error}")
+                    continue
+                converted += 1
+                for i, seconds in enumerate(timings):
+                    stage_totals[i] += seconds
+                if converted % PROGRESS_EVERY == 0:
+                    elapsed = time.perf_counter() - start
+                    print(
+                        f"{converted} converted, {skipped} skipped, {failed} failed ({converted / elapsed:.1f} images/s)"
+                    )
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        jobs = []
+        claimed = {}
+        for input_path, root in find_inputs(sources):
+            output_path = output_path_for(input_path, root, output_dir, output_ext)
+            key = os.path.normcase(os.path.abspath(output_path))
+            if key in claimed:
+                failed += 1
+                print(f"Error: '{input_path}': output '{output_path}' is already written from '{claimed[key]}'")
+                continue
+            claimed[key] = input_path
+            if is_up_to_date(input_path, output_path):
+                skipped += 1
+                continue
+            jobs.append((input_path, output_path))
+            if len(jobs) < FILES_PER_TASK:
+                continue
+            pending.add(executor.submit(convert_files, jobs, size))
+            jobs = []
+            if len(pending) >= workers * TASKS_PER_WORKER:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        if jobs:
+            pending.add(executor.submit(convert_files, jobs, size))
+        collect(wait(pending).done)
+
+    elapsed = time.perf_counter() - start
+    print(f"Converted {converted}, skipped {skipped} up to date, failed {failed} in {elapsed:.2f} s")
+    if converted:
+        print(f"Throughput: {converted / elapsed:.1f} images/s with {workers} worker(s)")
+        total = sum(stage_totals)
+        for name, seconds in zip(("decode", "convert", "encode"), stage_totals):
+            share = seconds / total * 100 if total else 0
+            print(f"  {name:8s} {seconds:8.2f} s  {seconds / converted * 1000:7.2f} ms/image  {share:5.1f}%")
+    return failed
+
+
+def parse_size(text):
+    """Parses WIDTHxHEIGHT, or a single number for a square bound."""
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height or width)
+
+
+def option_value(args, name, default, convert=int):
+    if name not in args:
+        return default
+    return convert(args[args.index(name) + 1])
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == "--batch":
+        usage = (
+            "Usage: python 1757084400.py --batch <dir|glob|file> ... --to EXT --out DIR "
+            "[--size WIDTHxHEIGHT] [--workers N]"
+        )
+        try:
+            output_ext = option_value(args, "--to", None, str)
+            output_dir = option_value(args, "--out", None, str)
+            size = option_value(args, "--size", None, parse_size)
+            workers = option_value(args, "--workers", None)
+        except (IndexError, ValueError):
+            print(usage)
+            sys.exit(1)
+        sources = []
+        rest = args[1:]
+        while rest:
+            if rest[0] in ("--to", "--out", "--size", "--workers"):
+                rest = rest[2:]
+            else:
+                sources.append(rest.pop(0))
+        if not sources or not output_ext or not output_dir:
+            print(usage)
+            sys.exit(1)
+        output_ext = "." + output_ext.lower().lstrip(".")
+        if output_ext not in SUPPORTED_EXTENSIONS:
+            print(f"Error: Unsupported output file format: {output_ext}")
+            sys.exit(1)
+        if convert_batch(sources, output_dir, output_ext, size, workers):
+            sys.exit(1)
+        return
+
+    if len(args) != 2:
         print("Usage: python 1757084400.py <input_file_path> <output_file_path>")
+        print("       python 1757084400.py --batch <dir|glob|file> ... --to EXT --out DIR [--size WxH] [--workers N]")
         sys.exit(1)
-    input_path = sys.argv[1]
-    output_path = sys.argv[2]
+    input_path = args[0]
+    output_path = args[1]
     convert(input_path, output_path)
+
+
+if __name__ == "__main__":
+    main()